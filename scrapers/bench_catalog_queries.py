@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Query benchmark for the app's events_catalog table.
+
+Loads events into SQLite with the schema from lib/database.ts, replays a mix
+of getFilteredEvents() queries (lib/eventsService.ts) and reports latency
+percentiles and EXPLAIN QUERY PLAN per query shape, for each candidate
+index set. Catalogs larger than the shipped one are grown with
+synthetic_events.
+
+    python3 bench_catalog_queries.py                      # shipped catalog (src/data/events/*.json)
+    python3 bench_catalog_queries.py --size 100000 --queries 5000 --plans
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+from synthetic_events import PROJECT_ROOT, CatalogProfile, generate_events
+
+CATALOG_GLOB = os.path.join(PROJECT_ROOT, "src", "data", "events", "*.json")
+
+# Same table as lib/database.ts / lib/database.native.ts
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events_catalog (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  date_start TEXT NOT NULL,
+  city TEXT,
+  country TEXT,
+  full_address TEXT,
+  category TEXT NOT NULL,
+  sport_tag TEXT NOT NULL,
+  registration_link TEXT,
+  federation TEXT,
+  image_logo_url TEXT,
+  created_at TEXT DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Candidate index sets; "app" is what lib/database.ts creates today
+INDEX_SETS: Dict[str, List[str]] = {
+    "none": [],
+    "app": [
+        "CREATE INDEX idx_events_date ON events_catalog(date_start)",
+        "CREATE INDEX idx_events_category ON events_catalog(category)",
+        "CREATE INDEX idx_events_sport ON events_catalog(sport_tag)",
+        "CREATE INDEX idx_events_country ON events_catalog(country)",
+    ],
+    # getFilteredEvents compares LOWER(country) / LOWER(federation), which a
+    # plain column index cannot serve; expression indexes can
+    "app_lower": [
+        "CREATE INDEX idx_events_date ON events_catalog(date_start)",
+        "CREATE INDEX idx_events_category ON events_catalog(category)",
+        "CREATE INDEX idx_events_sport ON events_catalog(sport_tag)",
+        "CREATE INDEX idx_events_country_lower ON events_catalog(LOWER(country))",
+        "CREATE INDEX idx_events_federation_lower ON events_catalog(LOWER(federation))",
+    ],
+    # Equality column first, then date_start: filter and ORDER BY in one index
+    "composite": [
+        "CREATE INDEX idx_events_date ON events_catalog(date_start)",
+        "CREATE INDEX idx_events_sport_date ON events_catalog(sport_tag, date_start)",
+        "CREATE INDEX idx_events_category_date ON events_catalog(category, date_start)",
+        "CREATE INDEX idx_events_country_date ON events_catalog(LOWER(country), date_start)",
+        "CREATE INDEX idx_events_federation_date ON events_catalog(LOWER(federation), date_start)",
+    ],
+}
+
+
+# ----------------------------------------------------------------------
+# Catalog
+# ----------------------------------------------------------------------
+
+def load_events(paths: List[str]) -> List[dict]:
+    events = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            events.extend(json.load(f))
+    return events
+
+
+def grow_catalog(events: List[dict], size: int, seed: int = 0) -> List[dict]:
+    """Pad the catalog with synthetic events drawn from its own distributions."""
+    if size <= len(events):
+        return events[:size]
+    return events + list(generate_events(size - len(events), CatalogProfile(events), seed))
+
+
+def create_catalog(events: List[dict], indexes: List[str], path: str = ":memory:",
+                   analyze: bool = False) -> sqlite3.Connection:
+    """Build events_catalog the way importEventsFromJSON() fills it."""
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE IF EXISTS events_catalog")
+    conn.execute(CATALOG_SCHEMA)
+    conn.executemany(
+        """INSERT OR IGNORE INTO events_catalog
+           (id, title, date_start, city, country, full_address, category, sport_tag,
+            registration_link, federation, image_logo_url)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            (
+                e["id"], e["title"], e["date_start"],
+                (e.get("location") or {}).get("city") or "",
+                (e.get("location") or {}).get("country") or "",
+                (e.get("location") or {}).get("full_address") or "",
+                e["category"], e["sport_tag"],
+                e.get("registration_link") or "",
+                e.get("federation") or None,
+                e.get("image_logo_url") or None,
+            )
+            for e in events
+        ),
+    )
+    for statement in indexes:
+        conn.execute(statement)
+    if analyze:
+        conn.execute("ANALYZE")
+    conn.commit()
+    return conn
+
+
+# ----------------------------------------------------------------------
+# Queries
+# ----------------------------------------------------------------------
+
+def build_query(filters: dict, today: str) -> Tuple[str, list]:
+    """SQL and parameters exactly as getFilteredEvents() builds them."""
+    conditions, params = [], []
+    if filters.get("sportTag") and filters["sportTag"] != "all":
+        conditions.append("sport_tag = ?")
+        params.append(filters["sportTag"])
+    if filters.get("category") and filters["category"] != "all":
+        conditions.append("category = ?")
+        params.append(filters["category"])
+    if filters.get("country"):
+        conditions.append("LOWER(country) = LOWER(?)")
+        params.append(filters["country"])
+    if filters.get("federation"):
+        conditions.append("LOWER(federation) = LOWER(?)")
+        params.append(filters["federation"])
+    if filters.get("searchQuery"):
+        conditions.append("(LOWER(title) LIKE ? OR LOWER(city) LIKE ? OR LOWER(country) LIKE ? OR LOWER(federation) LIKE ?)")
+        params.extend([f"%{filters['searchQuery'].lower()}%"] * 4)
+    if filters.get("dateFrom"):
+        conditions.append("date_start >= ?")
+        params.append(filters["dateFrom"])
+    if filters.get("dateTo"):
+        conditions.append("date_start <= ?")
+        params.append(filters["dateTo"])
+    if filters.get("upcomingOnly"):
+        conditions.append("date_start >= ?")
+        params.append(today)
+
+    query = "SELECT * FROM events_catalog"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY date_start ASC"
+    if filters.get("limit"):
+        query += " LIMIT ?"
+        params.append(filters["limit"])
+    return query, params
+
+
+def shape_of(filters: dict) -> str:
+    """Query shape: which filters are set, e.g. 'sportTag+upcomingOnly+limit'."""
+    return "+".join(sorted(k for k, v in filters.items() if v)) or "all"
+
+
+def query_mix(events: List[dict], count: int, today: date, seed: int = 0) -> List[dict]:
+    """
+    Filter combinations in roughly the proportions the app issues them.
+
+    The planning tab (upcoming, per region) dominates; sport/category chips,
+    search, date ranges and federation pages make up the rest. Values are
+    drawn from the catalog itself.
+    """
+    rng = random.Random(seed)
+    sports = [e["sport_tag"] for e in events]
+    categories = [e["category"] for e in events]
+    countries = [(e.get("location") or {}).get("country") or "France" for e in events]
+    federations = [e.get("federation") for e in events if e.get("federation")] or ["IBJJF"]
+    words = [w for e in events for w in e["title"].split() if len(w) > 3 and w.isalpha()] or ["open"]
+
+    def month_window() -> dict:
+        start = today + timedelta(days=rng.randrange(0, 365))
+        return {"dateFrom": start.isoformat(), "dateTo": (start + timedelta(days=30)).isoformat()}
+
+    templates = [
+        (30, lambda: {"upcomingOnly": True, "limit": 500}),
+        (15, lambda: {"upcomingOnly": True, "limit": 500, "country": "France"}),
+        (10, lambda: {"upcomingOnly": True, "limit": 1100}),
+        (10, lambda: {"sportTag": rng.choice(sports), "upcomingOnly": True, "limit": 100}),
+        (5, lambda: {"category": rng.choice(categories), "upcomingOnly": True, "limit": 100}),
+        (5, lambda: {"country": rng.choice(countries), "upcomingOnly": True, "limit": 100}),
+        (10, lambda: {"searchQuery": rng.choice(words).lower(), "limit": 50}),
+        (5, lambda: dict(month_window(), limit=100)),
+        (4, lambda: {"federation": rng.choice(federations), "upcomingOnly": True}),
+        (3, lambda: {"dateTo": today.isoformat(), "limit": 100}),
+        (3, lambda: {"sportTag": rng.choice(sports), "country": rng.choice(countries), "upcomingOnly": True}),
+    ]
+    weights = [w for w, _ in templates]
+    return [rng.choices(templates, weights)[0][1]() for _ in range(count)]
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_benchmark(events: List[dict], queries: List[dict], index_sets: Dict[str, List[str]],
+                  today: date, analyze: bool = False) -> Dict[str, dict]:
+    """
+    Replay the queries against each index set.
+
+    Returns {index set: {"total_ms", "shapes": {shape: {count, p50_ms, p95_ms, p99_ms, plan}}}}.
+    """
+    today_iso = today.isoformat()
+    built = [(shape_of(f),) + build_query(f, today_iso) for f in queries]
+    results = {}
+    for name, indexes in index_sets.items():
+        conn = create_catalog(events, indexes, analyze=analyze)
+        timings: Dict[str, List[float]] = defaultdict(list)
+        plans: Dict[str, List[str]] = {}
+        for shape, sql, params in built:
+            if shape not in plans:
+                plans[shape] = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                conn.execute(sql, params).fetchall()  # warm the page cache once per shape
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings[shape].append((time.perf_counter() - start) * 1000)
+        conn.close()
+
+        shapes = {}
+        for shape, values in timings.items():
+            values.sort()
+            shapes[shape] = {
+                "count": len(values),
+                "p50_ms": round(_percentile(values, 0.50), 3),
+                "p95_ms": round(_percentile(values, 0.95), 3),
+                "p99_ms": round(_percentile(values, 0.99), 3),
+                "plan": plans[shape],
+            }
+        results[name] = {
+            "total_ms": round(sum(sum(v) for v in timings.values()), 1),
+            "shapes": shapes,
+        }
+    return results
+
+
+def print_report(results: Dict[str, dict], show_plans: bool = False):
+    names = list(results)
+    shapes = sorted({s for r in results.values() for s in r["shapes"]},
+                    key=lambda s: -results[names[0]]["shapes"][s]["count"])
+
+    print(f"{'shape':<40} {'n':>5}  " + "  ".join(f"{n + ' p50/p95 ms':>24}" for n in names))
+    for shape in shapes:
+        row = f"{shape:<40} {results[names[0]]['shapes'][shape]['count']:>5}  "
+        row += "  ".join(
+            f"{results[n]['shapes'][shape]['p50_ms']:>11.3f}/{results[n]['shapes'][shape]['p95_ms']:<12.3f}"
+            for n in names
+        )
+        print(row)
+    print(f"{'total ms':<40} {'':>5}  " + "  ".join(f"{results[n]['total_ms']:>24.1f}" for n in names))
+
+    best = min(names, key=lambda n: results[n]["total_ms"])
+    print(f"\nFastest index set for this mix: {best}")
+
+    if show_plans:
+        for name in names:
+            print(f"\n== Query plans: {name}")
+            for shape in shapes:
+                print(f"  {shape}")
+                for line in results[name]["shapes"][shape]["plan"]:
+                    print(f"      {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark events_catalog queries against candidate indexes")
+    parser.add_argument("inputs", nargs="*", help="events JSON files (defaults to src/data/events/*.json)")
+    parser.add_argument("--size", type=int, help="Grow (or cut) the catalog to this many events")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--index-sets", nargs="+", choices=sorted(INDEX_SETS), default=list(INDEX_SETS))
+    parser.add_argument("--analyze", action="store_true", help="Run ANALYZE after creating indexes")
+    parser.add_argument("--plans", action="store_true", help="Print EXPLAIN QUERY PLAN per shape")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--today", help="Date used for upcomingOnly (YYYY-MM-DD, defaults to today)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    events = load_events(args.inputs or sorted(glob.glob(CATALOG_GLOB)))
+    if args.size:
+        events = grow_catalog(events, args.size, args.seed)
+    today = date.fromisoformat(args.today) if args.today else date.today()
+    queries = query_mix(events, args.queries, today, args.seed)
+    print(f"{len(events)} events, {len(queries)} queries\n")
+
+    results = run_benchmark(events, queries, {n: INDEX_SETS[n] for n in args.index_sets}, today, args.analyze)
+    print_report(results, args.plans)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
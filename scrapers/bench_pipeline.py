@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the post-scrape stages of main.py.
+
+Generates synthetic catalogs of increasing size and reports wall time and
+peak Python memory for each stage a run goes through after fetching: the
+scraper's per-event classify/build path (with its sampled logging and audit
+records), then what build_outputs() does (logos, sort, events.json, widget
+payloads, snapshot, summary). Each timing is the best of several repeats, and
+stages whose time grows faster than the catalog are flagged once they run
+long enough for the growth to be more than timer noise.
+
+    python3 bench_pipeline.py --sizes 1000 10000 100000 1000000 --repeat 5
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from image_pipeline import ImagePipeline
+from log_setup import setup_logging, shutdown_logging
+from main import count_by_sport, sort_events, write_events
+from smoothcomp_scraper import SmoothcompScraper
+from snapshots import NUMPY_AVAILABLE, save_snapshot
+from synthetic_events import REFERENCE_PATH, CatalogProfile, generate_events
+from widget_payloads import group_by_region, write_widget_payloads
+
+# Growth exponent above which a stage is reported as super-linear
+SUPERLINEAR_EXPONENT = 1.15
+
+# Growth between two sizes is only flagged when the smaller run took at least this long
+MIN_FLAG_SECONDS = 0.1
+
+
+def classify_events(events: List[dict]) -> List[dict]:
+    """Run every event through the scraper's per-event path: _classify_event, then _build_event."""
+    scraper = SmoothcompScraper(europe_only=True)
+    kept = []
+    for event in events:
+        location = event["location"]
+        fields = {
+            "url": f"https://smoothcomp.com/en/event/{event['id']}",
+            "title": event["title"],
+            "date_str": event["date_start"],
+            "location": location["full_address"],
+            "country": location["country"],
+            "image_url": event["image_logo_url"],
+        }
+        if scraper._classify_event(fields):
+            kept.append(scraper._build_event(fields))
+    return kept
+
+
+def _measure(stage: Callable[[List[dict]], object], events: List[dict], repeat: int = 3) -> Dict[str, float]:
+    """
+    Best time over `repeat` runs of a stage, then one run under tracemalloc for its peak memory.
+
+    Each run gets fresh copies of the events, since stages like the logo pass edit them in place.
+    """
+    seconds = math.inf
+    for _ in range(max(1, repeat)):
+        data = [dict(e) for e in events]
+        gc.collect()
+        start = time.perf_counter()
+        stage(data)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    data = [dict(e) for e in events]
+    gc.collect()
+    tracemalloc.start()
+    stage(data)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": seconds, "peak_mb": peak / (1024 * 1024)}
+
+
+def run_benchmark(sizes: List[int], reference: str = REFERENCE_PATH, seed: int = 0,
+                  repeat: int = 3, console_sample: float = 0.0) -> Dict[str, List[dict]]:
+    """
+    Return {stage: [{"size", "seconds", "peak_mb"}, ...]} for each size.
+
+    Logging is set up as in main.py, with an audit file, and all outputs go
+    to a temporary directory. Logos point to remote URLs and are resolved
+    offline against an empty cache, so the image stage runs without network.
+    """
+    profile = CatalogProfile.from_file(reference)
+    out_dir = tempfile.mkdtemp(prefix="yoroi-bench-")
+    setup_logging(audit_path=os.path.join(out_dir, "audit.ndjson"), console_sample_rate=console_sample)
+    images = ImagePipeline(os.path.join(out_dir, "images"), os.path.join(out_dir, "thumbs"),
+                           base_url="https://bench.invalid/thumbs", offline=True)
+
+    stages = {
+        "classify": classify_events,
+        "logos": images.process,
+        "sort": sort_events,
+        "write": lambda evs: write_events(evs, os.path.join(out_dir, "events.json")),
+        "widgets": lambda evs: write_widget_payloads(group_by_region(evs), os.path.join(out_dir, "widgets")),
+        "summary": count_by_sport,
+    }
+    if NUMPY_AVAILABLE:
+        stages["snapshot"] = lambda evs: save_snapshot(evs, os.path.join(out_dir, "snapshots"), run_id="bench")
+    results = {name: [] for name in stages}
+
+    try:
+        for size in sorted(sizes):
+            events = list(generate_events(size, profile, seed=seed))
+            for i, event in enumerate(events):
+                event["image_logo_url"] = f"https://bench.invalid/logos/{i // 20}.png"  # organisers share logos
+            for name, stage in stages.items():
+                measurement = _measure(stage, events, repeat)
+                measurement["size"] = size
+                results[name].append(measurement)
+                print(f"  {name:<8} n={size:<9} {measurement['seconds']:9.3f}s  {measurement['peak_mb']:9.1f} MB")
+            del events
+    finally:
+        shutdown_logging()
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+
+def growth_exponents(rows: List[dict], min_seconds: float = 0.0) -> List[float]:
+    """
+    Slope of log(time) vs log(size) between consecutive sizes (1.0 = linear).
+
+    Pairs whose smaller run took less than min_seconds are left out.
+    """
+    exponents = []
+    for prev, cur in zip(rows, rows[1:]):
+        if prev["seconds"] <= max(0.0, min_seconds) or cur["seconds"] <= 0:
+            continue
+        exponents.append(math.log(cur["seconds"] / prev["seconds"]) / math.log(cur["size"] / prev["size"]))
+    return exponents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark post-scrape stages on synthetic catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--reference", default=REFERENCE_PATH, help="Real events.json to learn distributions from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage and size (best is kept)")
+    parser.add_argument("--console-sample", type=float, default=0.0,
+                        help="Share of per-event ACCEPTED/REJECTED lines printed, as in main.py (0..1)")
+    parser.add_argument("--json", help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("POST-SCRAPE PIPELINE SCALING BENCHMARK")
+    print("=" * 60)
+    results = run_benchmark(args.sizes, args.reference, args.seed, args.repeat, args.console_sample)
+
+    print(f"\n{'=' * 60}")
+    print(f"Growth exponent per stage (1.0 = linear, flagged from {MIN_FLAG_SECONDS}s runs):")
+    for name, rows in results.items():
+        exponents = growth_exponents(rows)
+        measurable = growth_exponents(rows, MIN_FLAG_SECONDS)
+        worst = max(measurable) if measurable else 0.0
+        flag = "  <-- super-linear" if worst > SUPERLINEAR_EXPONENT else ""
+        print(f"  {name:<8} {', '.join(f'{e:.2f}' for e in exponents)}{flag}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nRaw results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
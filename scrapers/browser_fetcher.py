@@ -0,0 +1,172 @@
+"""
+Headless-browser fetch backend for calendars rendered client-side.
+
+Keeps a small pool of reusable Chromium contexts driven from a background
+event loop, blocks images/fonts/media/third-party scripts and waits only for
+the selector the parser needs. Playwright is optional: check
+PLAYWRIGHT_AVAILABLE before creating a BrowserPool.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from http_client import USER_AGENT
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:  # playwright is an optional dependency
+    async_playwright = None
+    PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = USER_AGENT  # same user agent as the HTTP client
+
+
+def _site_of(url: str) -> str:
+    """Return the registrable part of a host (last two labels)."""
+    host = (urlparse(url).hostname or "").lower()
+    return ".".join(host.split(".")[-2:])
+
+
+class BrowserPool:
+    """Pool of reusable Chromium contexts with a cap on concurrent pages."""
+
+    # Resource types never needed to read the DOM
+    BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        max_pages: int = 4,
+        timeout: float = 20.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+        headless: bool = True,
+    ):
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("playwright is not installed (pip install playwright && playwright install chromium)")
+
+        self.pool_size = pool_size
+        self.max_pages = max_pages
+        self.timeout_ms = int(timeout * 1000)
+        self.user_agent = user_agent
+        self.headless = headless
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: Optional[asyncio.Queue] = None
+        self._page_slots: Optional[asyncio.Semaphore] = None
+        try:
+            self._run(self._start())
+        except BaseException:
+            # e.g. Chromium not installed: release what started and stop the loop thread
+            try:
+                self.close()
+            except Exception as e:
+                logger.debug("Browser pool cleanup after failed start: %s", e)
+            raise
+
+    def _run(self, coro):
+        """Run a coroutine on the pool's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _start(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._contexts = asyncio.Queue()
+        self._page_slots = asyncio.Semaphore(self.max_pages)
+        for _ in range(self.pool_size):
+            context = await self._browser.new_context(user_agent=self.user_agent)
+            await context.route("**/*", self._filter_request)
+            self._contexts.put_nowait(context)
+        logger.info("Browser pool ready (%d contexts, %d pages max)", self.pool_size, self.max_pages)
+
+    async def _filter_request(self, route):
+        """Abort heavy resources and scripts served from other sites."""
+        request = route.request
+        if request.resource_type in self.BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+            return
+        if request.resource_type == "script":
+            frame_url = request.frame.url if request.frame else ""
+            if frame_url and _site_of(request.url) != _site_of(frame_url):
+                await route.abort()
+                return
+        await route.continue_()
+
+    async def _fetch(self, url: str, wait_selector: Optional[str]) -> str:
+        async with self._page_slots:
+            context = await self._contexts.get()
+            page = None
+            try:
+                page = await context.new_page()
+                await page.goto(url, wait_until="commit", timeout=self.timeout_ms)
+                if wait_selector:
+                    await page.wait_for_selector(wait_selector, state="attached", timeout=self.timeout_ms)
+                else:
+                    await page.wait_for_load_state("domcontentloaded", timeout=self.timeout_ms)
+                return await page.content()
+            finally:
+                if page is not None:
+                    await page.close()
+                self._contexts.put_nowait(context)
+
+    def fetch(self, url: str, wait_selector: Optional[str] = None) -> str:
+        """
+        Render a page and return its HTML.
+
+        Safe to call from several threads; at most max_pages pages are open
+        at once. Raises on navigation errors or if the selector never shows up.
+        """
+        return self._run(self._fetch(url, wait_selector))
+
+    def fetch_many(self, urls: List[str], wait_selector: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Render several pages concurrently. Failed pages map to None."""
+
+        async def _gather():
+            results = await asyncio.gather(
+                *(self._fetch(url, wait_selector) for url in urls),
+                return_exceptions=True,
+            )
+            pages = {}
+            for url, result in zip(urls, results):
+                if isinstance(result, Exception):
+                    logger.error("Error rendering %s: %s", url, result)
+                    pages[url] = None
+                else:
+                    pages[url] = result
+            return pages
+
+        return self._run(_gather())
+
+    async def _close(self):
+        while self._contexts is not None and not self._contexts.empty():
+            await self._contexts.get_nowait().close()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    def close(self):
+        """Close every context and stop the background loop."""
+        if not self._loop.is_running():
+            return
+        try:
+            self._run(self._close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
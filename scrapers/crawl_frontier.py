@@ -0,0 +1,241 @@
+"""
+Persistent, shardable crawl frontier backed by SQLite.
+
+Every URL has a status (pending, leased, done, failed), an attempt counter
+and, once done, the parsed event (or NULL when the event was filtered out).
+Workers claim URLs under a time-limited lease, so a crashed worker's URLs go
+back to the pool once the lease expires and a rerun resumes where the crawl
+stopped. URLs are assigned to shards by hash, letting each worker drain only
+its own slice.
+
+The default rollback journal (DELETE) only needs POSIX file locks, so the
+file can live on a network share used by several machines. WAL is faster but
+relies on shared memory, which only works when every worker runs on the
+host that owns the file.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+JOURNAL_MODES = ("delete", "wal")
+
+
+def shard_of(url: str, num_shards: int) -> int:
+    """Stable shard number for a URL (independent of PYTHONHASHSEED)."""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % num_shards
+
+
+def parse_shard(spec: str) -> tuple:
+    """Parse a worker shard spec like "2/4" into (2, 4)."""
+    index, _, total = spec.partition("/")
+    index, total = int(index), int(total)
+    if not 0 <= index < total:
+        raise ValueError(f"Invalid shard spec: {spec}")
+    return index, total
+
+
+class CrawlFrontier:
+    """SQLite-backed URL queue with lease-based claiming."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS urls (
+            url TEXT PRIMARY KEY,
+            shard INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            result TEXT,
+            updated_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_urls_claim ON urls (shard, status, lease_expires);
+    """
+
+    def __init__(self, path: str, num_shards: int = 1, lease_seconds: float = 600, max_attempts: int = 3,
+                 journal_mode: str = "delete"):
+        """
+        Args:
+            path: SQLite file shared by all workers (needs working file locks)
+            num_shards: Number of hash shards, fixed when the frontier is created
+            lease_seconds: How long a claimed URL stays reserved for its worker
+            max_attempts: Fetch attempts before a URL is marked failed
+            journal_mode: "delete" (safe on network filesystems) or "wal"
+                (faster, only when all workers share one host)
+        """
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"journal_mode must be one of {JOURNAL_MODES}, got {journal_mode!r}")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # Autocommit mode: transactions are opened explicitly where needed
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode.upper()}")
+        # NORMAL is only crash-safe with WAL; the rollback journal needs FULL
+        self.conn.execute("PRAGMA synchronous=NORMAL" if journal_mode == "wal" else "PRAGMA synchronous=FULL")
+        self.conn.executescript(self.SCHEMA)
+
+        self.conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('num_shards', ?)", (str(num_shards),)
+        )
+        self.num_shards = int(
+            self.conn.execute("SELECT value FROM meta WHERE key = 'num_shards'").fetchone()[0]
+        )
+        if self.num_shards != num_shards:
+            logger.info("Frontier %s already uses %d shards", path, self.num_shards)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _shard_clause(self, shards: Optional[Sequence[int]]) -> tuple:
+        if shards is None:
+            return "", ()
+        placeholders = ",".join("?" for _ in shards)
+        return f" AND shard IN ({placeholders})", tuple(shards)
+
+    def add_urls(self, urls: Iterable[str]) -> int:
+        """Queue new URLs. Already known URLs keep their status. Returns the number added."""
+        now = time.time()
+        rows = [(url, shard_of(url, self.num_shards), now) for url in urls]
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, shard, updated_at) VALUES (?, ?, ?)", rows
+            )
+            return self.conn.total_changes - before
+
+    def claim(self, worker_id: str, limit: int = 5, shards: Optional[Sequence[int]] = None) -> List[str]:
+        """
+        Lease up to `limit` pending (or expired) URLs for a worker.
+
+        BEGIN IMMEDIATE takes the write lock before selecting, so two workers
+        never lease the same URL.
+        """
+        now = time.time()
+        shard_sql, shard_args = self._shard_clause(shards)
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            # A worker died holding the URL on its last attempt
+            self.conn.execute(
+                """
+                UPDATE urls
+                SET status = ?, last_error = 'lease expired', lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE status = ? AND lease_expires < ? AND attempts >= ?
+                """,
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                f"""
+                SELECT url FROM urls
+                WHERE (status = ? OR (status = ? AND lease_expires < ?))
+                  AND attempts < ?{shard_sql}
+                LIMIT ?
+                """,
+                (PENDING, LEASED, now, self.max_attempts, *shard_args, limit),
+            ).fetchall()
+            urls = [row[0] for row in rows]
+            self.conn.executemany(
+                """
+                UPDATE urls
+                SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                WHERE url = ?
+                """,
+                [(LEASED, worker_id, now + self.lease_seconds, now, url) for url in urls],
+            )
+        return urls
+
+    def complete(self, url: str, worker_id: str, event: Optional[dict]) -> bool:
+        """Store a URL's outcome (None = filtered out). Ignored if the lease was lost."""
+        result = json.dumps(event, ensure_ascii=False) if event is not None else None
+        with self.conn:
+            cursor = self.conn.execute(
+                """
+                UPDATE urls
+                SET status = ?, result = ?, last_error = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE url = ? AND status = ? AND lease_owner = ?
+                """,
+                (DONE, result, time.time(), url, LEASED, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, url: str, worker_id: str, error: str) -> bool:
+        """Release a URL after an error; it is retried until max_attempts."""
+        with self.conn:
+            cursor = self.conn.execute(
+                """
+                UPDATE urls
+                SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE url = ? AND status = ? AND lease_owner = ?
+                """,
+                (self.max_attempts, FAILED, PENDING, error, time.time(), url, LEASED, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, urls: Sequence[str], worker_id: str) -> int:
+        """Hand leased URLs back untouched (e.g. the run deadline passed); the attempt is not counted."""
+        with self.conn:
+            cursor = self.conn.executemany(
+                """
+                UPDATE urls
+                SET status = ?, attempts = attempts - 1, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE url = ? AND status = ? AND lease_owner = ?
+                """,
+                [(PENDING, time.time(), url, LEASED, worker_id) for url in urls],
+            )
+        return cursor.rowcount
+
+    def outstanding(self, shards: Optional[Sequence[int]] = None) -> int:
+        """URLs still pending or leased (claimable now or once their lease expires)."""
+        shard_sql, shard_args = self._shard_clause(shards)
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM urls WHERE status IN (?, ?) AND attempts < ?{shard_sql}",
+            (PENDING, LEASED, self.max_attempts, *shard_args),
+        ).fetchone()[0] + self.conn.execute(
+            # Leased on their last attempt: not claimable again, but still in flight
+            f"SELECT COUNT(*) FROM urls WHERE status = ? AND attempts >= ? AND lease_expires >= ?{shard_sql}",
+            (LEASED, self.max_attempts, time.time(), *shard_args),
+        ).fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Number of URLs per status."""
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for status, count in self.conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def results(self) -> Iterator[dict]:
+        """Accepted events from every completed URL."""
+        cursor = self.conn.execute(
+            "SELECT result FROM urls WHERE status = ? AND result IS NOT NULL ORDER BY url", (DONE,)
+        )
+        for (result,) in cursor:
+            yield json.loads(result)
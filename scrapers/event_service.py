@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Local HTTP service resolving one event URL into a SportEvent.
+
+Smoothcomp pages go through the usual extraction and filters; other pages
+(race sites) are read from their og:title / JSON-LD Event metadata and
+returned as endurance events. Results are kept in an LRU cache with a TTL,
+concurrent requests for the same URL share one fetch, and batch lookups are
+resolved concurrently.
+
+    python3 event_service.py --port 8787
+    curl 'http://127.0.0.1:8787/event?url=https://smoothcomp.com/en/event/12345'
+    curl -X POST http://127.0.0.1:8787/events -d '{"urls": ["...", "..."]}'
+    curl http://127.0.0.1:8787/stats
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urldefrag, urlparse
+
+import requests
+
+from http_client import install_dns_cache
+from log_setup import setup_logging
+from smoothcomp_scraper import SmoothcompScraper
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_URLS = 100
+MAX_BODY_BYTES = 64 * 1024
+
+
+def _is_smoothcomp(url: str) -> bool:
+    host = (urlparse(url).hostname or "").lower()
+    return host == "smoothcomp.com" or host.endswith(".smoothcomp.com")
+
+
+class EventResolver:
+    """URL -> SportEvent lookups with request coalescing and an LRU/TTL cache."""
+
+    def __init__(self, scraper: Optional[SmoothcompScraper] = None, ttl: float = 3600.0,
+                 max_entries: int = 1024, workers: int = 8, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            scraper: Used for fetching, extraction and filtering
+            ttl: Seconds a result stays cached (fetch errors are never cached)
+            max_entries: Cached URLs kept, least recently used evicted first
+            workers: Concurrent fetches for batch lookups
+            clock: Monotonic time source for TTL expiry
+        """
+        self.scraper = scraper or SmoothcompScraper()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resolver")
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()  # url -> (expires, result)
+        self._inflight: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def _race_event(self, fields: dict) -> dict:
+        """SportEvent for a non-Smoothcomp race page (no grappling filter, no ACCEPTED log or audit)."""
+        event = self.scraper._make_event(fields)
+        title_lower = fields["title"].lower()
+        event.update(
+            id="race_" + hashlib.sha1(fields["url"].encode("utf-8")).hexdigest()[:12],
+            category="endurance",
+            sport_tag="trail" if "trail" in title_lower else "running",
+            federation=urlparse(fields["url"]).hostname or "",
+        )
+        return event
+
+    def _lookup(self, url: str) -> dict:
+        html = self.scraper._get_event_page(url)
+        fields = self.scraper._extract_event_fields(url, html)
+        if fields is None:
+            return {"url": url, "status": "unparsable"}
+        if not _is_smoothcomp(url):
+            return {"url": url, "status": "accepted", "event": self._race_event(fields)}
+        if not self.scraper._classify_event(fields):
+            return {
+                "url": url,
+                "status": "rejected",
+                "rejected_by": fields.get("rejected_by"),
+                "keyword": fields.get("keyword"),
+                "title": fields["title"],
+                "location": fields["location"],
+            }
+        return {"url": url, "status": "accepted", "event": self.scraper._build_event(fields)}
+
+    def resolve(self, url: str) -> dict:
+        """Resolve one URL. The result carries `status` and, when accepted, `event`."""
+        url = urldefrag(url.strip())[0]
+        now = self._clock()
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(url)
+                self.hits += 1
+                return dict(cached[1], cached=True)
+            future = self._inflight.get(url)
+            owner = future is None
+            if owner:
+                future = self._inflight[url] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            # Another request is already fetching this URL: wait for its result
+            return dict(future.result(), cached=False)
+
+        try:
+            result = self._lookup(url)
+        except (requests.RequestException, ValueError) as e:
+            result = {"url": url, "status": "error", "error": str(e)}
+        except Exception as e:
+            logger.error("Error resolving %s: %s", url, e)
+            result = {"url": url, "status": "error", "error": str(e)}
+
+        with self._lock:
+            if result["status"] == "error":
+                self.errors += 1
+            else:
+                self._cache[url] = (self._clock() + self.ttl, result)
+                self._cache.move_to_end(url)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            del self._inflight[url]
+        future.set_result(result)
+        return dict(result, cached=False)
+
+    def resolve_many(self, urls: List[str]) -> List[dict]:
+        """Resolve a batch concurrently, results in input order."""
+        unique = list(dict.fromkeys(urls))
+        results = dict(zip(unique, self._pool.map(self.resolve, unique)))
+        return [results[url] for url in urls]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cached": len(self._cache),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+            }
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+# ----------------------------------------------------------------------
+# HTTP server
+# ----------------------------------------------------------------------
+
+def make_server(resolver: EventResolver, host: str = "127.0.0.1", port: int = 8787) -> ThreadingHTTPServer:
+    """HTTP server exposing GET /event?url=, POST /events and GET /stats."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/stats":
+                self._send(200, resolver.stats())
+            elif parsed.path == "/event":
+                url = parse_qs(parsed.query).get("url", [""])[0]
+                if not url.startswith(("http://", "https://")):
+                    self._send(400, {"error": "expected ?url=<http(s) event URL>"})
+                    return
+                self._send(200, resolver.resolve(url))
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/events":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._send(400, {"error": "invalid Content-Length"})
+                return
+            if length > MAX_BODY_BYTES:
+                self._send(413, {"error": "body too large"})
+                return
+            try:
+                urls = json.loads(self.rfile.read(length) or b"{}").get("urls")
+            except (ValueError, AttributeError):
+                urls = None
+            if (not isinstance(urls, list) or not urls or len(urls) > MAX_BATCH_URLS
+                    or not all(isinstance(u, str) and u.startswith(("http://", "https://")) for u in urls)):
+                self._send(400, {"error": f'expected {{"urls": [...]}} with 1 to {MAX_BATCH_URLS} http(s) URLs'})
+                return
+            self._send(200, {"results": resolver.resolve_many(urls)})
+
+        def log_message(self, format, *args):
+            logger.debug("%s - " + format, self.address_string(), *args)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve event URLs into SportEvent JSON over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--ttl", type=float, default=3600.0, help="Cache TTL in seconds")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent fetches for batch lookups")
+    parser.add_argument("--europe-only", action="store_true", help="Apply the Europe filter to Smoothcomp events")
+    args = parser.parse_args()
+    setup_logging()
+    install_dns_cache()
+
+    resolver = EventResolver(SmoothcompScraper(europe_only=args.europe_only), ttl=args.ttl,
+                             max_entries=args.cache_size, workers=args.workers)
+    server = make_server(resolver, args.host, args.port)
+    logger.info("Event service listening on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        resolver.close()
+
+
+if __name__ == "__main__":
+    main()
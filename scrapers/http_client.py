@@ -0,0 +1,165 @@
+"""
+Shared HTTP client for the scrapers.
+
+One pooled `requests.Session` per process, used by SmoothcompScraper,
+RunningScraper, the image pipeline and sitemap discovery:
+
+- keep-alive connection pools, sized per host (HOST_POOL_SIZES)
+- Accept-Encoding negotiation (gzip, plus brotli when the `brotli` or
+  `brotlicffi` package is installed, since urllib3 needs it to decode `br`)
+- a small TTL cache in front of DNS resolution for new connections, which
+  entry points turn on once with install_dns_cache()
+- default (connect, read) timeouts applied to every request
+- a single header / user-agent policy (DEFAULT_HEADERS)
+"""
+
+import logging
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import connection as urllib3_connection
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,fr;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate",
+}
+
+# (connect, read) seconds: fail fast on unreachable hosts, allow slow pages
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)
+
+# Keep-alive connections kept per host; other hosts get DEFAULT_POOL_SIZE
+DEFAULT_POOL_SIZE = 4
+HOST_POOL_SIZES: Dict[str, int] = {
+    "smoothcomp.com": 8,
+}
+
+DNS_TTL = 300.0
+
+
+class _DnsCache:
+    """getaddrinfo results per (host, port, address family), reused for `ttl` seconds."""
+
+    def __init__(self, ttl: float = DNS_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int, int], Tuple[float, List[tuple]]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int, family: int = socket.AF_UNSPEC) -> List[tuple]:
+        key = (host, port, family)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+        infos = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, infos)
+        return infos
+
+    def forget(self, host: str, port: int, family: int = socket.AF_UNSPEC):
+        with self._lock:
+            self._entries.pop((host, port, family), None)
+
+
+_dns_cache = _DnsCache()
+_original_create_connection = urllib3_connection.create_connection
+
+
+def _create_connection(address, *args, **kwargs):
+    """urllib3's create_connection, trying cached addresses of the host in turn."""
+    host, port = address
+    family = urllib3_connection.allowed_gai_family()  # IPv4 only unless urllib3 detected IPv6 support
+    try:
+        infos = _dns_cache.resolve(host, port, family)
+    except socket.gaierror:
+        return _original_create_connection(address, *args, **kwargs)
+
+    error = None
+    for _family, _type, _proto, _name, sockaddr in infos:
+        try:
+            # TLS still verifies and sends SNI for the original host name
+            return _original_create_connection((sockaddr[0], port), *args, **kwargs)
+        except OSError as e:
+            error = e
+    _dns_cache.forget(host, port, family)  # the host may have moved
+    raise error
+
+
+def install_dns_cache():
+    """
+    Put the DNS cache in front of urllib3's connection setup, for the whole process.
+
+    Called once by the entry points (main.py, pipeline.py, event_service.py...),
+    never as a side effect of building a session. Calling it again is a no-op.
+    """
+    if urllib3_connection.create_connection is not _create_connection:
+        urllib3_connection.create_connection = _create_connection
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """HTTPAdapter applying a default timeout when the caller gives none."""
+
+    def __init__(self, timeout: Tuple[float, float] = DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout if timeout is not None else self.timeout, **kwargs)
+
+
+def create_session(timeout: Tuple[float, float] = DEFAULT_TIMEOUT, pool_size: int = DEFAULT_POOL_SIZE,
+                   host_pool_sizes: Optional[Dict[str, int]] = None, retries: int = 2) -> requests.Session:
+    """
+    Build a session with the shared header, pool and timeout policy.
+
+    Args:
+        timeout: Default (connect, read) timeout
+        pool_size: Keep-alive connections per host not listed in host_pool_sizes
+        host_pool_sizes: Per-host pool sizes (defaults to HOST_POOL_SIZES)
+        retries: Retries on connection errors only (a request that reached
+            the server is never sent twice)
+    """
+    retry = Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.3)
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    for scheme in ("https://", "http://"):
+        session.mount(scheme, _TimeoutAdapter(timeout, pool_maxsize=pool_size, max_retries=retry))
+    for host, size in (host_pool_sizes if host_pool_sizes is not None else HOST_POOL_SIZES).items():
+        # Longest matching prefix wins, so these override the scheme adapters
+        session.mount(f"https://{host}/", _TimeoutAdapter(timeout, pool_maxsize=size, max_retries=retry))
+    return session
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+    """Process-wide session, so every scraper reuses the same connections."""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
@@ -0,0 +1,297 @@
+"""
+Logo/image ingestion for scraped events.
+
+Downloads the remote images referenced by `image_logo_url` concurrently,
+deduplicates them by content hash (many events share one organizer logo),
+turns each one into a small fixed-size JPEG thumbnail kept in a
+content-addressed cache, and rewrites `image_logo_url` to point at the
+published thumbnail. Pillow is optional: without it remote logos are dropped.
+Thumbnails are only usable from the app through an absolute base URL, so
+without one remote logos are dropped as well.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from http_client import shared_session
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:  # Pillow is an optional dependency
+    Image = ImageOps = None
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _is_remote(url) -> bool:
+    return isinstance(url, str) and url.startswith(("http://", "https://"))
+
+
+class ImagePipeline:
+    """Content-addressed thumbnail cache for event logos."""
+
+    INDEX_FILE = "index.json"
+    THUMB_EXT = ".jpg"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        publish_dir: str,
+        base_url: str = "",
+        size: Tuple[int, int] = (128, 128),
+        quality: int = 70,
+        max_cache_bytes: int = 200 * 1024 * 1024,
+        max_image_bytes: int = 10 * 1024 * 1024,
+        max_workers: int = 8,
+        timeout: float = 15,
+        session: Optional[requests.Session] = None,
+        offline: bool = False,
+    ):
+        """
+        Args:
+            cache_dir: Where thumbnails are cached, keyed by content hash
+            publish_dir: Directory shipped with events.json (only referenced thumbnails)
+            base_url: URL where publish_dir is served, written into image_logo_url;
+                empty drops remote logos (the app can't load relative paths)
+            size: Thumbnail size in pixels (logos are padded, never cropped)
+            max_cache_bytes: Cache size above which least recently used thumbnails are evicted
+            max_image_bytes: Downloads larger than this are abandoned
+            offline: Only use cached thumbnails; logos not in the cache are dropped
+        """
+        self.cache_dir = cache_dir
+        self.publish_dir = publish_dir
+        self.base_url = base_url.rstrip("/")
+        self.size = size
+        self.quality = quality
+        self.max_cache_bytes = max_cache_bytes
+        self.max_image_bytes = max_image_bytes
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = session or shared_session()
+        self.offline = offline
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] = self._load_index()
+        self._claims: Dict[str, threading.Event] = {}  # content hash -> thumbnail written
+        self.downloaded = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self.not_cached = 0
+
+    # ------------------------------------------------------------------
+    # Cache layout
+    # ------------------------------------------------------------------
+
+    def _thumb_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], digest + self.THUMB_EXT)
+
+    def _load_index(self) -> Dict[str, str]:
+        """Load the source URL -> content hash index from a previous run."""
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Download + thumbnail
+    # ------------------------------------------------------------------
+
+    def _download(self, url: str) -> Optional[bytes]:
+        """Download an image, giving up past max_image_bytes."""
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            chunks = []
+            total = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                total += len(chunk)
+                if total > self.max_image_bytes:
+                    logger.warning("Image too large, skipped: %s", url)
+                    return None
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _make_thumbnail(self, data: bytes, path: str):
+        """Write a padded, fixed-size, compressed JPEG thumbnail."""
+        with Image.open(io.BytesIO(data)) as img:
+            img.draft("RGB", self.size)  # lets JPEG decoding skip full resolution
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            else:
+                img = img.convert("RGB")
+            thumb = ImageOps.pad(img, self.size, color=(255, 255, 255))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        thumb.save(tmp_path, "JPEG", quality=self.quality, optimize=True, progressive=True)
+        os.replace(tmp_path, path)
+
+    def _ingest(self, url: str) -> Optional[str]:
+        """Return the content hash of a URL's thumbnail, creating it if needed."""
+        with self._lock:
+            digest = self._index.get(url)
+        if digest and os.path.exists(self._thumb_path(digest)):
+            os.utime(self._thumb_path(digest))  # mark as recently used
+            return digest
+        if self.offline:
+            with self._lock:
+                self.not_cached += 1
+            return None
+
+        try:
+            data = self._download(url)
+        except requests.RequestException as e:
+            logger.warning("Error downloading image %s: %s", url, e)
+            data = None
+        if not data:
+            with self._lock:
+                self.failed += 1
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._thumb_path(digest)
+        with self._lock:
+            self.downloaded += 1
+            claim = self._claims.get(digest)
+            owner = claim is None
+            if owner:
+                claim = self._claims[digest] = threading.Event()
+
+        if not owner:
+            # Same bytes already being (or already) thumbnailed for another URL
+            claim.wait()
+            if not os.path.exists(path):
+                return None
+            with self._lock:
+                self.deduplicated += 1
+                self._index[url] = digest
+            return digest
+
+        try:
+            if os.path.exists(path):
+                with self._lock:
+                    self.deduplicated += 1
+                os.utime(path)
+            else:
+                self._make_thumbnail(data, path)
+        except Exception as e:
+            logger.warning("Error creating thumbnail for %s: %s", url, e)
+            with self._lock:
+                self.failed += 1
+            return None
+        finally:
+            claim.set()
+
+        with self._lock:
+            self._index[url] = digest
+        return digest
+
+    # ------------------------------------------------------------------
+    # Publishing + eviction
+    # ------------------------------------------------------------------
+
+    def _reference(self, digest: str) -> str:
+        return f"{self.base_url}/{digest}{self.THUMB_EXT}"
+
+    def _publish(self, digests: set):
+        """Copy referenced thumbnails into publish_dir and drop stale ones."""
+        os.makedirs(self.publish_dir, exist_ok=True)
+        wanted = {digest + self.THUMB_EXT for digest in digests}
+        for name in os.listdir(self.publish_dir):
+            if name.endswith(self.THUMB_EXT) and name not in wanted:
+                os.remove(os.path.join(self.publish_dir, name))
+        for digest in digests:
+            target = os.path.join(self.publish_dir, digest + self.THUMB_EXT)
+            if not os.path.exists(target):
+                shutil.copyfile(self._thumb_path(digest), target)
+
+    def evict(self):
+        """Delete least recently used thumbnails until the cache fits max_cache_bytes."""
+        entries = []
+        total = 0
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(self.THUMB_EXT):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        evicted = set()
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            os.remove(path)
+            total -= size
+            evicted.add(os.path.basename(path)[: -len(self.THUMB_EXT)])
+
+        if evicted:
+            self._index = {url: d for url, d in self._index.items() if d not in evicted}
+            logger.info("Evicted %d thumbnails from image cache", len(evicted))
+
+    def process(self, events: List[dict]) -> List[dict]:
+        """
+        Replace remote image_logo_url values with thumbnail references.
+
+        Events whose image can't be fetched or decoded get image_logo_url=None,
+        so the app never falls back to the full-resolution original.
+        """
+        if not PIL_AVAILABLE or not self.base_url:
+            logger.warning("%s, skipping image stage",
+                           "Pillow is not installed" if not PIL_AVAILABLE else "No thumbnail base URL")
+            for event in events:
+                if _is_remote(event.get("image_logo_url")):
+                    event["image_logo_url"] = None
+            return events
+
+        urls = sorted({e["image_logo_url"] for e in events if _is_remote(e.get("image_logo_url"))})
+        if not urls:
+            return events
+
+        logger.info("Ingesting %d distinct image URLs...", len(urls))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            digests = dict(zip(urls, pool.map(self._ingest, urls)))
+
+        used = set()
+        for event in events:
+            url = event.get("image_logo_url")
+            if not _is_remote(url):
+                continue
+            digest = digests.get(url)
+            event["image_logo_url"] = self._reference(digest) if digest else None
+            if digest:
+                used.add(digest)
+
+        self._publish(used)
+        self.evict()
+        self._save_index()
+
+        logger.info(
+            "Images: %d thumbnails (%d downloaded, %d shared content, %d failed, %d not cached)",
+            len(used), self.downloaded, self.deduplicated, self.failed, self.not_cached,
+        )
+        return events
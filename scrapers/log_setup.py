@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Non-blocking logging for the scrapers.
+
+Records are handed to a queue and written by a background listener thread,
+so fetch/parse threads never wait on console I/O. Messages are formatted on
+that thread too (use %-style arguments, not f-strings). Per-event filter
+decisions go to a separate NDJSON audit file, and per-event console lines can
+be sampled down with `console_sample_rate`. Worker processes send their records
+(audit included) back to the parent, see worker_logging().
+
+    python3 log_setup.py summarize .cache/filter_audit.ndjson
+"""
+
+import argparse
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+AUDIT_LOGGER_NAME = "yoroi.audit"
+
+# Pass as `extra=` on per-event log calls so console sampling applies to them
+SAMPLED = {"sampled": True}
+
+audit_logger = logging.getLogger(AUDIT_LOGGER_NAME)
+audit_logger.propagate = False
+audit_logger.setLevel(logging.CRITICAL + 1)  # off until setup_logging() gets an audit_path
+
+_listeners = []
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+class _ForwardingHandler(logging.handlers.QueueHandler):
+    """Worker-process side: sends picklable records to the parent."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if not isinstance(record.msg, dict):  # audit records stay structured
+            record.msg = self.format(record)
+        record.args = None
+        record.exc_info = record.exc_text = None
+        return record
+
+
+class _ReplayHandler(logging.Handler):
+    """Parent side: hands a worker's record to the logger it was emitted on."""
+
+    def handle(self, record):
+        target = logging.getLogger(record.name)
+        if target.isEnabledFor(record.levelno):
+            target.handle(record)
+        return True
+
+
+class _ConsoleSampler(logging.Filter):
+    """Keep every record except a random share of those marked SAMPLED."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if not getattr(record, "sampled", False) or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class _NdjsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {"ts": round(record.created, 3)}
+        data.update(record.msg if isinstance(record.msg, dict) else {"message": record.getMessage()})
+        return json.dumps(data, ensure_ascii=False)
+
+
+def _start_listener(handler: logging.Handler) -> logging.Handler:
+    q = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(q, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return _LazyQueueHandler(q)
+
+
+def setup_logging(level: int = logging.INFO, audit_path: Optional[str] = None,
+                  console_sample_rate: float = 1.0):
+    """
+    Route console logging and the filter audit through background threads.
+
+    Args:
+        level: Console log level
+        audit_path: NDJSON file receiving one line per filter decision
+            (appended; each line carries a run id). None disables the audit
+        console_sample_rate: Share of per-event console lines kept (0..1)
+    """
+    shutdown_logging()
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    queue_handler = _start_listener(console)
+    queue_handler.addFilter(_ConsoleSampler(console_sample_rate))  # dropped before enqueueing
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    for handler in list(audit_logger.handlers):
+        audit_logger.removeHandler(handler)
+    if audit_path:
+        os.makedirs(os.path.dirname(os.path.abspath(audit_path)), exist_ok=True)
+        file_handler = logging.FileHandler(audit_path, encoding="utf-8")
+        file_handler.setFormatter(_NdjsonFormatter())
+        audit_logger.addHandler(_start_listener(file_handler))
+        audit_logger.setLevel(logging.INFO)
+        audit_logger.run_id = time.strftime("%Y%m%dT%H%M%S")
+    else:
+        audit_logger.setLevel(logging.CRITICAL + 1)  # disabled: audit() returns immediately
+
+
+def shutdown_logging():
+    """Flush and stop the background listeners."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(shutdown_logging)
+
+
+@contextmanager
+def worker_logging() -> Iterator[tuple]:
+    """
+    Collect the records of worker processes in this process.
+
+    Yields the arguments to pass to init_worker_logging() in each worker.
+    Their records, filter audit included, go through this process's handlers
+    (console, sampling, audit file). Leave the block after the workers exit
+    so every record is written.
+    """
+    records = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(records, _ReplayHandler())
+    listener.start()
+    audit_run = getattr(audit_logger, "run_id", None) if audit_logger.isEnabledFor(logging.INFO) else None
+    try:
+        yield records, logging.getLogger().level, audit_run
+    finally:
+        listener.stop()
+
+
+def init_worker_logging(records, level: int, audit_run: Optional[str]):
+    """Worker-process initializer: send every record to the parent's worker_logging() queue."""
+    del _listeners[:]  # a forked child has copies of the parent's listeners, not their threads
+    handler = _ForwardingHandler(records)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for existing in list(audit_logger.handlers):
+        audit_logger.removeHandler(existing)
+    if audit_run:
+        audit_logger.addHandler(handler)
+        audit_logger.setLevel(logging.INFO)
+        audit_logger.run_id = audit_run
+    else:
+        audit_logger.setLevel(logging.CRITICAL + 1)
+
+
+def audit(decision: str, stage: str, **fields):
+    """
+    Record one filter decision, e.g. audit("rejected", "sport", title=..., keyword="mma").
+
+    Cheap no-op when no audit file is configured.
+    """
+    if not audit_logger.isEnabledFor(logging.INFO):
+        return
+    record = {"run": getattr(audit_logger, "run_id", None), "decision": decision, "stage": stage}
+    record.update(fields)
+    audit_logger.info(record)
+
+
+def summarize(path: str, run: Optional[str] = None) -> dict:
+    """Count decisions per stage and matched keyword for one run (last run by default)."""
+    with open(path, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    if run is None and rows:
+        run = rows[-1].get("run")
+    rows = [r for r in rows if r.get("run") == run]
+    return {
+        "run": run,
+        "decisions": dict(Counter(f"{r['decision']}:{r['stage']}" for r in rows)),
+        "keywords": dict(Counter(r["keyword"] for r in rows if r.get("keyword")).most_common(20)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the NDJSON filter-decision audit log")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summarize", help="Decision counts for a run")
+    summary.add_argument("path")
+    summary.add_argument("--run", help="Run id (defaults to the last run in the file)")
+    args = parser.parse_args()
+
+    print(json.dumps(summarize(args.path, args.run), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
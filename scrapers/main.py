@@ -2,20 +2,87 @@
 """
 Main script to run the Smoothcomp scraper and generate clean events.json.
 Only grappling events are kept (Jiu-Jitsu, BJJ, Wrestling, Grappling, No-Gi).
+
+Without arguments the whole crawl runs in this process. Large crawls can go
+through a persistent frontier instead:
+
+    python3 main.py seed --frontier crawl.db --shards 4
+    python3 main.py worker --frontier crawl.db --shard 0/4   # one per worker
+    python3 main.py merge --frontier crawl.db
+
+Fetched event pages are archived, so filter changes can be tried offline:
+
+    python3 main.py reprocess --dry-run
 """
 
+import argparse
 import json
 import os
+import socket
+import time
 from datetime import datetime
+
+from http_client import install_dns_cache
+from log_setup import audit, setup_logging
+from page_archive import PageArchive
+from run_budget import BudgetExceeded, RunBudget
+from reprocess import diff_events, load_events, print_diff, reprocess_archive
+from snapshots import NUMPY_AVAILABLE, SNAPSHOTS_DIR, save_snapshot
 from smoothcomp_scraper import SmoothcompScraper
+from image_pipeline import ImagePipeline
+from crawl_frontier import JOURNAL_MODES, CrawlFrontier, parse_shard
+from widget_payloads import load_catalog, write_widget_payloads
+from pipeline import SmoothcompSource, build_event_pipeline
 
 # Output paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 OUTPUT_PATH = os.path.join(PROJECT_ROOT, "src", "data", "events.json")
 
+# Event logo thumbnails (published next to events.json)
+IMAGE_CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache", "images")
+THUMBS_DIR = os.path.join(PROJECT_ROOT, "src", "data", "thumbs")
+THUMB_BASE_URL = os.environ.get("YOROI_THUMB_BASE_URL", "")
 
-def main():
+# Sitemap lastmods and previous results for --sitemap runs
+SITEMAP_STATE_PATH = os.path.join(SCRIPT_DIR, ".cache", "sitemap_state.json")
+
+# Crawl frontier used by the seed/worker/merge commands
+FRONTIER_PATH = os.path.join(SCRIPT_DIR, ".cache", "frontier.db")
+
+# Compressed archive of fetched event pages, read by the reprocess command
+ARCHIVE_DIR = os.path.join(SCRIPT_DIR, ".cache", "pages")
+
+# URLs left unfetched when a --deadline run ran out of time
+SKIPPED_PATH = os.path.join(SCRIPT_DIR, ".cache", "skipped_urls.json")
+
+# One NDJSON line per filter decision (keyword, stage, resolved location)
+AUDIT_LOG_PATH = os.path.join(SCRIPT_DIR, ".cache", "filter_audit.ndjson")
+
+
+def sort_events(events: list) -> list:
+    """Sort events in place by date (earliest first for upcoming events)."""
+    events.sort(key=lambda x: x.get("date_start", ""))
+    return events
+
+
+def write_events(events: list, path: str = OUTPUT_PATH):
+    """Write events as a simple array (app expects this format)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(events, f, ensure_ascii=False, indent=2)
+
+
+def count_by_sport(events: list) -> dict:
+    """Count events per sport for the run summary."""
+    sport_counts = {}
+    for event in events:
+        sport = event.get("sport", "Unknown")
+        sport_counts[sport] = sport_counts.get(sport, 0) + 1
+    return sport_counts
+
+
+def print_banner():
     print("=" * 60)
     print("SMOOTHCOMP SCRAPER - GRAPPLING EVENTS (EUROPE ONLY)")
     print("=" * 60)
@@ -30,27 +97,51 @@ def main():
     print("=" * 60)
     print()
 
-    # Initialize scraper with Europe filter
-    scraper = SmoothcompScraper(europe_only=True)
 
-    # Scrape events (up to 500 to get more European events)
-    print("Starting scrape...")
-    events = scraper.scrape_events(max_events=500)
+def write_skipped(urls: list, deadline: float, path: str = SKIPPED_PATH):
+    """List the URLs a --deadline run did not get to."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"generated_at": datetime.now().isoformat(timespec="seconds"),
+                   "deadline_seconds": deadline, "skipped": urls}, f, ensure_ascii=False, indent=2)
+    if urls:
+        print(f"Deadline reached: {len(urls)} URLs skipped, listed in {path}")
+
+
+def filter_stats(scraper: SmoothcompScraper) -> dict:
+    """This run's filter counters, stored with the snapshot."""
+    return {
+        "accepted": scraper.accepted_count - scraper.location_rejected_count,
+        "sport_rejected": scraper.rejected_count,
+        "location_rejected": scraper.location_rejected_count,
+    }
+
 
+def build_outputs(events: list, run_stats: dict = None, offline: bool = False, run_kind: str = "crawl"):
+    """
+    Post-scrape stages: logos, sort, write events.json, snapshot and print the summary.
+
+    With offline=True logos come from the thumbnail cache only (no downloads).
+    run_kind tags the snapshot ("crawl" or "reprocess") so analytics can tell them apart.
+    """
     if not events:
         print("\nNo events found. The website structure may have changed.")
         print("Creating empty events.json...")
         events = []
 
-    # Sort by date (earliest first for upcoming events)
-    events.sort(key=lambda x: x.get("date_start", ""))
+    # Replace remote logos with small cached thumbnails
+    print("Processing event logos...")
+    ImagePipeline(IMAGE_CACHE_DIR, THUMBS_DIR, base_url=THUMB_BASE_URL, offline=offline).process(events)
 
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    sort_events(events)
+    write_events(events)
 
-    # Write events as a simple array (app expects this format)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(events, f, ensure_ascii=False, indent=2)
+    # Small "next events" files for the widgets and the watch, built from the app catalog
+    write_widget_payloads(load_catalog())
+
+    # Columnar copy of this run for `snapshots.py analytics`
+    if NUMPY_AVAILABLE:
+        print(f"Snapshot: {save_snapshot(events, SNAPSHOTS_DIR, stats=run_stats, kind=run_kind)}")
 
     print(f"\n{'=' * 60}")
     print(f"SUCCESS! Generated {OUTPUT_PATH}")
@@ -58,10 +149,7 @@ def main():
     print(f"{'=' * 60}")
 
     # Print summary of events by sport
-    sport_counts = {}
-    for event in events:
-        sport = event.get("sport", "Unknown")
-        sport_counts[sport] = sport_counts.get(sport, 0) + 1
+    sport_counts = count_by_sport(events)
 
     if sport_counts:
         print("\nEvents by sport:")
@@ -69,5 +157,181 @@ def main():
             print(f"  {sport}: {count}")
 
 
+def run_worker(frontier: CrawlFrontier, scraper: SmoothcompScraper, worker_id: str,
+               shards=None, batch_size: int = 5, poll_seconds: float = 5.0) -> int:
+    """
+    Drain the frontier: claim URLs, fetch and parse them, record outcomes.
+
+    Fetch errors release the URL for a retry; filtered-out events are
+    recorded as done with no result. When the scraper's run budget is spent,
+    the URLs still leased go back to the frontier untouched and the worker
+    stops. Returns the number of URLs processed.
+    """
+    processed = 0
+    while True:
+        if scraper.budget is not None and scraper.budget.expired():
+            print(f"[{worker_id}] run budget spent")
+            break
+        urls = frontier.claim(worker_id, batch_size, shards)
+        if not urls:
+            if frontier.outstanding(shards) == 0:
+                break
+            # Other workers still hold leases; wait in case one of them dies
+            time.sleep(poll_seconds)
+            continue
+
+        for i, url in enumerate(urls):
+            try:
+                html = scraper._fetch_page(url)
+            except BudgetExceeded:
+                frontier.release(urls[i:], worker_id)
+                print(f"[{worker_id}] run budget spent, {len(urls) - i} URLs handed back")
+                return processed
+            except Exception as e:
+                print(f"[{worker_id}] error fetching {url}: {e}")
+                audit("error", "fetch", url=url, error=str(e))
+                frontier.fail(url, worker_id, str(e))
+                continue
+            frontier.complete(url, worker_id, scraper._parse_event_details(url, html))
+            processed += 1
+            if processed % 10 == 0:
+                print(f"[{worker_id}] processed {processed} URLs {frontier.stats()}")
+                time.sleep(0.5)  # Be nice to the server
+
+    return processed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape grappling events into events.json")
+    parser.add_argument("--max-events", type=int, default=500, help="Maximum number of event URLs to process")
+    parser.add_argument("--stream", action="store_true", help="Fetch and parse concurrently through the streaming pipeline")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Concurrent page fetches with --stream or --target")
+    parser.add_argument("--sitemap", action="store_true", help="Discover events from the sitemap and fetch only changed pages")
+    parser.add_argument("--target", type=int, help="Stop once this many events are accepted, fetching likely matches first")
+    parser.add_argument("--deadline", type=float,
+                        help="Run-time budget in seconds; partial results are written when it runs out")
+    parser.add_argument("--no-hedge", action="store_true",
+                        help="With --deadline, do not duplicate requests slower than the observed p95")
+    parser.add_argument("--archive", default=ARCHIVE_DIR, help='Page archive directory ("" to disable)')
+    parser.add_argument("--audit-log", default=AUDIT_LOG_PATH, help='Filter-decision NDJSON file ("" to disable)')
+    parser.add_argument("--console-sample", type=float, default=1.0,
+                        help="Share of per-event ACCEPTED/REJECTED lines printed (0..1)")
+    sub = parser.add_subparsers(dest="command")
+
+    seed = sub.add_parser("seed", help="Queue event URLs in the crawl frontier")
+    seed.add_argument("--frontier", default=FRONTIER_PATH)
+    seed.add_argument("--shards", type=int, default=1, help="Number of hash shards (fixed at creation)")
+
+    worker = sub.add_parser("worker", help="Drain the crawl frontier")
+    worker.add_argument("--frontier", default=FRONTIER_PATH)
+    worker.add_argument("--shard", help='Only claim URLs of this shard, e.g. "0/4"')
+    worker.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    worker.add_argument("--batch-size", type=int, default=5)
+
+    merge = sub.add_parser("merge", help="Build events.json from the crawl frontier")
+    merge.add_argument("--frontier", default=FRONTIER_PATH)
+
+    for frontier_command in (seed, worker, merge):
+        frontier_command.add_argument(
+            "--journal-mode", choices=JOURNAL_MODES, default="delete",
+            help='SQLite journal: "delete" works on network filesystems, "wal" is faster on a single host')
+
+    reprocess = sub.add_parser("reprocess", help="Rebuild outputs from the page archive, without network")
+    reprocess.add_argument("--workers", type=int, help="Parser processes (defaults to the CPU count)")
+    reprocess.add_argument("--dry-run", action="store_true", help="Only show how the accepted set changes")
+    reprocess.add_argument("--include-past", action="store_true", help="Keep events that already took place")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(audit_path=args.audit_log or None, console_sample_rate=args.console_sample)
+    install_dns_cache()
+
+    if args.command == "seed":
+        scraper = SmoothcompScraper(europe_only=True)
+        with CrawlFrontier(args.frontier, num_shards=args.shards, journal_mode=args.journal_mode) as frontier:
+            added = frontier.add_urls(scraper.discover_event_urls(args.max_events))
+            print(f"Queued {added} new URLs in {args.frontier} ({frontier.num_shards} shards)")
+            print(f"Frontier status: {frontier.stats()}")
+        return
+
+    if args.command == "worker":
+        shards = None
+        with CrawlFrontier(args.frontier, journal_mode=args.journal_mode) as frontier:
+            if args.shard:
+                index, total = parse_shard(args.shard)
+                if total != frontier.num_shards:
+                    raise SystemExit(f"Frontier has {frontier.num_shards} shards, got --shard {args.shard}")
+                shards = [index]
+            budget = RunBudget(args.deadline) if args.deadline else None
+            scraper = SmoothcompScraper(europe_only=True, budget=budget, hedge=not args.no_hedge)
+            try:
+                processed = run_worker(frontier, scraper, args.worker_id, shards, args.batch_size)
+            finally:
+                scraper.close()
+            print(f"[{args.worker_id}] done, processed {processed} URLs")
+            print(f"Frontier status: {frontier.stats()}")
+        return
+
+    print_banner()
+
+    if args.command == "merge":
+        with CrawlFrontier(args.frontier, journal_mode=args.journal_mode) as frontier:
+            stats = frontier.stats()
+            print(f"Frontier status: {stats}")
+            if stats["pending"] or stats["leased"]:
+                print("WARNING: frontier not fully drained, merging partial results")
+            events = list(frontier.results())
+        build_outputs(events)
+        return
+
+    if args.command == "reprocess":
+        if not args.archive or not os.path.exists(args.archive):
+            raise SystemExit("No page archive to reprocess, run a scrape first")
+        events, stats = reprocess_archive(
+            args.archive, europe_only=True, workers=args.workers, upcoming_only=not args.include_past
+        )
+        print(f"Reprocessed {stats['pages']} archived pages: {stats}")
+        print_diff(diff_events(load_events(OUTPUT_PATH), events))
+        if not args.dry_run:
+            build_outputs(events, {key: stats[key] for key in ("accepted", "sport_rejected", "location_rejected")},
+                          offline=True, run_kind="reprocess")
+        return
+
+    # Initialize scraper with Europe filter
+    archive = PageArchive(args.archive) if args.archive else None
+    budget = RunBudget(args.deadline) if args.deadline else None
+    scraper = SmoothcompScraper(europe_only=True, archive=archive, budget=budget, hedge=not args.no_hedge,
+                                fetch_workers=args.fetch_workers)
+
+    # Scrape events (up to 500 to get more European events)
+    print("Starting scrape...")
+    if args.sitemap:
+        events = scraper.scrape_from_sitemap(SITEMAP_STATE_PATH, max_events=args.max_events)
+    elif args.stream:
+        events = []
+        pipeline = build_event_pipeline(
+            [SmoothcompSource(scraper, args.max_events)], events.append, fetch_workers=args.fetch_workers
+        )
+        try:
+            for stage, stats in pipeline.run().items():
+                print(f"  {stage:<9} {stats}")
+        finally:
+            scraper.close()
+    else:
+        events = scraper.scrape_events(max_events=args.max_events, target_count=args.target)
+
+    if archive is not None:
+        print(f"Page archive: {archive.stats()}")
+        archive.close()
+
+    if budget is not None:
+        write_skipped(scraper.skipped_urls, args.deadline)
+
+    build_outputs(events, filter_stats(scraper))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,197 @@
+"""
+Append-only archive of fetched event pages.
+
+Every page is zlib-compressed on its own and appended to `pages.z`; an
+offset index (`pages.idx`, one tab-separated line per record) maps URLs to
+their latest copy. Reads go through a memory map of the data file, so a
+reprocess run only touches the pages it decompresses and several processes
+can share the same file through the page cache.
+
+A page whose content did not change since its last copy is not stored again.
+The archive has a single writer: the frontier workers do not write to it.
+Once closed it ignores further appends (a fetch abandoned at the end of a
+run may still complete afterwards).
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+DATA_FILE = "pages.z"
+INDEX_FILE = "pages.idx"
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveEntry(NamedTuple):
+    url: str
+    offset: int
+    length: int
+    fetched_at: float
+    digest: str
+
+
+def _parse_index_line(line: str) -> Optional[ArchiveEntry]:
+    parts = line.rstrip("\n").split("\t")
+    if len(parts) != 5:
+        return None  # torn line from an interrupted run
+    offset, length, fetched_at, digest, url = parts
+    try:
+        return ArchiveEntry(url, int(offset), int(length), float(fetched_at), digest)
+    except ValueError:
+        return None
+
+
+class PageArchive:
+    """Compressed page store with an in-memory URL -> latest record index."""
+
+    def __init__(self, path: str, level: int = 6):
+        """
+        Args:
+            path: Archive directory (created if missing)
+            level: zlib compression level for new records
+        """
+        self.path = path
+        self.level = level
+        os.makedirs(path, exist_ok=True)
+        self._data_path = os.path.join(path, DATA_FILE)
+        self._index_path = os.path.join(path, INDEX_FILE)
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ArchiveEntry] = self._load_index()
+        self._data = None   # append handle, opened on first write
+        self._index = None
+        self._map: Optional[mmap.mmap] = None
+        self._map_file = None
+        self._closed = False
+        self.pages_written = 0
+        self.pages_unchanged = 0
+
+    def _load_index(self) -> Dict[str, ArchiveEntry]:
+        entries = {}
+        try:
+            size = os.path.getsize(self._data_path)
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    entry = _parse_index_line(line)
+                    # Skip records whose data never made it to disk
+                    if entry is not None and entry.offset + entry.length <= size:
+                        entries[entry.url] = entry
+        except OSError:
+            pass
+        return entries
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, url: str, html: str) -> bool:
+        """Store a fetched page. Returns False if the latest copy is identical or the archive is closed."""
+        raw = html.encode("utf-8")
+        digest = hashlib.sha1(raw).hexdigest()
+        previous = self._entries.get(url)
+        if previous is not None and previous.digest == digest:
+            with self._lock:
+                self.pages_unchanged += 1
+            return False
+
+        blob = zlib.compress(raw, self.level)
+        with self._lock:
+            if self._closed:
+                logger.debug("Archive closed, not storing %s", url)
+                return False
+            if self._data is None:
+                self._data = open(self._data_path, "ab")
+                self._index = open(self._index_path, "a", encoding="utf-8")
+            offset = self._data.seek(0, os.SEEK_END)
+            self._data.write(blob)
+            self._data.flush()  # data before index: the index never points past the data
+            entry = ArchiveEntry(url, offset, len(blob), round(time.time(), 3), digest)
+            self._index.write(f"{entry.offset}\t{entry.length}\t{entry.fetched_at}\t{digest}\t{url}\n")
+            self._index.flush()
+            self._entries[url] = entry
+            self.pages_written += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _mapped(self, end: int) -> mmap.mmap:
+        """Memory map of the data file, re-mapped if it grew past `end`."""
+        if self._map is None or len(self._map) < end:
+            if self._data is not None:
+                self._data.flush()
+            self._close_map()
+            self._map_file = open(self._data_path, "rb")
+            self._map = mmap.mmap(self._map_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read(self, entry: ArchiveEntry) -> str:
+        """Decompress one record."""
+        with self._lock:
+            mapped = self._mapped(entry.offset + entry.length)
+            blob = mapped[entry.offset:entry.offset + entry.length]
+        return zlib.decompress(blob).decode("utf-8")
+
+    def get(self, url: str) -> Optional[str]:
+        """Latest archived copy of a page, or None."""
+        entry = self._entries.get(url)
+        return self.read(entry) if entry is not None else None
+
+    def entries(self) -> List[ArchiveEntry]:
+        """Latest record of every URL, in data-file order."""
+        return sorted(self._entries.values(), key=lambda e: e.offset)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Yield (url, html) for the latest copy of every page."""
+        for entry in self.entries():
+            yield entry.url, self.read(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def stats(self) -> dict:
+        try:
+            data_bytes = os.path.getsize(self._data_path)
+        except OSError:
+            data_bytes = 0
+        return {
+            "pages": len(self._entries),
+            "data_bytes": data_bytes,
+            "written": self.pages_written,
+            "unchanged": self.pages_unchanged,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map_file.close()
+            self._map = self._map_file = None
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._close_map()
+            for handle in (self._data, self._index):
+                if handle is not None:
+                    handle.close()
+            self._data = self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Streaming scrape pipeline: discover -> fetch -> parse -> classify -> enrich
+-> dedupe -> sink.
+
+Each stage runs in its own worker thread(s) and hands items to the next one
+through a bounded queue. Stages overlap instead of running one after the
+other, memory stays bounded by the queue sizes, and a slow stage (or sink)
+blocks its producers, so end-to-end throughput is set by the slowest stage.
+
+Scrapers plug in through small source adapters (SmoothcompSource,
+RunningSource) exposing discover/fetch/parse/classify/enrich.
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from http_client import install_dns_cache
+from log_setup import setup_logging
+from run_budget import BudgetExceeded
+from running_scraper import RunningScraper
+from smoothcomp_scraper import SmoothcompScraper
+
+logger = logging.getLogger(__name__)
+
+_END = object()  # end-of-stream marker passed between stages
+
+
+class Stage:
+    """One pipeline step run by `workers` threads reading from a bounded inbox."""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1,
+                 queue_size: int = 64, many: bool = False):
+        """
+        Args:
+            name: Label used in logs and stats
+            func: Called once per item. Returns the output item, or None to drop it
+            workers: Threads running func in parallel (keep 1 for stateful stages)
+            queue_size: Capacity of the inbox; a full inbox blocks the previous stage
+            many: func returns an iterable of output items instead of a single one
+        """
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.many = many
+        self.inbox: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0     # time spent inside func
+        self.blocked_seconds = 0.0  # time waiting on a full downstream queue
+        self._lock = threading.Lock()
+        self._running_workers = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in": self.items_in,
+            "out": self.items_out,
+            "errors": self.errors,
+            "busy_s": round(self.busy_seconds, 3),
+            "blocked_s": round(self.blocked_seconds, 3),
+        }
+
+
+class Pipeline:
+    """Chain of stages between a source iterable and a sink callable."""
+
+    def __init__(self, source: Iterable, stages: List[Stage], sink: Callable[[Any], None]):
+        self.source = source
+        self.stages = stages
+        self.sink = sink
+        self.sink_seconds = 0.0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop every stage as soon as possible (items in flight are dropped)."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _put(self, q: queue.Queue, item) -> Tuple[bool, float]:
+        """Blocking put that gives up on cancel. Returns (delivered, seconds blocked)."""
+        start = time.perf_counter()
+        while not self._cancelled.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True, time.perf_counter() - start
+            except queue.Full:
+                continue
+        return False, time.perf_counter() - start
+
+    def _get(self, q: queue.Queue):
+        while not self._cancelled.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _feed(self, first: queue.Queue):
+        try:
+            for item in self.source:
+                delivered, _ = self._put(first, item)
+                if not delivered:
+                    return
+        except Exception as e:
+            logger.error("Pipeline source failed: %s", e)
+        finally:
+            self._put(first, _END)
+
+    def _work(self, stage: Stage, outbox: queue.Queue):
+        while True:
+            item = self._get(stage.inbox)
+            if item is _END:
+                # Let sibling workers see the marker too
+                self._put(stage.inbox, _END)
+                break
+
+            with stage._lock:
+                stage.items_in += 1
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+                if stage.many:
+                    outputs = list(result or ())
+                else:
+                    outputs = () if result is None else (result,)
+            except Exception as e:
+                logger.error("Stage %s failed on %.120r: %s", stage.name, item, e)
+                with stage._lock:
+                    stage.errors += 1
+                continue
+            finally:
+                with stage._lock:
+                    stage.busy_seconds += time.perf_counter() - start
+
+            for output in outputs:
+                delivered, blocked = self._put(outbox, output)
+                with stage._lock:
+                    stage.blocked_seconds += blocked
+                    stage.items_out += delivered
+                if not delivered:
+                    return
+
+        with stage._lock:
+            stage._running_workers -= 1
+            last = stage._running_workers == 0
+        if last:
+            self._put(outbox, _END)
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """Run to completion (or cancel) and return per-stage stats."""
+        outboxes = [stage.inbox for stage in self.stages[1:]]
+        final: queue.Queue = queue.Queue(maxsize=self.stages[-1].inbox.maxsize if self.stages else 64)
+        outboxes.append(final)
+        first = self.stages[0].inbox if self.stages else final
+
+        threads = [threading.Thread(target=self._feed, args=(first,), name="pipeline-source", daemon=True)]
+        for stage, outbox in zip(self.stages, outboxes):
+            stage._running_workers = stage.workers
+            for i in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, outbox), name=f"pipeline-{stage.name}-{i}", daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        # The sink runs in the caller's thread; when it is slow, `final` fills
+        # up and every upstream stage blocks in turn (backpressure)
+        try:
+            while True:
+                item = self._get(final)
+                if item is _END:
+                    break
+                start = time.perf_counter()
+                self.sink(item)
+                self.sink_seconds += time.perf_counter() - start
+        except BaseException:
+            self.cancel()
+            raise
+        finally:
+            for thread in threads:
+                thread.join(timeout=5)
+
+        stats = {stage.name: stage.stats() for stage in self.stages}
+        stats["sink"] = {"busy_s": round(self.sink_seconds, 3)}
+        return stats
+
+
+# ----------------------------------------------------------------------
+# Source adapters
+# ----------------------------------------------------------------------
+
+class SmoothcompSource:
+    """Smoothcomp event pages: one URL per event."""
+
+    name = "smoothcomp"
+
+    def __init__(self, scraper: SmoothcompScraper, max_events: Optional[int] = None):
+        self.scraper = scraper
+        self.max_events = max_events
+
+    def discover(self) -> Iterator[str]:
+        yield from self.scraper.discover_event_urls(self.max_events)
+
+    def fetch(self, url: str) -> Optional[str]:
+        try:
+            return self.scraper._fetch_page(url)
+        except BudgetExceeded:
+            self.scraper.skipped_urls.append(url)
+            return None
+
+    def parse(self, url: str, html: str) -> Iterator[dict]:
+        fields = self.scraper._extract_event_fields(url, html)
+        if fields is not None:
+            yield fields
+
+    def classify(self, fields: dict) -> bool:
+        return self.scraper._classify_event(fields)
+
+    def enrich(self, fields: dict) -> dict:
+        return self.scraper._build_event(fields)
+
+
+class RunningSource:
+    """Running calendars: one listing page per site, many races per page."""
+
+    name = "running"
+
+    def __init__(self, scraper: RunningScraper):
+        self.scraper = scraper
+
+    def discover(self) -> Iterator[str]:
+        yield from self.scraper.SOURCES
+
+    def fetch(self, site: str) -> Union[str, bytes]:
+        return self.scraper.fetch_html(site)
+
+    def parse(self, site: str, html: Union[str, bytes]) -> Iterator[dict]:
+        yield from getattr(self.scraper, f"parse_{site}")(html)
+
+    def classify(self, race: dict) -> bool:
+        return True  # calendars only list running/trail races
+
+    def enrich(self, race: dict) -> dict:
+        return race
+
+
+def build_event_pipeline(sources: List[Any], sink: Callable[[dict], None],
+                         fetch_workers: int = 4, parse_workers: int = 2,
+                         queue_size: int = 64) -> Pipeline:
+    """
+    Wire one or more source adapters into a single pipeline.
+
+    Items carry their source adapter along, so every stage can call back into
+    the scraper that produced them.
+    """
+
+    def discover_all() -> Iterator[Tuple[Any, str]]:
+        for source in sources:
+            try:
+                for key in source.discover():
+                    yield source, key
+            except Exception as e:
+                logger.error("Discovery failed for %s: %s", source.name, e)
+
+    def fetch(item):
+        source, key = item
+        html = source.fetch(key)
+        return None if html is None else (source, key, html)  # None: skipped by the run budget
+
+    def parse(item):
+        source, key, html = item
+        return [(source, record) for record in source.parse(key, html)]
+
+    def classify(item):
+        source, record = item
+        return item if source.classify(record) else None
+
+    def enrich(item):
+        source, record = item
+        return source.enrich(record)
+
+    seen_ids = set()
+
+    def dedupe(event: dict):
+        if event["id"] in seen_ids:
+            return None
+        seen_ids.add(event["id"])
+        return event
+
+    stages = [
+        Stage("fetch", fetch, workers=fetch_workers, queue_size=queue_size),
+        Stage("parse", parse, workers=parse_workers, queue_size=queue_size, many=True),
+        # Scraper filter counters are plain ints: keep classify single-threaded
+        Stage("classify", classify, queue_size=queue_size),
+        Stage("enrich", enrich, queue_size=queue_size),
+        Stage("dedupe", dedupe, queue_size=queue_size),
+    ]
+    return Pipeline(discover_all(), stages, sink)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream events from all scrapers into an NDJSON file")
+    parser.add_argument("-o", "--output", default="events.ndjson")
+    parser.add_argument("--max-events", type=int, default=500)
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--no-running", action="store_true", help="Skip the running calendars")
+    parser.add_argument("--no-browser", action="store_true", help="Fetch running calendars over plain HTTP")
+    parser.add_argument("--audit-log", help="Write filter decisions to this NDJSON file")
+    parser.add_argument("--console-sample", type=float, default=1.0,
+                        help="Share of per-event ACCEPTED/REJECTED lines printed (0..1)")
+    args = parser.parse_args()
+    setup_logging(audit_path=args.audit_log, console_sample_rate=args.console_sample)
+    install_dns_cache()
+
+    sources = [SmoothcompSource(SmoothcompScraper(europe_only=True), args.max_events)]
+    running = None
+    if not args.no_running:
+        running = RunningScraper(use_browser=not args.no_browser)
+        sources.append(RunningSource(running))
+
+    count = 0
+    try:
+        with open(args.output, "w", encoding="utf-8") as f:
+            def write(event: dict):
+                nonlocal count
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                count += 1
+
+            stats = build_event_pipeline(sources, write, fetch_workers=args.fetch_workers).run()
+    finally:
+        if running is not None:
+            running.close()
+
+    print(f"Streamed {count} events to {args.output}")
+    for name, stage_stats in stats.items():
+        print(f"  {name:<9} {stage_stats}")
+
+
+if __name__ == "__main__":
+    main()
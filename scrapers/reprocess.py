@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Offline reprocessing of the page archive.
+
+Re-runs parsing and classification over every archived event page, with no
+network, split across processes. Each worker memory-maps the archive itself
+and only receives offsets, so nothing but the resulting events (and log and
+audit records, written by the parent) crosses process boundaries. Used by
+`main.py reprocess` to try filter changes (keywords, Europe locations, city
+mappings) in seconds instead of a crawl, without downloading logos.
+
+    python3 reprocess.py .cache/pages --previous ../src/data/events.json
+"""
+
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from log_setup import init_worker_logging, worker_logging
+from page_archive import ArchiveEntry, PageArchive
+from smoothcomp_scraper import SmoothcompScraper
+
+logger = logging.getLogger(__name__)
+
+# Fields compared when reporting changed events
+DIFF_FIELDS = ("title", "date_start", "sport_tag", "federation")
+
+_archive: Optional[PageArchive] = None
+_scraper: Optional[SmoothcompScraper] = None
+
+
+def _init_worker(archive_path: str, europe_only: bool, log_config: tuple):
+    global _archive, _scraper
+    init_worker_logging(*log_config)
+    # Per-event ACCEPTED/REJECTED lines from every process would drown the diff
+    logging.getLogger("smoothcomp_scraper").setLevel(logging.WARNING)
+    _archive = PageArchive(archive_path)
+    _scraper = SmoothcompScraper(europe_only=europe_only)
+
+
+def _process_chunk(entries: List[ArchiveEntry]) -> Tuple[List[dict], Dict[str, int]]:
+    _scraper.rejected_count = _scraper.location_rejected_count = 0
+    events = []
+    for entry in entries:
+        event = _scraper._parse_event_details(entry.url, _archive.read(entry))
+        if event:
+            events.append(event)
+    return events, {"sport_rejected": _scraper.rejected_count,
+                    "location_rejected": _scraper.location_rejected_count}
+
+
+def reprocess_archive(archive_path: str, europe_only: bool = True, workers: Optional[int] = None,
+                      chunk_size: int = 64, upcoming_only: bool = True) -> Tuple[List[dict], dict]:
+    """
+    Parse and classify the latest copy of every archived page.
+
+    Args:
+        archive_path: PageArchive directory
+        workers: Processes to use (defaults to the CPU count)
+        chunk_size: Pages handed to a worker at a time
+        upcoming_only: Drop past events; the archive keeps pages from older runs
+
+    Returns:
+        (events in archive order, deduplicated by id, stats)
+    """
+    with PageArchive(archive_path) as archive:
+        entries = archive.entries()
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+
+    events, seen_ids = [], set()
+    stats = {"pages": len(entries), "sport_rejected": 0, "location_rejected": 0, "past": 0}
+    with worker_logging() as log_config, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                initargs=(archive_path, europe_only, log_config)) as pool:
+        for chunk_events, counts in pool.map(_process_chunk, chunks):
+            for key, value in counts.items():
+                stats[key] += value
+            for event in chunk_events:
+                if event["id"] not in seen_ids:
+                    seen_ids.add(event["id"])
+                    events.append(event)
+
+    if upcoming_only:
+        today = date.today().isoformat()
+        kept = [e for e in events if e.get("date_start", "") >= today]
+        stats["past"] = len(events) - len(kept)
+        events = kept
+    stats["accepted"] = len(events)
+    return events, stats
+
+
+def _diff_key(event: dict) -> tuple:
+    location = event.get("location") or {}
+    return tuple(event.get(f) for f in DIFF_FIELDS) + (location.get("city"), location.get("country"))
+
+
+def diff_events(previous: List[dict], current: List[dict]) -> Dict[str, List[dict]]:
+    """Compare two accepted sets by event id: added, removed and changed events."""
+    before = {e["id"]: e for e in previous}
+    after = {e["id"]: e for e in current}
+    return {
+        "added": [after[i] for i in after if i not in before],
+        "removed": [before[i] for i in before if i not in after],
+        "changed": [after[i] for i in after if i in before and _diff_key(before[i]) != _diff_key(after[i])],
+    }
+
+
+def load_events(path: str) -> List[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def print_diff(diff: Dict[str, List[dict]], limit: int = 20):
+    print(f"Added: {len(diff['added'])}, removed: {len(diff['removed'])}, changed: {len(diff['changed'])}")
+    for label, sign in (("added", "+"), ("removed", "-"), ("changed", "~")):
+        for event in diff[label][:limit]:
+            location = event.get("location") or {}
+            print(f"  {sign} {event['title']} [{event.get('sport_tag')}] - "
+                  f"{location.get('city', '')}, {location.get('country', '')}")
+        if len(diff[label]) > limit:
+            print(f"  {sign} ... {len(diff[label]) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run parsing and filters over the page archive")
+    parser.add_argument("archive", help="PageArchive directory")
+    parser.add_argument("--previous", help="events.json to diff against")
+    parser.add_argument("-o", "--output", help="Write the accepted events to this JSON file")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--include-past", action="store_true")
+    args = parser.parse_args()
+
+    events, stats = reprocess_archive(args.archive, workers=args.workers, upcoming_only=not args.include_past)
+    print(f"Reprocessed {stats}")
+    if args.previous:
+        print_diff(diff_events(load_events(args.previous), events))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(events, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
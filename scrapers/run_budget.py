@@ -0,0 +1,168 @@
+"""
+Run-time budget and hedged page fetches.
+
+A RunBudget is the wall-clock allowance for a whole scrape; request timeouts
+are capped by what is left of it, so no single slow page can outlive the run.
+HedgedFetcher sends a duplicate request when a fetch takes longer than the
+observed p95 latency and returns whichever response arrives first.
+iter_body reads a streamed response body without running past the deadline.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, Optional, Tuple
+
+import requests
+
+from http_client import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+MIN_REQUEST_TIMEOUT = 0.5
+
+
+class BudgetExceeded(Exception):
+    """The run deadline passed before a page could be fetched."""
+
+
+class FetchCancelled(Exception):
+    """The caller stopped wanting the page (e.g. its target was reached) while it downloaded."""
+
+
+class RunBudget:
+    """Wall-clock budget for one run, started on creation."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def request_timeout(self, default: Tuple[float, float] = DEFAULT_TIMEOUT) -> Tuple[float, float]:
+        """(connect, read) timeout for a request starting now."""
+        remaining = max(self.remaining(), MIN_REQUEST_TIMEOUT)
+        return min(default[0], remaining), min(default[1], remaining)
+
+
+def iter_body(response: requests.Response, budget: Optional[RunBudget] = None, url: str = "",
+              chunk_size: int = 64 * 1024, stop: Optional[threading.Event] = None) -> Iterator[bytes]:
+    """
+    Yield a streamed body (Content-Encoding undone) as it arrives. Raises BudgetExceeded, FetchCancelled.
+
+    The read timeout applies to each socket read, so a page trickling in a
+    few bytes at a time would never time out. read1() returns whatever has
+    arrived, and the deadline is checked between reads; a silent server is
+    cut by the read timeout, itself capped by the budget. Setting `stop`
+    abandons the body the same way.
+    """
+    while True:
+        if budget is not None and budget.expired():
+            raise BudgetExceeded(url)
+        if stop is not None and stop.is_set():
+            raise FetchCancelled(url)
+        chunk = response.raw.read1(chunk_size, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+class LatencyTracker:
+    """Sliding window of successful fetch durations."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        """95th percentile, or None until min_samples fetches were seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+class HedgedFetcher:
+    """Calls fetch(url) with a deadline, hedging slow calls with a duplicate."""
+
+    def __init__(self, fetch: Callable[[str], str], budget: RunBudget, max_workers: int = 8,
+                 tracker: Optional[LatencyTracker] = None):
+        """
+        Args:
+            fetch: Page fetch function; raises on failure
+            budget: Run budget; fetch() raises BudgetExceeded once it is spent
+            max_workers: Threads for primary and hedge requests together; size it
+                at twice the caller's concurrent fetches so hedges never queue
+            tracker: Latency history used for the hedge threshold
+        """
+        self._fetch = fetch
+        self.budget = budget
+        self.tracker = tracker or LatencyTracker()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-fetch")
+        self._lock = threading.Lock()
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _timed(self, url: str, started: Optional[threading.Event] = None) -> str:
+        if started is not None:
+            started.set()
+        start = time.monotonic()
+        result = self._fetch(url)
+        self.tracker.record(time.monotonic() - start)
+        return result
+
+    def fetch(self, url: str) -> str:
+        """Return the first successful response. Raises BudgetExceeded or the fetch error."""
+        if self.budget.expired():
+            raise BudgetExceeded(url)
+
+        started = threading.Event()
+        primary = self._pool.submit(self._timed, url, started)
+        hedge = None
+        pending = {primary}
+        hedge_after = self.tracker.p95()
+        # The hedge delay runs from when the primary starts, not while it waits for a thread
+        if hedge_after is not None and started.wait(self.budget.remaining()):
+            done, _ = wait(pending, timeout=min(hedge_after, self.budget.remaining()))
+            if not done and not self.budget.expired():
+                logger.debug("Hedging %s after %.2fs", url, hedge_after)
+                hedge = self._pool.submit(self._timed, url)
+                pending.add(hedge)
+                with self._lock:
+                    self.hedged += 1
+
+        error = None
+        while pending:
+            remaining = self.budget.remaining()
+            if remaining <= 0:
+                raise BudgetExceeded(url)
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self) -> dict:
+        p95 = self.tracker.p95()
+        return {"hedged": self.hedged, "hedge_wins": self.hedge_wins,
+                "p95_s": round(p95, 3) if p95 is not None else None}
+
+    def close(self):
+        # Losing or abandoned requests finish on their own (their timeouts are budget-capped)
+        self._pool.shutdown(wait=False, cancel_futures=True)
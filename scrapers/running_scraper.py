@@ -9,15 +9,75 @@ from bs4 import BeautifulSoup
 import json
 import time
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 import re
 
+from browser_fetcher import BrowserPool, PLAYWRIGHT_AVAILABLE
+from http_client import install_dns_cache, shared_session
+
 class RunningScraper:
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
+    # Sources : 'http' (requests) ou 'browser' (Chromium headless, pour les pages rendues en JS)
+    SOURCES = {
+        'finishers': {
+            'url': 'https://www.finishers.com/course/running',
+            'fetch': 'browser',
+            'wait_selector': 'div.race-card, div.event-card',
+        },
+        'jogging_plus': {
+            'url': 'https://www.jogging-plus.com/calendrier',
+            'fetch': 'http',
+        },
+        'betrail': {
+            'url': 'https://www.betrail.run/calendrier',
+            'fetch': 'http',
+        },
+    }
+
+    def __init__(self, use_browser: bool = True, browser_pages: int = 4,
+                 session: Optional[requests.Session] = None):
+        # Client HTTP partagé (keep-alive, compression, timeouts et en-têtes communs)
+        self.session = session or shared_session()
         self.races = []
+        self.use_browser = use_browser
+        self.browser_pages = browser_pages
+        self._browser: Optional[BrowserPool] = None
+
+    def _get_browser(self) -> Optional[BrowserPool]:
+        """Démarre le pool Chromium à la première utilisation"""
+        if self._browser is None and self.use_browser:
+            if not PLAYWRIGHT_AVAILABLE:
+                print("  ⚠️ Playwright non installé, repli sur HTTP simple")
+                self.use_browser = False
+                return None
+            try:
+                self._browser = BrowserPool(max_pages=self.browser_pages)
+            except Exception as e:
+                print(f"  ⚠️ Chromium indisponible ({e}), repli sur HTTP simple")
+                self.use_browser = False
+                return None
+        return self._browser
+
+    def fetch_html(self, source: str) -> Union[str, bytes]:
+        """Récupère le HTML d'une source selon son mode ('http' ou 'browser')
+
+        En HTTP, renvoie les octets bruts : BeautifulSoup lit le <meta charset>,
+        alors que requests suppose ISO-8859-1 pour un text/html sans charset.
+        """
+        spec = self.SOURCES[source]
+        if spec.get('fetch') == 'browser':
+            browser = self._get_browser()
+            if browser is not None:
+                return browser.fetch(spec['url'], spec.get('wait_selector'))
+
+        response = self.session.get(spec['url'])
+        response.raise_for_status()
+        return response.content
+
+    def close(self):
+        """Ferme le pool Chromium s'il a été démarré"""
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
 
     def clean_text(self, text: str) -> str:
         """Nettoie le texte extrait"""
@@ -37,49 +97,52 @@ class RunningScraper:
         except:
             return date_str
 
+    def parse_finishers(self, html: Union[str, bytes]) -> List[Dict]:
+        """Extrait les courses du HTML de Finishers"""
+        url = self.SOURCES['finishers']['url']
+        soup = BeautifulSoup(html, 'html.parser')
+        races = []
+
+        # Chercher les cartes de courses
+        race_cards = soup.find_all('div', class_=['race-card', 'event-card'])
+
+        for card in race_cards[:50]:  # Limiter à 50 courses
+            try:
+                title_elem = card.find(['h2', 'h3', 'h4'], class_=re.compile('title|name'))
+                date_elem = card.find(['span', 'div', 'time'], class_=re.compile('date'))
+                location_elem = card.find(['span', 'div'], class_=re.compile('location|city|place'))
+                link_elem = card.find('a', href=True)
+
+                if title_elem and date_elem:
+                    race = {
+                        'id': f"finishers_{len(races)}",
+                        'title': self.clean_text(title_elem.get_text()),
+                        'date_start': self.parse_date(self.clean_text(date_elem.get_text())),
+                        'location': {
+                            'city': self.clean_text(location_elem.get_text()) if location_elem else 'France',
+                            'country': 'France',
+                            'full_address': ''
+                        },
+                        'category': 'endurance',
+                        'sport_tag': 'running',
+                        'registration_link': link_elem['href'] if link_elem else url,
+                        'federation': 'Finishers',
+                        'image_logo_url': None
+                    }
+                    races.append(race)
+            except Exception as e:
+                print(f"  ⚠️ Erreur parsing course: {e}")
+                continue
+
+        return races
+
     def scrape_finishers(self) -> List[Dict]:
         """Scrape https://www.finishers.com/"""
         print("🏃 Scraping Finishers.com...")
         races = []
 
         try:
-            url = "https://www.finishers.com/course/running"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Chercher les cartes de courses
-            race_cards = soup.find_all('div', class_=['race-card', 'event-card'])
-
-            for card in race_cards[:50]:  # Limiter à 50 courses
-                try:
-                    title_elem = card.find(['h2', 'h3', 'h4'], class_=re.compile('title|name'))
-                    date_elem = card.find(['span', 'div', 'time'], class_=re.compile('date'))
-                    location_elem = card.find(['span', 'div'], class_=re.compile('location|city|place'))
-                    link_elem = card.find('a', href=True)
-
-                    if title_elem and date_elem:
-                        race = {
-                            'id': f"finishers_{len(races)}",
-                            'title': self.clean_text(title_elem.get_text()),
-                            'date_start': self.parse_date(self.clean_text(date_elem.get_text())),
-                            'location': {
-                                'city': self.clean_text(location_elem.get_text()) if location_elem else 'France',
-                                'country': 'France',
-                                'full_address': ''
-                            },
-                            'category': 'endurance',
-                            'sport_tag': 'running',
-                            'registration_link': link_elem['href'] if link_elem else url,
-                            'federation': 'Finishers',
-                            'image_logo_url': None
-                        }
-                        races.append(race)
-                except Exception as e:
-                    print(f"  ⚠️ Erreur parsing course: {e}")
-                    continue
-
+            races = self.parse_finishers(self.fetch_html('finishers'))
             print(f"  ✅ {len(races)} courses trouvées sur Finishers")
 
         except Exception as e:
@@ -88,48 +151,51 @@ class RunningScraper:
         time.sleep(1)  # Rate limiting
         return races
 
+    def parse_jogging_plus(self, html: Union[str, bytes]) -> List[Dict]:
+        """Extrait les courses du HTML de Jogging-Plus"""
+        url = self.SOURCES['jogging_plus']['url']
+        soup = BeautifulSoup(html, 'html.parser')
+        races = []
+
+        # Chercher les courses
+        race_items = soup.find_all(['div', 'li'], class_=re.compile('race|event|course'))
+
+        for item in race_items[:50]:
+            try:
+                title = item.find(['h2', 'h3', 'h4', 'a'])
+                date = item.find(['time', 'span'], class_=re.compile('date'))
+                location = item.find(['span', 'div'], class_=re.compile('ville|city|lieu'))
+                link = item.find('a', href=True)
+
+                if title and date:
+                    race = {
+                        'id': f"joggingplus_{len(races)}",
+                        'title': self.clean_text(title.get_text()),
+                        'date_start': self.parse_date(self.clean_text(date.get_text())),
+                        'location': {
+                            'city': self.clean_text(location.get_text()) if location else 'France',
+                            'country': 'France',
+                            'full_address': ''
+                        },
+                        'category': 'endurance',
+                        'sport_tag': 'running',
+                        'registration_link': link['href'] if link else url,
+                        'federation': 'Jogging Plus',
+                        'image_logo_url': None
+                    }
+                    races.append(race)
+            except Exception as e:
+                continue
+
+        return races
+
     def scrape_jogging_plus(self) -> List[Dict]:
         """Scrape https://www.jogging-plus.com/"""
         print("🏃 Scraping Jogging-Plus.com...")
         races = []
 
         try:
-            url = "https://www.jogging-plus.com/calendrier"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Chercher les courses
-            race_items = soup.find_all(['div', 'li'], class_=re.compile('race|event|course'))
-
-            for item in race_items[:50]:
-                try:
-                    title = item.find(['h2', 'h3', 'h4', 'a'])
-                    date = item.find(['time', 'span'], class_=re.compile('date'))
-                    location = item.find(['span', 'div'], class_=re.compile('ville|city|lieu'))
-                    link = item.find('a', href=True)
-
-                    if title and date:
-                        race = {
-                            'id': f"joggingplus_{len(races)}",
-                            'title': self.clean_text(title.get_text()),
-                            'date_start': self.parse_date(self.clean_text(date.get_text())),
-                            'location': {
-                                'city': self.clean_text(location.get_text()) if location else 'France',
-                                'country': 'France',
-                                'full_address': ''
-                            },
-                            'category': 'endurance',
-                            'sport_tag': 'running',
-                            'registration_link': link['href'] if link else url,
-                            'federation': 'Jogging Plus',
-                            'image_logo_url': None
-                        }
-                        races.append(race)
-                except Exception as e:
-                    continue
-
+            races = self.parse_jogging_plus(self.fetch_html('jogging_plus'))
             print(f"  ✅ {len(races)} courses trouvées sur Jogging-Plus")
 
         except Exception as e:
@@ -138,47 +204,50 @@ class RunningScraper:
         time.sleep(1)
         return races
 
+    def parse_betrail(self, html: Union[str, bytes]) -> List[Dict]:
+        """Extrait les courses du HTML de BeTrail"""
+        url = self.SOURCES['betrail']['url']
+        soup = BeautifulSoup(html, 'html.parser')
+        races = []
+
+        race_cards = soup.find_all(['div', 'article'], class_=re.compile('trail|race|event'))
+
+        for card in race_cards[:50]:
+            try:
+                title = card.find(['h2', 'h3', 'h4'])
+                date = card.find(['time', 'span'], class_=re.compile('date'))
+                location = card.find(['span', 'div'], class_=re.compile('location|lieu'))
+                link = card.find('a', href=True)
+
+                if title and date:
+                    race = {
+                        'id': f"betrail_{len(races)}",
+                        'title': self.clean_text(title.get_text()),
+                        'date_start': self.parse_date(self.clean_text(date.get_text())),
+                        'location': {
+                            'city': self.clean_text(location.get_text()) if location else 'France',
+                            'country': 'France',
+                            'full_address': ''
+                        },
+                        'category': 'nature',
+                        'sport_tag': 'trail',
+                        'registration_link': link['href'] if link else url,
+                        'federation': 'BeTrail',
+                        'image_logo_url': None
+                    }
+                    races.append(race)
+            except Exception as e:
+                continue
+
+        return races
+
     def scrape_betrail(self) -> List[Dict]:
         """Scrape https://www.betrail.run/"""
         print("🏃 Scraping BeTrail.run...")
         races = []
 
         try:
-            url = "https://www.betrail.run/calendrier"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            race_cards = soup.find_all(['div', 'article'], class_=re.compile('trail|race|event'))
-
-            for card in race_cards[:50]:
-                try:
-                    title = card.find(['h2', 'h3', 'h4'])
-                    date = card.find(['time', 'span'], class_=re.compile('date'))
-                    location = card.find(['span', 'div'], class_=re.compile('location|lieu'))
-                    link = card.find('a', href=True)
-
-                    if title and date:
-                        race = {
-                            'id': f"betrail_{len(races)}",
-                            'title': self.clean_text(title.get_text()),
-                            'date_start': self.parse_date(self.clean_text(date.get_text())),
-                            'location': {
-                                'city': self.clean_text(location.get_text()) if location else 'France',
-                                'country': 'France',
-                                'full_address': ''
-                            },
-                            'category': 'nature',
-                            'sport_tag': 'trail',
-                            'registration_link': link['href'] if link else url,
-                            'federation': 'BeTrail',
-                            'image_logo_url': None
-                        }
-                        races.append(race)
-                except Exception as e:
-                    continue
-
+            races = self.parse_betrail(self.fetch_html('betrail'))
             print(f"  ✅ {len(races)} trails trouvés sur BeTrail")
 
         except Exception as e:
@@ -192,9 +261,12 @@ class RunningScraper:
         print("\n🚀 Démarrage du scraping...\n")
 
         all_races = []
-        all_races.extend(self.scrape_finishers())
-        all_races.extend(self.scrape_jogging_plus())
-        all_races.extend(self.scrape_betrail())
+        try:
+            all_races.extend(self.scrape_finishers())
+            all_races.extend(self.scrape_jogging_plus())
+            all_races.extend(self.scrape_betrail())
+        finally:
+            self.close()
 
         print(f"\n✅ Total: {len(all_races)} courses extraites")
         return all_races
@@ -209,6 +281,7 @@ class RunningScraper:
             print(f"❌ Erreur sauvegarde: {e}")
 
 if __name__ == "__main__":
+    install_dns_cache()
     scraper = RunningScraper()
     races = scraper.scrape_all()
     scraper.save_to_json(races, '../src/data/running_races.json')
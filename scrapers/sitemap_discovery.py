@@ -0,0 +1,222 @@
+"""
+Sitemap-driven event discovery with lastmod-based change detection.
+
+Walks a sitemap index and its child sitemaps (plain or gzip-compressed) as a
+stream, keeps `/event/` URLs and compares each entry's <lastmod> with the
+previous run. Only new or modified pages need fetching; results of unchanged
+pages are carried over from the state file, and child sitemaps whose own
+lastmod did not move are not downloaded at all. A child sitemap's lastmod is
+only saved once every changed page it lists was recorded, so pages left
+unfetched (run cut short, fetch error) are found again on the next run.
+With a RunBudget, sitemap requests are capped by the run deadline and child
+sitemaps left unread when it passes are read again on the next run.
+"""
+
+import itertools
+import json
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import requests
+
+from run_budget import BudgetExceeded, RunBudget, iter_body
+
+logger = logging.getLogger(__name__)
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace: '{ns}loc' -> 'loc'."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapDiscovery:
+    """Incremental URL discovery from a sitemap index."""
+
+    def __init__(self, session: requests.Session, sitemap_url: str, state_path: str,
+                 url_pattern: str = r"/event/", timeout: float = 30, budget: Optional[RunBudget] = None):
+        """
+        Args:
+            session: HTTP session used for sitemap requests
+            sitemap_url: Sitemap index (or a single sitemap)
+            state_path: JSON file remembering lastmods and results between runs
+            url_pattern: Regex an entry's URL must match to be kept
+            timeout: Connect and read timeout of each sitemap request
+            budget: Run budget capping sitemap requests and reads
+        """
+        self.session = session
+        self.sitemap_url = sitemap_url
+        self.state_path = state_path
+        self.url_pattern = re.compile(url_pattern)
+        self.timeout = timeout
+        self.budget = budget
+
+        state = self._load_state()
+        self._sitemaps: Dict[str, str] = state.get("sitemaps", {})
+        self._pages: Dict[str, dict] = state.get("pages", {})
+        self._pages_by_sitemap: Optional[Dict[str, List[str]]] = None
+
+        self._next_sitemaps: Dict[str, str] = {}
+        self._next_pages: Dict[str, dict] = {}
+        self._changed: Dict[str, Tuple[str, Optional[str]]] = {}  # url -> (sitemap, lastmod)
+        self._recorded: Set[str] = set()
+        self.sitemaps_fetched = 0
+        self.sitemaps_skipped = 0
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """
+        Persist sitemap and page lastmods for the next run.
+
+        Child sitemaps with changed pages that were never recorded keep no
+        lastmod, so they are read again and those pages show up as changed.
+        """
+        incomplete = {sitemap for url, (sitemap, _lastmod) in self._changed.items() if url not in self._recorded}
+        sitemaps = {url: lastmod for url, lastmod in self._next_sitemaps.items() if url not in incomplete}
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sitemaps": sitemaps, "pages": self._next_pages}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    # ------------------------------------------------------------------
+    # Streaming sitemap parsing
+    # ------------------------------------------------------------------
+
+    def _iter_entries(self, url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Yield (kind, loc, lastmod) for each <sitemap> or <url> entry.
+
+        The body is parsed while it downloads; gzip files are decompressed on
+        the fly and parsed elements are cleared as soon as they are read.
+        Raises BudgetExceeded if the run deadline passes first.
+        """
+        timeout = self.timeout
+        if self.budget is not None:
+            if self.budget.expired():
+                raise BudgetExceeded(url)
+            timeout = self.budget.request_timeout((self.timeout, self.timeout))
+        with self.session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            self.sitemaps_fetched += 1
+            content_type = response.headers.get("Content-Type", "")
+            gunzip = None
+            if url.endswith(".gz") or "gzip" in content_type:
+                gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+            parser = ET.XMLPullParser(events=("start", "end"))
+            root = None
+            for chunk in itertools.chain(iter_body(response, self.budget, url), [None]):
+                if chunk is not None:
+                    parser.feed(gunzip.decompress(chunk) if gunzip else chunk)
+                else:
+                    if gunzip:
+                        parser.feed(gunzip.flush())
+                    parser.close()
+                for event, elem in parser.read_events():
+                    if event == "start":
+                        if root is None:
+                            root = elem
+                        continue
+                    kind = _local_name(elem.tag)
+                    if kind not in ("sitemap", "url"):
+                        continue
+                    loc = lastmod = None
+                    for child in elem:
+                        name = _local_name(child.tag)
+                        if name == "loc":
+                            loc = (child.text or "").strip()
+                        elif name == "lastmod":
+                            lastmod = (child.text or "").strip() or None
+                    if loc:
+                        yield kind, loc, lastmod
+                    root.clear()  # keep memory flat on large sitemaps
+
+    # ------------------------------------------------------------------
+    # Discovery
+    # ------------------------------------------------------------------
+
+    def _carry_over(self, sitemap: str):
+        """Keep every page of an unchanged child sitemap as it was."""
+        if self._pages_by_sitemap is None:
+            self._pages_by_sitemap = {}
+            for url, page in self._pages.items():
+                self._pages_by_sitemap.setdefault(page.get("sitemap"), []).append(url)
+        for url in self._pages_by_sitemap.get(sitemap, ()):
+            self._next_pages[url] = self._pages[url]
+
+    def _scan_url(self, sitemap: str, loc: str, lastmod: Optional[str]):
+        if not self.url_pattern.search(loc):
+            return
+        previous = self._pages.get(loc)
+        if previous is not None and (lastmod is None or previous.get("lastmod") == lastmod):
+            # Unchanged (or no lastmod to compare against): reuse the previous result
+            self._next_pages[loc] = dict(previous, sitemap=sitemap)
+            return
+        self._changed[loc] = (sitemap, lastmod)
+        if previous is not None:
+            # Keep the old result, with its old lastmod, until the page is re-fetched
+            self._next_pages[loc] = dict(previous, sitemap=sitemap)
+
+    def discover(self) -> List[str]:
+        """Return event URLs that are new or modified since the last run."""
+        children = []
+        for kind, loc, lastmod in self._iter_entries(self.sitemap_url):
+            if kind == "sitemap":
+                children.append((loc, lastmod))
+            else:
+                # The top-level file may be a plain urlset rather than an index
+                self._scan_url(self.sitemap_url, loc, lastmod)
+
+        for index, (child, lastmod) in enumerate(children):
+            self._next_sitemaps[child] = lastmod
+            if lastmod is not None and self._sitemaps.get(child) == lastmod:
+                self.sitemaps_skipped += 1
+                self._carry_over(child)
+                continue
+            try:
+                for kind, loc, page_lastmod in self._iter_entries(child):
+                    if kind == "url":
+                        self._scan_url(child, loc, page_lastmod)
+            except BudgetExceeded:
+                logger.warning("Run budget spent, %d child sitemaps left unread", len(children) - index)
+                # Read again next run, keep their pages meanwhile
+                for unread, _lastmod in children[index:]:
+                    self._next_sitemaps.pop(unread, None)
+                    self._carry_over(unread)
+                break
+            except (requests.RequestException, ET.ParseError, OSError, zlib.error) as e:
+                logger.error("Error reading sitemap %s: %s", child, e)
+                # Retry this sitemap next run, keep its pages meanwhile
+                self._next_sitemaps.pop(child, None)
+                self._carry_over(child)
+
+        unchanged = sum(1 for url in self._next_pages if url not in self._changed)
+        logger.info(
+            "Sitemaps: %d fetched, %d unchanged; event URLs: %d new/modified, %d unchanged",
+            self.sitemaps_fetched, self.sitemaps_skipped, len(self._changed), unchanged,
+        )
+        return list(self._changed)
+
+    def record(self, url: str, event: Optional[dict]):
+        """Store the outcome for a changed URL (None = filtered out)."""
+        sitemap, lastmod = self._changed[url]
+        self._next_pages[url] = {"sitemap": sitemap, "lastmod": lastmod, "event": event}
+        self._recorded.add(url)
+
+    def events(self) -> List[dict]:
+        """Accepted events across unchanged and freshly recorded pages."""
+        return [page["event"] for page in self._next_pages.values() if page.get("event")]
@@ -6,21 +6,33 @@ Filters out striking sports and keeps only grappling/wrestling related events.
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+import codecs
 import re
 import json
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import logging
+import threading
 import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from http_client import install_dns_cache, shared_session
+from log_setup import SAMPLED, audit, setup_logging
+from page_archive import PageArchive
+from run_budget import BudgetExceeded, FetchCancelled, HedgedFetcher, LatencyTracker, RunBudget, iter_body
+from sitemap_discovery import SitemapDiscovery
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+HEAD_END_RE = re.compile(rb"</head\s*>", re.IGNORECASE)
+
 
 class SmoothcompScraper:
     """Scraper for Smoothcomp with strict sport filtering."""
 
     BASE_URL = "https://smoothcomp.com"
     EVENTS_URL = f"{BASE_URL}/en/events/upcoming/search"
+    SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
 
     # Sports to REJECT (striking/non-grappling)
     REJECTED_KEYWORDS = [
@@ -172,17 +184,49 @@ class SmoothcompScraper:
         "kyiv", "lviv", "odessa",
     ]
 
-    def __init__(self, europe_only: bool = False):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9,fr;q=0.8",
-        })
+    def __init__(self, europe_only: bool = False, head_only: bool = True, head_byte_cap: int = 64 * 1024,
+                 archive: Optional[PageArchive] = None, session: Optional[requests.Session] = None,
+                 budget: Optional[RunBudget] = None, hedge: bool = True, fetch_workers: int = 4):
+        """
+        Args:
+            europe_only: Drop events located outside Europe
+            head_only: Read event pages only up to </head> (og:title and the
+                Event JSON-LD live there) and fall back to a full fetch if needed
+            head_byte_cap: Stop reading after receiving this many bytes even without </head>
+            archive: Store every fetched event page here for offline reprocessing
+            session: HTTP session (defaults to the shared pooled client)
+            budget: Wall-clock budget for the run; request timeouts are capped
+                by what is left, reads are cut at the deadline and unfetched
+                pages are listed in skipped_urls
+            hedge: With a budget, re-send event page requests slower than the
+                observed p95 and keep the first response (threads are released
+                by close(), which the scrape_* methods call when done)
+            fetch_workers: Event pages fetched concurrently (target mode, or the
+                callers of _fetch_page); the hedged-fetch pool has twice as many threads
+        """
+        self.session = session or shared_session()
         self.rejected_count = 0
         self.accepted_count = 0
         self.location_rejected_count = 0
         self.europe_only = europe_only
+        self.head_only = head_only
+        self.head_byte_cap = head_byte_cap
+        self.archive = archive
+        self.budget = budget
+        self.skipped_urls: List[str] = []
+        self.hedge = hedge and budget is not None
+        self.fetch_workers = fetch_workers
+        self.hedge_stats: dict = {}
+        self._latency = LatencyTracker()  # outlives each HedgedFetcher, so p95 carries over
+        self._hedger: Optional[HedgedFetcher] = None
+        self._hedger_lock = threading.Lock()
+        self._stop = threading.Event()  # replaced per target-mode run; set to abandon its downloads
+
+        # Transfer stats (fetches may run on several threads)
+        self._fetch_stats_lock = threading.Lock()
+        self.bytes_downloaded = 0
+        self.head_only_pages = 0
+        self.full_pages = 0
 
     def _is_european_location(self, location: str, title: str) -> bool:
         """Check if event location or title indicates a European location."""
@@ -194,46 +238,45 @@ class SmoothcompScraper:
                 return True
         return False
 
-    def _is_rejected_sport(self, title: str) -> bool:
-        """Check if the event title contains a rejected sport keyword."""
+    @staticmethod
+    def _find_keyword(title: str, keywords: List[str]) -> Optional[str]:
+        """Return the first keyword contained in the title, if any."""
         title_lower = title.lower()
-        for keyword in self.REJECTED_KEYWORDS:
+        for keyword in keywords:
             if keyword in title_lower:
-                logger.info(f"REJECTED (contains '{keyword}'): {title}")
-                return True
-        return False
+                return keyword
+        return None
 
-    def _is_accepted_sport(self, title: str) -> bool:
-        """Check if the event title contains an accepted grappling keyword."""
-        title_lower = title.lower()
-        for keyword in self.ACCEPTED_KEYWORDS:
-            if keyword in title_lower:
-                return True
-        return False
-
-    def _should_keep_event(self, title: str) -> bool:
+    def _sport_filter(self, title: str) -> Tuple[bool, Optional[str]]:
         """
-        Determine if an event should be kept based on strict filtering.
+        Strict sport filter. Returns (keep, keyword that decided it).
 
         Logic:
         1. If title contains any REJECTED keyword -> REJECT
         2. If title contains any ACCEPTED keyword -> KEEP
-        3. Otherwise -> REJECT (strict mode)
+        3. Otherwise -> REJECT (strict mode, keyword is None)
         """
         # First check for rejected keywords (takes priority)
-        if self._is_rejected_sport(title):
+        keyword = self._find_keyword(title, self.REJECTED_KEYWORDS)
+        if keyword is not None:
+            logger.info("REJECTED (contains '%s'): %s", keyword, title, extra=SAMPLED)
             self.rejected_count += 1
-            return False
+            return False, keyword
 
         # Then check for accepted keywords
-        if self._is_accepted_sport(title):
+        keyword = self._find_keyword(title, self.ACCEPTED_KEYWORDS)
+        if keyword is not None:
             self.accepted_count += 1
-            return True
+            return True, keyword
 
         # If no match, reject by default (strict filtering)
-        logger.info(f"REJECTED (no grappling keyword found): {title}")
+        logger.info("REJECTED (no grappling keyword found): %s", title, extra=SAMPLED)
         self.rejected_count += 1
-        return False
+        return False, None
+
+    def _should_keep_event(self, title: str) -> bool:
+        """Determine if an event should be kept based on strict filtering."""
+        return self._sport_filter(title)[0]
 
     def _determine_sport_type(self, title: str) -> str:
         """Determine the specific sport type from title."""
@@ -395,136 +438,489 @@ class SmoothcompScraper:
 
     def _extract_events_from_jsonld(self, html: str) -> List[str]:
         """Extract event URLs from JSON-LD structured data."""
+        return [entry["url"] for entry in self._extract_listing_entries(html)]
+
+    def _extract_listing_entries(self, html: str) -> List[dict]:
+        """
+        Extract event entries from the listing's ItemList JSON-LD.
+
+        Besides the URL, keeps whatever hints the listing exposes (name,
+        location, startDate) so pages can be prioritised before fetching.
+        """
         soup = BeautifulSoup(html, "html.parser")
         script_tags = soup.find_all("script", type="application/ld+json")
 
-        event_urls = []
+        entries = []
         for script in script_tags:
             try:
                 data = json.loads(script.string)
                 if data.get("@type") == "ItemList" and "itemListElement" in data:
                     for item in data["itemListElement"]:
-                        if "url" in item:
-                            event_urls.append(item["url"])
-            except (json.JSONDecodeError, TypeError):
+                        nested = item.get("item") if isinstance(item.get("item"), dict) else {}
+                        url = item.get("url") or nested.get("url")
+                        if not url:
+                            continue
+                        location = nested.get("location", "")
+                        if isinstance(location, dict):
+                            address = location.get("address", "")
+                            if isinstance(address, dict):
+                                address = " ".join(str(v) for v in address.values() if isinstance(v, str))
+                            location = f"{location.get('name', '')} {address}".strip()
+                        entries.append({
+                            "url": url,
+                            "name": item.get("name") or nested.get("name") or "",
+                            "location": location if isinstance(location, str) else "",
+                            "start_date": nested.get("startDate") or "",
+                        })
+            except (json.JSONDecodeError, TypeError, AttributeError):
                 continue
 
-        return event_urls
+        return entries
 
-    def _fetch_event_details(self, url: str) -> Optional[dict]:
-        """Fetch and parse individual event details."""
+    def _listing_score(self, entry: dict, today: Optional[datetime] = None) -> float:
+        """
+        Cheap likelihood that a listing entry ends up accepted.
+
+        Uses only listing-level hints: sport keywords in the name, a European
+        place in the name/location, and how soon the event starts. No logging
+        and no counters, unlike the real filters.
+        """
+        text = f"{entry.get('name', '')} {entry.get('location', '')}".lower()
+        score = 0.0
+
+        if any(keyword in text for keyword in self.REJECTED_KEYWORDS):
+            score -= 3.0
+        elif any(keyword in text for keyword in self.ACCEPTED_KEYWORDS):
+            score += 2.0
+
+        if self.europe_only and any(loc in text for loc in self.EUROPE_LOCATIONS):
+            score += 1.0
+
+        start = entry.get("start_date", "")[:10]
+        if re.match(r"\d{4}-\d{2}-\d{2}$", start):
+            today = today or datetime.now()
+            days = (datetime.strptime(start, "%Y-%m-%d") - today).days
+            # Upcoming events first, the sooner the better; past ones last
+            score += -1.0 if days < 0 else 1.0 / (1.0 + days / 30.0)
+
+        return score
+
+    def _extract_image_url(self, soup: BeautifulSoup, jsonld_image=None) -> Optional[str]:
+        """Get the event logo URL from og:image, falling back to JSON-LD image."""
+        og_image = soup.find("meta", property="og:image")
+        if og_image and og_image.get("content"):
+            return og_image["content"]
+
+        # JSON-LD image can be a string, a list or an ImageObject
+        if isinstance(jsonld_image, list):
+            jsonld_image = jsonld_image[0] if jsonld_image else None
+        if isinstance(jsonld_image, dict):
+            jsonld_image = jsonld_image.get("url")
+        if isinstance(jsonld_image, str) and jsonld_image:
+            return jsonld_image
+        return None
+
+    def _count_transfer(self, nbytes: int, head_only: bool):
+        with self._fetch_stats_lock:
+            self.bytes_downloaded += nbytes
+            if head_only:
+                self.head_only_pages += 1
+            else:
+                self.full_pages += 1
+
+    def _request_timeout(self):
+        """Per-request timeout: the client default, capped by the run budget."""
+        return self.budget.request_timeout() if self.budget is not None else None
+
+    @staticmethod
+    def _decode(data: bytes, encoding: Optional[str]) -> str:
         try:
-            response = self.session.get(url, timeout=30)
+            codecs.lookup(encoding or "utf-8")
+        except LookupError:  # e.g. charset=utf8mb4
+            encoding = None
+        return data.decode(encoding or "utf-8", errors="replace")
+
+    def _read_page(self, url: str, stop: Optional[threading.Event] = None) -> Tuple[str, int]:
+        """
+        Download a page. Returns (html, bytes received). Raises requests.RequestException, BudgetExceeded.
+
+        Transfer sizes are wire bytes (raw.tell()): the shared session
+        negotiates gzip/br, so the decoded body is larger than what was sent.
+        """
+        body = bytearray()
+        with self.session.get(url, timeout=self._request_timeout(), stream=True) as response:
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            for chunk in iter_body(response, self.budget, url, stop=stop):
+                body.extend(chunk)
+            encoding = response.encoding
+            received = response.raw.tell()
+        return self._decode(body, encoding), received
+
+    def _get_page(self, url: str) -> str:
+        """Fetch a page and return its HTML. Raises requests.RequestException."""
+        html, nbytes = self._read_page(url)
+        self._count_transfer(nbytes, head_only=False)
+        return html
+
+    def _read_page_head(self, url: str, stop: Optional[threading.Event] = None) -> Tuple[str, bool, int]:
+        """
+        Stream a page until </head> (or head_byte_cap bytes received) and close the connection.
 
-            # Extract title - prioritize og:title as it's most reliable
-            title = ""
-            og_title = soup.find("meta", property="og:title")
-            if og_title:
-                title = og_title.get("content", "")
+        Returns (html prefix, whether </head> was reached, bytes received).
+        """
+        buffer = bytearray()
+        head_closed = False
+        with self.session.get(url, timeout=self._request_timeout(), stream=True) as response:
+            response.raise_for_status()
+            for chunk in iter_body(response, self.budget, url, chunk_size=8192, stop=stop):
+                search_from = max(0, len(buffer) - 8)  # tag may straddle chunks
+                buffer.extend(chunk)
+                if HEAD_END_RE.search(buffer, search_from):
+                    head_closed = True
+                    break
+                if response.raw.tell() >= self.head_byte_cap:
+                    break
+            encoding = response.encoding
+            received = response.raw.tell()
+        # Leaving the with-block drops the rest of the body unread
+        return self._decode(buffer, encoding), head_closed, received
+
+    def _head_has_metadata(self, head_html: str) -> bool:
+        """True if og:title and an Event JSON-LD block are both in the head."""
+        soup = BeautifulSoup(head_html, "html.parser")
+        og_title = soup.find("meta", property="og:title")
+        if not og_title or not og_title.get("content"):
+            return False
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                if json.loads(script.string).get("@type") == "Event":
+                    return True
+            except (json.JSONDecodeError, TypeError, AttributeError):
+                continue
+        return False
 
-            # Fallback to h1
-            if not title:
-                h1_elem = soup.select_one("h1")
-                if h1_elem:
-                    title = h1_elem.get_text(strip=True)
+    def _download_event_page(self, url: str) -> Tuple[str, int, int]:
+        """
+        Download an event page, reading only its <head> when that is enough.
 
-            if not title:
-                return None
+        Returns (html, head bytes, full-page bytes). Nothing is counted or
+        archived here, so a download whose result is dropped leaves no trace.
+        Raises FetchCancelled once the target-mode run it belongs to is over.
+        """
+        stop = self._stop
+        head_bytes = 0
+        if self.head_only:
+            head_html, head_closed, head_bytes = self._read_page_head(url, stop)
+            if head_closed and self._head_has_metadata(head_html):
+                return head_html, head_bytes, 0
+            logger.debug("Head metadata incomplete, full fetch: %s", url)
+        if stop.is_set():
+            raise FetchCancelled(url)
+        html, full_bytes = self._read_page(url, stop)
+        return html, head_bytes, full_bytes
+
+    def _record_page(self, url: str, page: Tuple[str, int, int]) -> str:
+        """Count the transfer of a downloaded page and archive it. Returns its HTML."""
+        html, head_bytes, full_bytes = page
+        if head_bytes:
+            self._count_transfer(head_bytes, head_only=True)
+        if full_bytes:
+            self._count_transfer(full_bytes, head_only=False)
+        if self.archive is not None:
+            self.archive.append(url, html)
+        return html
+
+    def _get_event_page(self, url: str) -> str:
+        """Fetch an event page, reading only its <head> when that is enough."""
+        return self._record_page(url, self._download_event_page(url))
+
+    def _download_page(self, url: str) -> Tuple[str, int, int]:
+        """Download an event page within the run budget (hedged if enabled). Raises BudgetExceeded."""
+        if self.budget is not None and self.budget.expired():
+            raise BudgetExceeded(url)
+        if self.hedge:
+            return self._get_hedger().fetch(url)
+        return self._download_event_page(url)
+
+    def _get_hedger(self) -> HedgedFetcher:
+        with self._hedger_lock:
+            if self._hedger is None:
+                self._hedger = HedgedFetcher(self._download_event_page, self.budget,
+                                             max_workers=2 * self.fetch_workers, tracker=self._latency)
+            return self._hedger
+
+    def close(self):
+        """Release the hedged-fetch threads; they are started again if the scraper fetches more pages."""
+        with self._hedger_lock:
+            hedger, self._hedger = self._hedger, None
+        if hedger is not None:
+            self.hedge_stats = hedger.stats()
+            hedger.close()
+
+    def _fetch_page(self, url: str) -> str:
+        """Fetch and record an event page within the run budget. Raises BudgetExceeded."""
+        return self._record_page(url, self._download_page(url))
+
+    def _skip_remaining(self, urls: List[str]):
+        """Record pages left unfetched when the run budget ran out."""
+        if urls:
+            logger.warning("Run budget of %.0fs spent, skipping %d URLs", self.budget.seconds, len(urls))
+            self.skipped_urls.extend(urls)
 
-            # STRICT FILTERING
-            if not self._should_keep_event(title):
-                return None
+    def _fetch_event_details(self, url: str) -> Optional[dict]:
+        """Fetch and parse individual event details. Raises BudgetExceeded."""
+        try:
+            return self._parse_event_details(url, self._fetch_page(url))
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            logger.error("Error fetching %s: %s", url, e)
+            audit("error", "fetch", url=url, error=str(e))
+            return None
 
-            # Extract date and location from JSON-LD first (most reliable)
-            date_str = ""
-            location = ""
-            country = ""
+    def _parse_event_details(self, url: str, html: str) -> Optional[dict]:
+        """Parse an event page. Returns None if the event is filtered out."""
+        try:
+            fields = self._extract_event_fields(url, html)
+            if fields is None or not self._classify_event(fields):
+                return None
+            return self._build_event(fields)
+        except Exception as e:
+            logger.error("Error parsing %s: %s", url, e)
+            audit("error", "parse", url=url, error=str(e))
+            return None
 
-            for script in soup.find_all("script", type="application/ld+json"):
-                try:
-                    data = json.loads(script.string)
-                    if data.get("@type") == "Event":
-                        if "startDate" in data:
-                            date_str = data["startDate"]
-                        if "location" in data:
-                            loc_data = data["location"]
-                            if isinstance(loc_data, dict):
-                                if "name" in loc_data:
-                                    location = loc_data["name"]
-                                if "address" in loc_data:
-                                    addr = loc_data["address"]
-                                    if isinstance(addr, dict):
-                                        country = addr.get("addressCountry", "")
-                                        city = addr.get("addressLocality", "")
-                                        if city:
-                                            location = f"{city}, {country}" if country else city
-                                    elif isinstance(addr, str):
-                                        location = addr
-                            elif isinstance(loc_data, str):
-                                location = loc_data
-                        break
-                except (json.JSONDecodeError, TypeError):
-                    continue
+    def _extract_event_fields(self, url: str, html: str) -> Optional[dict]:
+        """Extract raw title/date/location/image fields from an event page."""
+        soup = BeautifulSoup(html, "html.parser")
 
-            # Fallback date extraction
-            if not date_str:
-                date_elem = soup.select_one("time, [datetime], .event-date, .date")
-                if date_elem:
-                    date_str = date_elem.get("datetime") or date_elem.get_text(strip=True)
-
-            # Fallback location extraction
-            if not location:
-                location_elem = soup.select_one(".location, .venue, [class*='location'], [class*='venue']")
-                if location_elem:
-                    location = location_elem.get_text(strip=True)
-
-            # Apply Europe filter if enabled
-            if self.europe_only:
-                if not self._is_european_location(location + " " + country, title):
-                    logger.info(f"REJECTED (not in Europe): {title} [{location}]")
-                    self.location_rejected_count += 1
-                    return None
-
-            sport = self._determine_sport_type(title)
-            sport_tag = self._get_sport_tag(title)
-
-            # Parse city and country from location
-            city, country_name = self._parse_location(location, title)
-
-            # Parse date to ISO format
-            date_iso = self._parse_date(date_str)
-
-            event_data = {
-                "id": self._generate_id(title, url),
-                "title": title,
-                "date_start": date_iso,
-                "location": {
-                    "city": city,
-                    "country": country_name,
-                    "full_address": location,
-                },
-                "category": "combat",  # All grappling is combat
-                "sport_tag": sport_tag,
-                "registration_link": url,
-                "federation": sport,
-                "image_logo_url": None,
-            }
+        # Extract title - prioritize og:title as it's most reliable
+        title = ""
+        og_title = soup.find("meta", property="og:title")
+        if og_title:
+            title = og_title.get("content", "")
 
-            logger.info(f"ACCEPTED: {title} [{sport_tag}] - {city}, {country_name}")
-            return event_data
+        # Fallback to h1
+        if not title:
+            h1_elem = soup.select_one("h1")
+            if h1_elem:
+                title = h1_elem.get_text(strip=True)
 
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
+        if not title:
             return None
 
-    def scrape_events(self, max_events: int = 300) -> list:
+        # Extract date and location from JSON-LD first (most reliable)
+        date_str = ""
+        location = ""
+        country = ""
+        jsonld_image = None
+
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                data = json.loads(script.string)
+                if data.get("@type") == "Event":
+                    if "startDate" in data:
+                        date_str = data["startDate"]
+                    jsonld_image = data.get("image")
+                    if "location" in data:
+                        loc_data = data["location"]
+                        if isinstance(loc_data, dict):
+                            if "name" in loc_data:
+                                location = loc_data["name"]
+                            if "address" in loc_data:
+                                addr = loc_data["address"]
+                                if isinstance(addr, dict):
+                                    country = addr.get("addressCountry", "")
+                                    city = addr.get("addressLocality", "")
+                                    if city:
+                                        location = f"{city}, {country}" if country else city
+                                elif isinstance(addr, str):
+                                    location = addr
+                        elif isinstance(loc_data, str):
+                            location = loc_data
+                    break
+            except (json.JSONDecodeError, TypeError):
+                continue
+
+        # Fallback date extraction
+        if not date_str:
+            date_elem = soup.select_one("time, [datetime], .event-date, .date")
+            if date_elem:
+                date_str = date_elem.get("datetime") or date_elem.get_text(strip=True)
+
+        # Fallback location extraction
+        if not location:
+            location_elem = soup.select_one(".location, .venue, [class*='location'], [class*='venue']")
+            if location_elem:
+                location = location_elem.get_text(strip=True)
+
+        return {
+            "url": url,
+            "title": title,
+            "date_str": date_str,
+            "location": location,
+            "country": country,
+            "image_url": self._extract_image_url(soup, jsonld_image),
+        }
+
+    def _classify_event(self, fields: dict) -> bool:
+        """
+        Apply the sport filter, then the Europe filter if enabled.
+
+        Records the deciding keyword and, for rejected events, the rejecting
+        stage ("sport" or "location") in fields.
+        """
+        title = fields["title"]
+
+        # STRICT FILTERING
+        keep, keyword = self._sport_filter(title)
+        fields["keyword"] = keyword
+        if not keep:
+            fields["rejected_by"] = "sport"
+            audit("rejected", "sport", url=fields["url"], title=title, keyword=keyword)
+            return False
+
+        # Apply Europe filter if enabled
+        if self.europe_only:
+            location = fields["location"]
+            if not self._is_european_location(location + " " + fields["country"], title):
+                logger.info("REJECTED (not in Europe): %s [%s]", title, location, extra=SAMPLED)
+                audit("rejected", "location", url=fields["url"], title=title, keyword=keyword,
+                      location=location, country=fields["country"])
+                fields["rejected_by"] = "location"
+                self.location_rejected_count += 1
+                return False
+
+        return True
+
+    def _make_event(self, fields: dict) -> dict:
+        """Turn raw fields into a SportEvent dict, without logging or auditing."""
+        title = fields["title"]
+        location = fields["location"]
+
+        sport = self._determine_sport_type(title)
+        sport_tag = self._get_sport_tag(title)
+
+        # Parse city and country from location
+        city, country_name = self._parse_location(location, title)
+
+        # Parse date to ISO format
+        date_iso = self._parse_date(fields["date_str"])
+
+        event_data = {
+            "id": self._generate_id(title, fields["url"]),
+            "title": title,
+            "date_start": date_iso,
+            "location": {
+                "city": city,
+                "country": country_name,
+                "full_address": location,
+            },
+            "category": "combat",  # All grappling is combat
+            "sport_tag": sport_tag,
+            "registration_link": fields["url"],
+            "federation": sport,
+            "image_logo_url": fields["image_url"],
+        }
+        return event_data
+
+    def _build_event(self, fields: dict) -> dict:
+        """Turn accepted raw fields into a SportEvent dict, logging and auditing the acceptance."""
+        event = self._make_event(fields)
+        title, sport_tag, location = event["title"], event["sport_tag"], event["location"]
+        logger.info("ACCEPTED: %s [%s] - %s, %s", title, sport_tag, location["city"], location["country"],
+                    extra=SAMPLED)
+        audit("accepted", "build", url=fields["url"], title=title, keyword=fields.get("keyword"),
+              sport_tag=sport_tag, city=location["city"], country=location["country"])
+        return event
+
+    def discover_listing_entries(self, max_events: Optional[int] = None) -> List[dict]:
+        """Fetch the upcoming events listing and return its entries (url + hints)."""
+        logger.info("Fetching event list from Smoothcomp...")
+        entries = self._extract_listing_entries(self._get_page(self.EVENTS_URL))
+        logger.info("Found %d event URLs", len(entries))
+        return entries[:max_events] if max_events else entries
+
+    def discover_event_urls(self, max_events: Optional[int] = None) -> List[str]:
+        """Fetch the upcoming events listing and return event page URLs."""
+        return [entry["url"] for entry in self.discover_listing_entries(max_events)]
+
+    def _scrape_until_target(self, entries: List[dict], target_count: int, workers: int) -> list:
+        """
+        Fetch pages in priority order until target_count events are accepted.
+
+        At most `workers` requests are in flight; a new one is only issued when
+        one completes and the target is still unmet, with a short pause every
+        10 requests. Once the target is reached (or the run budget is spent),
+        queued fetches are cancelled and in-flight downloads (hedges included)
+        stop at their next read. Pages are counted and archived here, on the
+        calling thread, so an abandoned fetch never reaches the archive.
+        """
+        ordered = sorted(entries, key=self._listing_score, reverse=True)  # stable: ties keep listing order
+        accepted = []
+        requested = 0
+
+        stop = self._stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            in_flight = {}
+
+            def submit_next():
+                nonlocal requested
+                if requested < len(ordered) and not (self.budget is not None and self.budget.expired()):
+                    if requested > 0 and requested % 10 == 0:
+                        time.sleep(0.5)  # Be nice to the server
+                    url = ordered[requested]["url"]
+                    in_flight[pool.submit(self._download_page, url)] = url
+                    requested += 1
+
+            for _ in range(workers):
+                submit_next()
+
+            while in_flight and len(accepted) < target_count:
+                timeout = self.budget.remaining() if self.budget is not None else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break  # run budget spent
+                for future in done:
+                    url = in_flight.pop(future)
+                    try:
+                        html = self._record_page(url, future.result())
+                    except BudgetExceeded:
+                        self.skipped_urls.append(url)
+                    except Exception as e:
+                        # Any failure (network, undecodable page...) only loses this page
+                        logger.error("Error fetching %s: %s", url, e)
+                        audit("error", "fetch", url=url, error=str(e))
+                    else:
+                        # Parsing runs here, on one thread, so filter counters stay consistent
+                        event_data = self._parse_event_details(url, html)
+                        if event_data and len(accepted) < target_count:
+                            accepted.append(event_data)
+                    if len(accepted) < target_count:
+                        submit_next()
+
+            if len(accepted) < target_count and self.budget is not None and self.budget.expired():
+                self._skip_remaining(list(in_flight.values()) + [e["url"] for e in ordered[requested:]])
+        finally:
+            # Do not wait for in-flight fetches: they stop at their next read and their results are discarded
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        logger.info("Target %d: accepted %d events using %d/%d requests", target_count, len(accepted), requested, len(ordered))
+        return accepted
+
+    def scrape_events(self, max_events: int = 300, target_count: Optional[int] = None,
+                      workers: Optional[int] = None) -> list:
         """
         Scrape events from Smoothcomp with strict filtering.
 
         Args:
             max_events: Maximum number of events to process
+            target_count: If set, fetch the most promising pages first and stop
+                as soon as this many events have been accepted
+            workers: Concurrent page fetches when target_count is set
+                (defaults to fetch_workers)
 
         Returns:
             List of filtered event dictionaries (grappling only)
@@ -533,45 +929,109 @@ class SmoothcompScraper:
         self.rejected_count = 0
         self.accepted_count = 0
 
-        logger.info("Fetching event list from Smoothcomp...")
-
         try:
-            response = self.session.get(self.EVENTS_URL, timeout=30)
-            response.raise_for_status()
+            if target_count is not None:
+                entries = self.discover_listing_entries(max_events)
+                all_events = self._scrape_until_target(entries, target_count, workers or self.fetch_workers)
+            else:
+                event_urls = self.discover_event_urls(max_events)
+
+                # Process each event
+                for i, url in enumerate(event_urls):
+                    if i > 0 and i % 10 == 0:
+                        logger.info("Processed %d/%d events...", i, len(event_urls))
+                        time.sleep(0.5)  # Be nice to the server
+
+                    try:
+                        event_data = self._fetch_event_details(url)
+                    except BudgetExceeded:
+                        # Deadline: keep what was accepted so far
+                        self._skip_remaining(event_urls[i:])
+                        break
+                    if event_data:
+                        all_events.append(event_data)
 
-            # Extract event URLs from JSON-LD
-            event_urls = self._extract_events_from_jsonld(response.text)
-            logger.info(f"Found {len(event_urls)} event URLs")
+        except BudgetExceeded:
+            logger.warning("Run budget spent while reading the event listing")
+        except requests.RequestException as e:
+            logger.error("Error fetching events: %s", e)
+        finally:
+            self.close()
+
+        logger.info("\n%s", "=" * 50)
+        logger.info("SCRAPING COMPLETE")
+        logger.info("Total ACCEPTED: %d", len(all_events))
+        logger.info("Sport filter rejected: %d", self.rejected_count)
+        if self.europe_only:
+            logger.info("Location filter rejected: %d", self.location_rejected_count)
+        logger.info(
+            "Downloaded %.0f KB (%d head-only pages, %d full pages)",
+            self.bytes_downloaded / 1024, self.head_only_pages, self.full_pages,
+        )
+        if self.budget is not None:
+            logger.info("Skipped by run budget: %d URLs", len(self.skipped_urls))
+        if self.hedge:
+            logger.info("Hedged requests: %s", self.hedge_stats)
+        logger.info("%s\n", "=" * 50)
 
-            # Limit to max_events
-            event_urls = event_urls[:max_events]
+        return all_events
 
-            # Process each event
-            for i, url in enumerate(event_urls):
-                if i > 0 and i % 10 == 0:
-                    logger.info(f"Processed {i}/{len(event_urls)} events...")
-                    time.sleep(0.5)  # Be nice to the server
+    def scrape_from_sitemap(self, state_path: str, max_events: Optional[int] = None) -> list:
+        """
+        Scrape only events that are new or changed according to the sitemap.
 
-                event_data = self._fetch_event_details(url)
-                if event_data:
-                    all_events.append(event_data)
+        Results of unchanged pages come from the previous run's state file, so
+        the returned list still covers every event listed in the sitemap.
 
-        except requests.RequestException as e:
-            logger.error(f"Error fetching events: {e}")
+        Args:
+            state_path: JSON file holding sitemap lastmods and previous results
+            max_events: Maximum number of changed pages to fetch this run
+        """
+        self.rejected_count = 0
+        self.accepted_count = 0
 
-        logger.info(f"\n{'='*50}")
-        logger.info(f"SCRAPING COMPLETE")
-        logger.info(f"Total ACCEPTED: {len(all_events)}")
-        logger.info(f"Sport filter rejected: {self.rejected_count}")
-        if self.europe_only:
-            logger.info(f"Location filter rejected: {self.location_rejected_count}")
-        logger.info(f"{'='*50}\n")
+        discovery = SitemapDiscovery(self.session, self.SITEMAP_URL, state_path, budget=self.budget)
+        try:
+            try:
+                changed_urls = discovery.discover()
+            except BudgetExceeded:
+                logger.warning("Run budget spent while reading the sitemap index")
+                return []
+            except (requests.RequestException, ET.ParseError) as e:
+                logger.error("Error reading sitemap index: %s", e)
+                return []
+
+            changed_urls = changed_urls[:max_events] if max_events else changed_urls
+            for i, url in enumerate(changed_urls):
+                if i > 0 and i % 10 == 0:
+                    logger.info("Processed %d/%d changed events...", i, len(changed_urls))
+                    time.sleep(0.5)  # Be nice to the server
 
-        return all_events
+                try:
+                    html = self._fetch_page(url)
+                except BudgetExceeded:
+                    # Not recorded: their sitemap is read again next run and they show up as changed
+                    self._skip_remaining(changed_urls[i:])
+                    break
+                except Exception as e:
+                    # Not recorded: retried next run, like pages beyond max_events
+                    logger.error("Error fetching %s: %s", url, e)
+                    audit("error", "fetch", url=url, error=str(e))
+                    continue
+                discovery.record(url, self._parse_event_details(url, html))
+        finally:
+            self.close()
+
+        discovery.save()
+        events = discovery.events()
+        logger.info("Sitemap scrape: fetched %d changed pages, %d events in total", len(changed_urls), len(events))
+        return events
 
 
 # For testing
 if __name__ == "__main__":
+    setup_logging()
+    install_dns_cache()
     scraper = SmoothcompScraper()
     events = scraper.scrape_events(max_events=50)
 
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Columnar per-run snapshots of the accepted events, and analytics over them.
+
+Each run is saved as one compressed NumPy archive (.npz): string columns are
+dictionary-encoded (small integer codes + a vocabulary), dates are
+datetime64 and event ids are stored as 64-bit hashes. Loading months of
+snapshots reads a few arrays per run instead of re-parsing JSON, and every
+metric (counts per sport / country / month, source coverage, churn between
+runs, acceptance rate) is computed with array operations.
+
+Snapshots are tagged with the kind of run that wrote them: a `reprocess`
+run re-filters archived pages instead of crawling, so analytics only load
+`crawl` runs unless asked otherwise (older, untagged snapshots are crawls).
+
+    python3 snapshots.py save ../src/data/events.json     # backfill from a JSON file
+    python3 snapshots.py analytics --last 12
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # numpy is an optional dependency
+    np = None
+    NUMPY_AVAILABLE = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOTS_DIR = os.path.join(SCRIPT_DIR, ".cache", "snapshots")
+
+# Dictionary-encoded string columns
+CATEGORICAL = ("sport_tag", "country", "category", "source")
+
+# Run counters stored with each snapshot (missing ones are saved as -1)
+RUN_STATS = ("accepted", "sport_rejected", "location_rejected")
+
+SOURCE_NAMES = {"sc": "smoothcomp"}
+
+# What produced a snapshot: a live crawl, or filters re-run over the page archive
+RUN_KINDS = ("crawl", "reprocess")
+
+
+def _source_of(event_id: str) -> str:
+    """Source scraper from the id prefix: sc_123 -> smoothcomp, betrail_4 -> betrail."""
+    prefix = (event_id or "").split("_", 1)[0]
+    return SOURCE_NAMES.get(prefix, prefix or "unknown")
+
+
+def _id_hash(event_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b((event_id or "").encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _date(value) -> "np.datetime64":
+    try:
+        return np.datetime64(str(value)[:10], "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def _kind_of(data) -> str:
+    return str(data["kind"]) if "kind" in data.files else "crawl"  # snapshots predating run kinds
+
+
+def _read_kind(path: str) -> str:
+    with np.load(path, allow_pickle=False) as data:
+        return _kind_of(data)
+
+
+def _encode(values: List[str]):
+    """Strings -> (vocabulary, int32 codes into it)."""
+    vocab, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return vocab, codes.astype(np.int32)
+
+
+# ----------------------------------------------------------------------
+# Writing / loading
+# ----------------------------------------------------------------------
+
+def save_snapshot(events: List[dict], out_dir: str = SNAPSHOTS_DIR, stats: Optional[dict] = None,
+                  run_id: Optional[str] = None, kind: str = "crawl") -> str:
+    """Write one run's accepted events (and filter counters) as a .npz snapshot."""
+    if kind not in RUN_KINDS:
+        raise ValueError(f"Unknown run kind {kind!r}, expected one of {RUN_KINDS}")
+    run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+    columns = {
+        "sport_tag": [e.get("sport_tag") or "" for e in events],
+        "country": [(e.get("location") or {}).get("country") or "" for e in events],
+        "category": [e.get("category") or "" for e in events],
+        "source": [_source_of(e.get("id")) for e in events],
+    }
+    arrays = {
+        "run": np.array(run_id),
+        "kind": np.array(kind),
+        "id_hash": np.array([_id_hash(e.get("id")) for e in events], dtype=np.uint64),
+        "date_start": np.array([_date(e.get("date_start")) for e in events], dtype="datetime64[D]"),
+        "stats": np.array([(stats or {}).get(key, -1) for key in RUN_STATS], dtype=np.int64),
+    }
+    for name in CATEGORICAL:
+        arrays[f"{name}_vocab"], arrays[f"{name}_codes"] = _encode(columns[name])
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{run_id}.npz")
+    tmp_path = path + ".tmp"  # not *.npz, so a leftover from an interrupted save is never loaded
+    with open(tmp_path, "wb") as f:  # a file object: savez would append .npz to a name
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+class SnapshotSet:
+    """Several runs concatenated into flat columns, with a run index per row."""
+
+    def __init__(self, paths: List[str]):
+        self.runs: List[str] = []
+        self.kinds: List[str] = []
+        stats, run_index, id_hash, dates = [], [], [], []
+        vocabs: Dict[str, list] = {name: [] for name in CATEGORICAL}
+        codes: Dict[str, list] = {name: [] for name in CATEGORICAL}
+
+        for i, path in enumerate(paths):
+            with np.load(path, allow_pickle=False) as data:
+                self.runs.append(str(data["run"]))
+                self.kinds.append(_kind_of(data))
+                stats.append(data["stats"])
+                id_hash.append(data["id_hash"])
+                dates.append(data["date_start"])
+                run_index.append(np.full(len(data["id_hash"]), i, dtype=np.int32))
+                for name in CATEGORICAL:
+                    vocabs[name].append(data[f"{name}_vocab"])
+                    codes[name].append(data[f"{name}_codes"])
+
+        self.stats = np.array(stats, dtype=np.int64).reshape(len(paths), len(RUN_STATS))
+        self.run_index = np.concatenate(run_index) if paths else np.zeros(0, np.int32)
+        self.id_hash = np.concatenate(id_hash) if paths else np.zeros(0, np.uint64)
+        self.date_start = np.concatenate(dates) if paths else np.zeros(0, "datetime64[D]")
+
+        # Re-map every run's codes onto one shared vocabulary per column
+        self.vocab: Dict[str, "np.ndarray"] = {}
+        self.codes: Dict[str, "np.ndarray"] = {}
+        for name in CATEGORICAL:
+            vocab = np.unique(np.concatenate(vocabs[name])) if paths else np.zeros(0, str)
+            self.vocab[name] = vocab
+            self.codes[name] = (
+                np.concatenate([np.searchsorted(vocab, v)[c] for v, c in zip(vocabs[name], codes[name])])
+                if paths else np.zeros(0, np.int32)
+            )
+
+    @classmethod
+    def load(cls, snapshot_dir: str = SNAPSHOTS_DIR, last: Optional[int] = None,
+             kinds: Optional[Tuple[str, ...]] = ("crawl",)) -> "SnapshotSet":
+        """
+        Load the snapshots of a directory in run order.
+
+        Only runs of the given `kinds` are kept (None keeps every run), so
+        churn and acceptance rates compare crawls with crawls; `last` then
+        counts the kept runs.
+        """
+        names = sorted(
+            n for n in os.listdir(snapshot_dir)
+            if n.endswith(".npz") and not n.endswith(".tmp.npz")  # older versions' temp files
+        ) if os.path.isdir(snapshot_dir) else []
+        paths = [os.path.join(snapshot_dir, n) for n in names]
+        if kinds is not None:
+            paths = [path for path in paths if _read_kind(path) in kinds]
+        if last:
+            paths = paths[-last:]
+        return cls(paths)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _run_mask(self, run: int) -> "np.ndarray":
+        return self.run_index == run
+
+    def counts(self, column: str, run: int = -1) -> Dict[str, int]:
+        """Events per value of a categorical column in one run (latest by default)."""
+        run = run % len(self.runs)
+        counts = np.bincount(self.codes[column][self._run_mask(run)], minlength=len(self.vocab[column]))
+        order = np.argsort(-counts, kind="stable")
+        return {str(self.vocab[column][i]): int(counts[i]) for i in order if counts[i]}
+
+    def counts_by_month(self, run: int = -1) -> Dict[str, int]:
+        run = run % len(self.runs)
+        months = self.date_start[self._run_mask(run)].astype("datetime64[M]")
+        months = months[~np.isnat(months)]
+        values, counts = np.unique(months, return_counts=True)
+        return {str(v): int(c) for v, c in zip(values, counts)}
+
+    def source_coverage(self) -> Dict[str, List[int]]:
+        """Events per source for every run: {source: [count per run]}."""
+        table = np.zeros((len(self.runs), len(self.vocab["source"])), dtype=np.int64)
+        np.add.at(table, (self.run_index, self.codes["source"]), 1)
+        return {str(source): table[:, j].tolist() for j, source in enumerate(self.vocab["source"])}
+
+    def churn(self) -> List[Dict[str, int]]:
+        """Events added / removed / kept between each pair of consecutive crawl runs (reprocess runs skipped)."""
+        crawls = [run for run, kind in enumerate(self.kinds) if kind == "crawl"]
+        result = []
+        for previous, run in zip(crawls, crawls[1:]):
+            before = self.id_hash[self._run_mask(previous)]
+            after = self.id_hash[self._run_mask(run)]
+            kept = int(np.isin(after, before).sum())
+            result.append({
+                "run": self.runs[run],
+                "added": int(len(after) - kept),
+                "removed": int(len(before) - np.isin(before, after).sum()),
+                "kept": kept,
+            })
+        return result
+
+    def acceptance_rates(self) -> List[Optional[float]]:
+        """accepted / (accepted + rejected) per run; None when counters were not recorded."""
+        known = (self.stats >= 0).all(axis=1)
+        classified = self.stats.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = np.where(known & (classified > 0), self.stats[:, 0] / classified, np.nan)
+        return [None if np.isnan(r) else round(float(r), 4) for r in rates]
+
+    def report(self) -> dict:
+        if not self.runs:
+            return {"runs": []}
+        return {
+            "runs": self.runs,
+            "kinds": self.kinds,
+            "latest": {
+                "events": int(self._run_mask(len(self.runs) - 1).sum()),
+                "by_sport": self.counts("sport_tag"),
+                "by_country": self.counts("country"),
+                "by_month": self.counts_by_month(),
+            },
+            "source_coverage": self.source_coverage(),
+            "churn": self.churn(),
+            "acceptance_rate": self.acceptance_rates(),
+        }
+
+
+def print_report(report: dict):
+    runs = report["runs"]
+    if not runs:
+        print("No snapshots yet.")
+        return
+    latest = report["latest"]
+    print(f"{len(runs)} runs ({runs[0]} .. {runs[-1]}), {latest['events']} events in the latest")
+    for title, key in (("By sport", "by_sport"), ("By country", "by_country"), ("By month", "by_month")):
+        print(f"\n{title}:")
+        for value, count in latest[key].items():
+            print(f"  {value or '?':<20} {count}")
+
+    print("\nRuns:")
+    churn = {c["run"]: c for c in report["churn"]}
+    sources = sorted(report["source_coverage"])
+    print(f"  {'run':<16} {'kind':<9} {'accept':>6} {'+':>4} {'-':>4}  " + " ".join(f"{s:>10}" for s in sources))
+    for i, run in enumerate(runs):
+        rate = report["acceptance_rate"][i]
+        c = churn.get(run, {})
+        coverage = " ".join(f"{report['source_coverage'][s][i]:>10}" for s in sources)
+        print(f"  {run:<16} {report['kinds'][i]:<9} {'-' if rate is None else f'{rate:.0%}':>6} "
+              f"{c.get('added', ''):>4} {c.get('removed', ''):>4}  {coverage}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-run event snapshots and analytics")
+    parser.add_argument("--dir", default=SNAPSHOTS_DIR, help="Snapshot directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    save = sub.add_parser("save", help="Snapshot an events JSON file")
+    save.add_argument("input")
+    save.add_argument("--run", help="Run id (defaults to the current time)")
+    save.add_argument("--kind", choices=RUN_KINDS, default="crawl", help="What produced the file")
+
+    analytics = sub.add_parser("analytics", help="Counts, coverage, churn and acceptance trends")
+    analytics.add_argument("--last", type=int, help="Only the last N runs")
+    analytics.add_argument("--include-reprocess", action="store_true",
+                           help="Also load reprocess runs (they re-filter archived pages, not a new crawl)")
+    analytics.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        raise SystemExit("numpy is required: pip install numpy")
+
+    if args.command == "save":
+        with open(args.input, "r", encoding="utf-8") as f:
+            print(f"Saved {save_snapshot(json.load(f), args.dir, run_id=args.run, kind=args.kind)}")
+        return
+
+    kinds = None if args.include_reprocess else ("crawl",)
+    report = SnapshotSet.load(args.dir, args.last, kinds).report()
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Synthetic SportEvent generator for scaling tests.
+
+Learns field distributions (sport_tag mix, country skew, cities, federations,
+title templates, duplicate rate) from a real events.json and generates any
+number of events with the same shape, so post-scrape stages can be measured
+at catalog sizes we don't have yet.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+REFERENCE_PATH = os.path.join(PROJECT_ROOT, "src", "data", "events.json")
+
+
+def _weighted(counter: Counter) -> Tuple[list, list]:
+    """Split a Counter into parallel (values, weights) lists for random.choices."""
+    values = list(counter.keys())
+    return values, [counter[v] for v in values]
+
+
+class CatalogProfile:
+    """Field distributions measured on a reference catalog."""
+
+    def __init__(self, events: List[dict]):
+        if not events:
+            raise ValueError("Reference catalog is empty")
+
+        self.size = len(events)
+        self.sport_tags = _weighted(Counter(e["sport_tag"] for e in events))
+        self.countries = _weighted(Counter(e["location"]["country"] for e in events))
+
+        by_sport = defaultdict(list)
+        cities_by_country = defaultdict(Counter)
+        for event in events:
+            by_sport[event["sport_tag"]].append(event)
+            cities_by_country[event["location"]["country"]][event["location"]["city"]] += 1
+
+        self.categories = {s: _weighted(Counter(e["category"] for e in evs)) for s, evs in by_sport.items()}
+        self.federations = {s: _weighted(Counter(e["federation"] for e in evs)) for s, evs in by_sport.items()}
+        self.links = {s: _weighted(Counter(e["registration_link"] for e in evs)) for s, evs in by_sport.items()}
+        self.titles = {s: [(e["title"], e["location"]["city"]) for e in evs] for s, evs in by_sport.items()}
+        self.addresses = {s: [(e["location"]["full_address"], e["location"]["city"]) for e in evs] for s, evs in by_sport.items()}
+        self.cities = {c: _weighted(counter) for c, counter in cities_by_country.items()}
+
+        # Share of events that repeat an earlier (title, date_start) pair
+        distinct = len({(e["title"], e["date_start"]) for e in events})
+        self.duplicate_rate = 1 - distinct / len(events)
+
+        dates = sorted(e["date_start"] for e in events)
+        self.first_date = date.fromisoformat(dates[0])
+        self.span_days = max((date.fromisoformat(dates[-1]) - self.first_date).days, 1)
+
+    @classmethod
+    def from_file(cls, path: str = REFERENCE_PATH) -> "CatalogProfile":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def summary(self) -> Dict[str, object]:
+        values, weights = self.sport_tags
+        total = sum(weights)
+        return {
+            "reference_size": self.size,
+            "sport_tags": {v: round(w / total, 3) for v, w in zip(values, weights)},
+            "countries": len(self.countries[0]),
+            "duplicate_rate": round(self.duplicate_rate, 4),
+        }
+
+
+def _swap_city(template: str, old_city: str, new_city: str) -> str:
+    """Put new_city in place of old_city when the template mentions it."""
+    if old_city and old_city != new_city and old_city in template:
+        return template.replace(old_city, new_city)
+    return template
+
+
+def generate_events(count: int, profile: CatalogProfile, seed: int = 0) -> Iterator[dict]:
+    """
+    Yield `count` synthetic events following the profile's distributions.
+
+    Duplicates re-emit an earlier event's title/date/location under a new id,
+    the way the same competition shows up from two sources.
+    """
+    rng = random.Random(seed)
+    recent: List[dict] = []
+
+    for i in range(count):
+        if recent and rng.random() < profile.duplicate_rate:
+            original = rng.choice(recent)
+            yield dict(original, id=f"syn_{original['sport_tag']}_{i}", location=dict(original["location"]))
+            continue
+
+        sport_tag = rng.choices(*profile.sport_tags)[0]
+        country = rng.choices(*profile.countries)[0]
+        city = rng.choices(*profile.cities[country])[0]
+
+        template, template_city = rng.choice(profile.titles[sport_tag])
+        title = _swap_city(template, template_city, city)
+        title = re.sub(r"\b20\d\d\b", str(profile.first_date.year + rng.randint(0, 1)), title)
+        address, address_city = rng.choice(profile.addresses[sport_tag])
+
+        event = {
+            "id": f"syn_{sport_tag}_{i}",
+            "title": title,
+            "date_start": (profile.first_date + timedelta(days=rng.randrange(profile.span_days))).isoformat(),
+            "location": {
+                "city": city,
+                "country": country,
+                "full_address": _swap_city(address, address_city, city),
+            },
+            "category": rng.choices(*profile.categories[sport_tag])[0],
+            "sport_tag": sport_tag,
+            "registration_link": rng.choices(*profile.links[sport_tag])[0],
+            "federation": rng.choices(*profile.federations[sport_tag])[0],
+            "image_logo_url": None,
+        }
+
+        # Keep a bounded window of candidates for duplicates
+        if len(recent) < 1000:
+            recent.append(event)
+        else:
+            recent[rng.randrange(1000)] = event
+        yield event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic events catalog")
+    parser.add_argument("count", type=int, help="Number of events to generate")
+    parser.add_argument("-o", "--output", default="synthetic_events.json", help="Output JSON file")
+    parser.add_argument("--reference", default=REFERENCE_PATH, help="Real events.json to learn distributions from")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    profile = CatalogProfile.from_file(args.reference)
+    print(f"Reference profile: {profile.summary()}")
+
+    events = list(generate_events(args.count, profile, seed=args.seed))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(events, f, ensure_ascii=False)
+    print(f"Wrote {len(events)} events to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The scrapers are flat modules run from their own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import log_setup  # noqa: E402
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    # A charset Python has no codec for, as sent by some MySQL-backed sites
+    extensions_map = dict(SimpleHTTPRequestHandler.extensions_map, **{".mb4": "text/html; charset=utf8mb4"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _event_page(title, city="Paris", country="France", date="2027-06-12"):
+    jsonld = {"@type": "Event", "name": title, "startDate": date,
+              "location": {"name": city, "address": {"addressLocality": city, "addressCountry": country}}}
+    return (f'<html><head><meta property="og:title" content="{title}">'
+            f'<script type="application/ld+json">{json.dumps(jsonld)}</script></head>'
+            f"<body>{'x' * 2000}</body></html>")
+
+
+@pytest.fixture
+def event_page():
+    """Build a Smoothcomp-like event page: event_page(title, city=, country=, date=) -> HTML."""
+    return _event_page
+
+
+@pytest.fixture
+def static_site(tmp_path):
+    """Serve tmp_path over HTTP on a free local port; yields the base URL."""
+    handler = functools.partial(_QuietHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def audit_path(tmp_path):
+    """Log through setup_logging with an NDJSON audit file; yields its path."""
+    path = tmp_path / "audit.ndjson"
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    log_setup.setup_logging(audit_path=str(path))
+    yield path
+    log_setup.shutdown_logging()
+    root.handlers[:], level = saved
+    root.setLevel(level)
+    log_setup.audit_logger.handlers.clear()
+    log_setup.audit_logger.setLevel(logging.CRITICAL + 1)
@@ -0,0 +1,43 @@
+import json
+
+import log_setup
+from bench_pipeline import classify_events, growth_exponents, run_benchmark
+from snapshots import NUMPY_AVAILABLE
+from synthetic_events import REFERENCE_PATH
+
+
+def test_growth_exponents_skip_runs_below_min_seconds():
+    rows = [
+        {"size": 1000, "seconds": 0.001},
+        {"size": 10000, "seconds": 0.017},  # timer noise at this scale
+        {"size": 100000, "seconds": 0.17},
+    ]
+    assert [round(e, 2) for e in growth_exponents(rows)] == [1.23, 1.0]
+    assert [round(e, 2) for e in growth_exponents(rows, min_seconds=0.01)] == [1.0]
+
+
+def test_classify_goes_through_the_scraper_audit(audit_path):
+    events = [
+        {"id": "1", "title": "Paris BJJ Open", "date_start": "2027-05-01", "image_logo_url": None,
+         "location": {"city": "Paris", "country": "France", "full_address": "Paris, France"}},
+        {"id": "2", "title": "Paris Boxing Night", "date_start": "2027-05-02", "image_logo_url": None,
+         "location": {"city": "Paris", "country": "France", "full_address": "Paris, France"}},
+    ]
+    kept = classify_events(events)
+    log_setup.shutdown_logging()
+
+    assert [e["sport_tag"] for e in kept] == ["jjb"]
+    rows = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+    assert sorted((r["decision"], r["stage"]) for r in rows) == [("accepted", "build"), ("rejected", "sport")]
+
+
+def test_run_benchmark_times_every_output_stage(tmp_path, audit_path):  # audit_path restores logging afterwards
+    with open(REFERENCE_PATH, encoding="utf-8") as f:
+        reference = json.load(f)[:200]
+    path = tmp_path / "reference.json"
+    path.write_text(json.dumps(reference), encoding="utf-8")
+
+    results = run_benchmark([50, 100], str(path), repeat=1)
+    expected = {"classify", "logos", "sort", "write", "widgets", "summary"}
+    assert set(results) == expected | ({"snapshot"} if NUMPY_AVAILABLE else set())
+    assert all([row["size"] for row in rows] == [50, 100] for rows in results.values())
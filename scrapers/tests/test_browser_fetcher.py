@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+import browser_fetcher
+from browser_fetcher import PLAYWRIGHT_AVAILABLE, BrowserPool
+from http_client import create_session
+import running_scraper
+from running_scraper import RunningScraper
+
+# Cards inserted by script, so only a rendering fetch sees them
+RENDERED_PAGE = """<html><body><div id="list"></div>
+<script>
+document.getElementById("list").innerHTML =
+  '<div class="race-card"><h3 class="title">Trail des Crêtes</h3>' +
+  '<span class="date">12/09/2027</span><a href="/trail">Voir</a></div>';
+</script></body></html>"""
+
+STATIC_PAGE = """<html><body>
+<div class="race-card"><h3 class="title">Semi de Lyon</h3><span class="date">03/10/2027</span>
+<span class="city">Lyon</span><a href="/semi">Voir</a></div>
+</body></html>"""
+
+
+def _browser_threads():
+    return [t for t in threading.enumerate() if t.name == "browser-pool"]
+
+
+@pytest.fixture
+def pool():
+    if not PLAYWRIGHT_AVAILABLE:
+        pytest.skip("playwright is not installed")
+    try:
+        pool = BrowserPool(pool_size=1, max_pages=2, timeout=10)
+    except Exception as e:
+        pytest.skip(f"Chromium cannot launch: {e}")
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def scraper(static_site, tmp_path, monkeypatch):
+    (tmp_path / "rendered.html").write_text(RENDERED_PAGE, encoding="utf-8")
+    (tmp_path / "static.html").write_text(STATIC_PAGE, encoding="utf-8")
+    monkeypatch.setattr(RunningScraper, "SOURCES", {
+        "finishers": {"url": f"{static_site}/rendered.html", "fetch": "browser",
+                      "wait_selector": "div.race-card"},
+        "static": {"url": f"{static_site}/static.html", "fetch": "http"},
+    })
+    scraper = RunningScraper(session=create_session(retries=0))
+    yield scraper
+    scraper.close()
+
+
+def test_pool_fetch_renders_scripts(pool, static_site, tmp_path):
+    (tmp_path / "rendered.html").write_text(RENDERED_PAGE, encoding="utf-8")
+    html = pool.fetch(f"{static_site}/rendered.html", wait_selector="div.race-card")
+    assert "Trail des Crêtes" in html
+
+
+def test_pool_fetch_many_keeps_order_and_reports_failures(pool, static_site, tmp_path):
+    (tmp_path / "static.html").write_text(STATIC_PAGE, encoding="utf-8")
+    urls = [f"{static_site}/static.html", "http://127.0.0.1:9/unreachable"]
+    pages = pool.fetch_many(urls)
+    assert list(pages) == urls
+    assert "Semi de Lyon" in pages[urls[0]]
+    assert pages[urls[1]] is None
+
+
+def test_fetch_html_browser_source(pool, scraper):
+    scraper._browser = pool
+    assert "Trail des Crêtes" in scraper.fetch_html("finishers")
+    scraper._browser = None  # the pool fixture closes it
+
+
+def test_fetch_html_http_source(scraper):
+    html = scraper.fetch_html("static")
+    races = scraper.parse_finishers(html)
+    assert [r["title"] for r in races] == ["Semi de Lyon"]
+
+
+def test_fetch_html_keeps_utf8_without_charset_header(scraper, tmp_path):
+    # Served as plain "text/html": requests alone would decode it as ISO-8859-1
+    page = STATIC_PAGE.replace("<html>", '<html><head><meta charset="utf-8"></head>')
+    page = page.replace("Semi", "Trail des Crêtes")
+    (tmp_path / "static.html").write_bytes(page.encode("utf-8"))
+    races = scraper.parse_finishers(scraper.fetch_html("static"))
+    assert [r["title"] for r in races] == ["Trail des Crêtes de Lyon"]
+
+
+def test_fetch_html_without_playwright_uses_http(scraper, monkeypatch):
+    monkeypatch.setattr(running_scraper, "PLAYWRIGHT_AVAILABLE", False)
+    html = scraper.fetch_html("finishers")
+    assert scraper.parse_finishers(html) == []  # raw HTML: the cards are never rendered
+    assert scraper.use_browser is False
+
+
+def test_fetch_html_falls_back_when_chromium_cannot_launch(scraper, monkeypatch):
+    def failing_pool(**kwargs):
+        raise RuntimeError("Executable doesn't exist")
+
+    monkeypatch.setattr(running_scraper, "PLAYWRIGHT_AVAILABLE", True)
+    monkeypatch.setattr(running_scraper, "BrowserPool", failing_pool)
+    assert b"race-card" in scraper.fetch_html("finishers")
+    assert scraper.use_browser is False
+
+
+def test_failed_launch_stops_loop_thread(monkeypatch):
+    class _Starter:
+        async def start(self):
+            raise RuntimeError("Executable doesn't exist")
+
+    monkeypatch.setattr(browser_fetcher, "PLAYWRIGHT_AVAILABLE", True)
+    monkeypatch.setattr(browser_fetcher, "async_playwright", _Starter)
+    before = len(_browser_threads())
+    with pytest.raises(RuntimeError):
+        BrowserPool()
+    assert len(_browser_threads()) == before
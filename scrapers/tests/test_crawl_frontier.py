@@ -0,0 +1,162 @@
+import threading
+
+import pytest
+
+from crawl_frontier import DONE, FAILED, LEASED, PENDING, CrawlFrontier, parse_shard, shard_of
+
+URLS = [f"https://smoothcomp.com/en/event/{i}" for i in range(20)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "frontier.db")
+
+
+def _expire_leases(frontier):
+    frontier.conn.execute("UPDATE urls SET lease_expires = 0 WHERE status = ?", (LEASED,))
+
+
+def test_default_journal_is_safe_for_network_filesystems(path):
+    with CrawlFrontier(path) as frontier:
+        assert frontier.conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    with CrawlFrontier(path, journal_mode="wal") as frontier:
+        assert frontier.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with pytest.raises(ValueError):
+        CrawlFrontier(path, journal_mode="memory")
+
+
+def test_add_urls_keeps_existing_status(path):
+    with CrawlFrontier(path) as frontier:
+        assert frontier.add_urls(URLS[:3]) == 3
+        claimed = frontier.claim("w1", limit=1)
+        assert frontier.add_urls(URLS[:5]) == 2
+        assert frontier.stats() == {PENDING: 4, LEASED: 1, DONE: 0, FAILED: 0}
+        assert claimed[0] in URLS[:3]
+
+
+def test_concurrent_workers_never_claim_the_same_url(path):
+    with CrawlFrontier(path) as frontier:
+        frontier.add_urls(URLS)
+
+    claimed = {}
+
+    def worker(worker_id):
+        with CrawlFrontier(path) as frontier:
+            urls = []
+            while True:
+                batch = frontier.claim(worker_id, limit=2)
+                if not batch:
+                    break
+                urls.extend(batch)
+            claimed[worker_id] = urls
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    every = [url for urls in claimed.values() for url in urls]
+    assert sorted(every) == sorted(URLS)
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_loses_it(path):
+    with CrawlFrontier(path, lease_seconds=600) as frontier:
+        frontier.add_urls(URLS[:1])
+        assert frontier.claim("dead") == URLS[:1]
+        assert frontier.claim("live") == []  # still leased
+
+        _expire_leases(frontier)
+        assert frontier.claim("live") == URLS[:1]
+        assert not frontier.complete(URLS[0], "dead", {"id": "late"})
+        assert frontier.complete(URLS[0], "live", {"id": "sc_0"})
+        assert list(frontier.results()) == [{"id": "sc_0"}]
+        assert frontier.outstanding() == 0
+
+
+def test_failures_are_retried_until_max_attempts(path):
+    with CrawlFrontier(path, max_attempts=2) as frontier:
+        frontier.add_urls(URLS[:1])
+        frontier.claim("w1")
+        assert frontier.fail(URLS[0], "w1", "timeout")
+        assert frontier.stats()[PENDING] == 1
+
+        frontier.claim("w1")
+        assert frontier.fail(URLS[0], "w1", "timeout")
+        assert frontier.stats()[FAILED] == 1
+        assert frontier.claim("w1") == []
+
+
+def test_lease_expiring_on_last_attempt_marks_failed(path):
+    with CrawlFrontier(path, max_attempts=1) as frontier:
+        frontier.add_urls(URLS[:1])
+        frontier.claim("dead")
+        assert frontier.outstanding() == 1  # in flight on its last attempt
+
+        _expire_leases(frontier)
+        assert frontier.outstanding() == 0
+        assert frontier.claim("live") == []
+        row = frontier.conn.execute("SELECT status, last_error FROM urls").fetchone()
+        assert row == (FAILED, "lease expired")
+
+
+def test_filtered_out_events_are_done_without_result(path):
+    with CrawlFrontier(path) as frontier:
+        frontier.add_urls(URLS[:2])
+        for url in frontier.claim("w1", limit=2):
+            frontier.complete(url, "w1", None)
+        assert frontier.stats()[DONE] == 2
+        assert list(frontier.results()) == []
+
+
+def test_shards_split_the_urls(path):
+    with CrawlFrontier(path, num_shards=3) as frontier:
+        frontier.add_urls(URLS)
+        for index in range(3):
+            urls = frontier.claim(f"w{index}", limit=len(URLS), shards=[index])
+            assert all(shard_of(url, 3) == index for url in urls)
+        assert frontier.outstanding() == len(URLS)  # all leased, none lost
+
+    # The shard count is fixed when the file is created
+    with CrawlFrontier(path, num_shards=5) as frontier:
+        assert frontier.num_shards == 3
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    with pytest.raises(ValueError):
+        parse_shard("4/4")
+
+
+def test_released_urls_are_claimable_without_losing_an_attempt(path):
+    with CrawlFrontier(path, max_attempts=1) as frontier:
+        frontier.add_urls(URLS[:2])
+        claimed = frontier.claim("w1", limit=2)
+        assert frontier.release(claimed, "w2") == 0  # not its lease
+        assert frontier.release(claimed, "w1") == 2
+        assert frontier.stats() == {PENDING: 2, LEASED: 0, DONE: 0, FAILED: 0}
+        assert sorted(frontier.claim("w2", limit=2)) == sorted(claimed)
+
+
+def test_worker_hands_urls_back_when_the_budget_runs_out(path, monkeypatch):
+    from main import run_worker
+    from run_budget import BudgetExceeded, RunBudget
+    from smoothcomp_scraper import SmoothcompScraper
+
+    scraper = SmoothcompScraper(budget=RunBudget(30), hedge=False)
+    fetched = []
+
+    def fetch(url):
+        if fetched:
+            raise BudgetExceeded(url)
+        fetched.append(url)
+        return "<html></html>"
+
+    monkeypatch.setattr(scraper, "_fetch_page", fetch)
+    monkeypatch.setattr(scraper, "_parse_event_details", lambda url, html: None)
+    with CrawlFrontier(path) as frontier:
+        frontier.add_urls(URLS[:3])
+        assert run_worker(frontier, scraper, "w1", batch_size=3) == 1
+        assert frontier.stats() == {PENDING: 2, LEASED: 0, DONE: 1, FAILED: 0}
+        attempts = frontier.conn.execute("SELECT MAX(attempts) FROM urls WHERE status = ?", (PENDING,)).fetchone()
+        assert attempts == (0,)
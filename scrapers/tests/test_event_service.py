@@ -0,0 +1,141 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+import log_setup
+
+from event_service import EventResolver, make_server
+from http_client import create_session
+from smoothcomp_scraper import SmoothcompScraper
+
+
+@pytest.fixture
+def service():
+    resolver = EventResolver(SmoothcompScraper(session=create_session(retries=0)), workers=2)
+    server = make_server(resolver, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+    resolver.close()
+
+
+def _post(address, body: bytes, content_length: str):
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    conn.putrequest("POST", "/events")
+    conn.putheader("Content-Length", content_length)
+    conn.endheaders(body)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-5", "1e3"])
+def test_invalid_content_length_is_rejected(service, content_length):
+    status, payload = _post(service, b'{"urls": []}', content_length)
+    assert status == 400 and payload == {"error": "invalid Content-Length"}
+
+
+def test_body_too_large(service):
+    status, _ = _post(service, b"", str(10 ** 9))
+    assert status == 413
+
+
+def test_bad_batch(service):
+    body = b'{"urls": ["ftp://example.com"]}'
+    status, _ = _post(service, body, str(len(body)))
+    assert status == 400
+
+
+class _StubScraper:
+    """Counts page fetches; every Smoothcomp page is an accepted event."""
+
+    def __init__(self):
+        self.fetches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def _get_event_page(self, url):
+        self.fetches.append(url)
+        self.gate.wait(5)
+        if url.endswith("/down"):
+            raise ConnectionError("refused")
+        return "<html></html>"
+
+    def _extract_event_fields(self, url, html):
+        return {"url": url, "title": "Open BJJ"}
+
+    def _classify_event(self, fields):
+        return True
+
+    def _build_event(self, fields):
+        return {"id": fields["url"]}
+
+
+def _url(name):
+    return f"https://smoothcomp.com/en/event/{name}"
+
+
+def test_concurrent_lookups_share_one_fetch():
+    scraper = _StubScraper()
+    scraper.gate.clear()
+    resolver = EventResolver(scraper)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve(_url(1)))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while resolver.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scraper.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert scraper.fetches == [_url(1)]
+    assert [r["event"] for r in results] == [{"id": _url(1)}] * 5
+    assert (resolver.stats()["misses"], resolver.stats()["coalesced"]) == (1, 4)
+    resolver.close()
+
+
+def test_least_recently_used_entry_is_evicted():
+    scraper = _StubScraper()
+    resolver = EventResolver(scraper, max_entries=2)
+    for name in ("a", "b", "a", "c", "a", "b"):
+        resolver.resolve(_url(name))
+    # "a" was used again before "c" came in, so "b" was the one evicted
+    assert scraper.fetches == [_url("a"), _url("b"), _url("c"), _url("b")]
+    assert resolver.stats()["cached"] == 2
+    resolver.close()
+
+
+def test_entries_expire_after_the_ttl_and_errors_are_not_cached():
+    now = [0.0]
+    scraper = _StubScraper()
+    resolver = EventResolver(scraper, ttl=10, clock=lambda: now[0])
+    assert resolver.resolve(_url(1))["cached"] is False
+    now[0] = 9.9
+    assert resolver.resolve(_url(1))["cached"] is True
+    now[0] = 10.1
+    assert resolver.resolve(_url(1))["cached"] is False
+    assert resolver.resolve(_url("down"))["status"] == "error"
+    assert resolver.resolve(_url("down"))["status"] == "error"
+    assert scraper.fetches == [_url(1), _url(1), _url("down"), _url("down")]
+    resolver.close()
+
+
+def test_race_page_leaves_no_grappling_audit_record(audit_path, monkeypatch):
+    scraper = SmoothcompScraper(session=create_session(retries=0))
+    monkeypatch.setattr(scraper, "_get_event_page", lambda url: "")
+    monkeypatch.setattr(scraper, "_extract_event_fields", lambda url, html: {
+        "url": url, "title": "Trail des Crêtes", "location": "Annecy, France",
+        "date_str": "2027-09-12", "image_url": None})
+    result = EventResolver(scraper).resolve("https://trail.example/cretes")
+    log_setup.shutdown_logging()
+
+    assert result["event"]["sport_tag"] == "trail"
+    assert audit_path.read_text(encoding="utf-8") == ""
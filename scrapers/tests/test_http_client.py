@@ -0,0 +1,112 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from urllib3.util import connection as urllib3_connection
+
+import http_client
+from http_client import (BROTLI_AVAILABLE, DEFAULT_POOL_SIZE, USER_AGENT, _DnsCache, create_session,
+                         install_dns_cache)
+
+
+@pytest.fixture
+def echo_server():
+    """Answers every GET with its request headers, after ?delay= seconds."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if "delay=" in self.path:
+                time.sleep(float(self.path.rsplit("delay=", 1)[1]))
+            body = "\n".join(f"{k}: {v}" for k, v in self.headers.items()).encode("utf-8")
+            try:
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except OSError:
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Record (host, family) of every getaddrinfo call, still resolving for real."""
+    calls = []
+    real = socket.getaddrinfo
+
+    def getaddrinfo(host, port, family=0, *args, **kwargs):
+        calls.append((host, family))
+        return real(host, port, family, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return calls
+
+
+def test_dns_cache_hits_until_the_ttl_runs_out(lookups):
+    cache = _DnsCache(ttl=60)
+    first = cache.resolve("localhost", 80, socket.AF_INET)
+    assert cache.resolve("localhost", 80, socket.AF_INET) == first
+    assert lookups == [("localhost", socket.AF_INET)]
+
+    cache.resolve("localhost", 80, socket.AF_UNSPEC)  # another family is another entry
+    assert len(lookups) == 2
+
+    expired = _DnsCache(ttl=0)
+    expired.resolve("localhost", 80)
+    expired.resolve("localhost", 80)
+    assert len(lookups) == 4
+
+
+def test_building_a_session_does_not_patch_urllib3():
+    before = urllib3_connection.create_connection
+    create_session()
+    assert urllib3_connection.create_connection is before
+
+
+def test_installed_cache_respects_urllib3_address_family(echo_server, lookups, monkeypatch):
+    monkeypatch.setattr(urllib3_connection, "create_connection", urllib3_connection.create_connection)
+    monkeypatch.setattr(http_client, "_dns_cache", _DnsCache())
+    monkeypatch.setattr(urllib3_connection, "allowed_gai_family", lambda: socket.AF_INET)
+    install_dns_cache()
+    install_dns_cache()  # idempotent
+
+    session = create_session(retries=0)
+    for _ in range(2):
+        assert session.get(f"http://localhost:{echo_server}/", headers={"Connection": "close"}).ok
+    assert [call for call in lookups if call[0] == "localhost"] == [("localhost", socket.AF_INET)]
+
+
+def test_default_timeout_applies_unless_the_caller_sets_one(echo_server):
+    session = create_session(timeout=(1.0, 0.2), retries=0)
+    with pytest.raises(requests.RequestException, match="read timeout=0.2"):
+        session.get(f"http://127.0.0.1:{echo_server}/?delay=0.5")
+    assert session.get(f"http://127.0.0.1:{echo_server}/?delay=0.5", timeout=2).ok
+
+
+def test_pools_are_sized_per_host():
+    session = create_session(host_pool_sizes={"smoothcomp.com": 8})
+
+    def maxsize(url):
+        return session.get_adapter(url).poolmanager.connection_pool_kw["maxsize"]
+
+    assert maxsize("https://smoothcomp.com/en/event/1") == 8
+    assert maxsize("https://www.finishers.com/course/running") == DEFAULT_POOL_SIZE
+    assert maxsize("http://smoothcomp.com/") == DEFAULT_POOL_SIZE  # only the https:// prefix is mounted
+
+
+def test_every_request_carries_the_header_policy(echo_server):
+    headers = create_session(retries=0).get(f"http://127.0.0.1:{echo_server}/").text
+    assert f"User-Agent: {USER_AGENT}" in headers
+    encodings = headers.split("Accept-Encoding: ", 1)[1].split("\n", 1)[0]
+    assert "gzip" in encodings and ("br" in encodings) == BROTLI_AVAILABLE
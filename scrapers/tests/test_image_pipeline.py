@@ -0,0 +1,48 @@
+import io
+import os
+
+import pytest
+
+import image_pipeline
+from http_client import create_session
+from image_pipeline import ImagePipeline
+
+
+def _events(url):
+    return [{"id": "sc_1", "image_logo_url": url}, {"id": "sc_2", "image_logo_url": url}]
+
+
+def test_without_base_url_logos_are_dropped_and_not_downloaded(tmp_path, monkeypatch):
+    pipeline = ImagePipeline(str(tmp_path / "cache"), str(tmp_path / "thumbs"))
+    monkeypatch.setattr(pipeline, "_download", lambda url: pytest.fail("should not download"))
+    events = pipeline.process(_events("https://example.com/logo.png"))
+    assert [e["image_logo_url"] for e in events] == [None, None]
+
+
+@pytest.mark.skipif(not image_pipeline.PIL_AVAILABLE, reason="Pillow is not installed")
+def test_thumbnails_are_referenced_by_base_url(static_site, tmp_path):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 200), (200, 30, 30)).save(buffer, "PNG")
+    (tmp_path / "logo.png").write_bytes(buffer.getvalue())
+
+    publish_dir = tmp_path / "thumbs"
+    pipeline = ImagePipeline(str(tmp_path / "cache"), str(publish_dir), base_url="https://cdn.example/thumbs/",
+                             session=create_session(retries=0))
+    events = pipeline.process(_events(f"{static_site}/logo.png"))
+
+    reference = events[0]["image_logo_url"]
+    assert reference.startswith("https://cdn.example/thumbs/") and reference.endswith(".jpg")
+    assert events[1]["image_logo_url"] == reference
+    assert os.listdir(publish_dir) == [reference.rsplit("/", 1)[1]]
+
+
+@pytest.mark.skipif(not image_pipeline.PIL_AVAILABLE, reason="Pillow is not installed")
+def test_offline_uses_cache_only(tmp_path, monkeypatch):
+    pipeline = ImagePipeline(str(tmp_path / "cache"), str(tmp_path / "thumbs"), base_url="https://cdn.example",
+                             offline=True)
+    monkeypatch.setattr(pipeline, "_download", lambda url: pytest.fail("should not download"))
+    events = pipeline.process(_events("https://example.com/logo.png"))
+    assert [e["image_logo_url"] for e in events] == [None, None]
+    assert pipeline.not_cached == 1
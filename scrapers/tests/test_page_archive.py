@@ -0,0 +1,48 @@
+import os
+
+from page_archive import DATA_FILE, INDEX_FILE, PageArchive
+
+URL = "https://smoothcomp.com/en/event/1"
+
+
+def test_pages_round_trip_across_instances(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        assert archive.append(URL, "<html>v1 é</html>")
+        assert archive.append(URL + "0", "<html>other</html>")
+        assert archive.get(URL) == "<html>v1 é</html>"
+
+    with PageArchive(str(tmp_path)) as archive:
+        assert len(archive) == 2 and URL in archive
+        assert dict(archive.items()) == {URL: "<html>v1 é</html>", URL + "0": "<html>other</html>"}
+
+
+def test_unchanged_page_is_not_stored_again(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(URL, "<html>v1</html>")
+        assert not archive.append(URL, "<html>v1</html>")
+        assert archive.append(URL, "<html>v2</html>")
+        assert archive.get(URL) == "<html>v2</html>"
+        assert archive.stats()["written"] == 2 and archive.stats()["unchanged"] == 1
+
+
+def test_torn_index_and_missing_data_are_ignored(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(URL, "<html>kept</html>")
+    with open(tmp_path / INDEX_FILE, "a", encoding="utf-8") as f:
+        f.write("123\t45\t1700000000.0\tdeadbeef")  # interrupted mid-line
+        f.write(f"\n999999\t10\t1700000000.0\tdeadbeef\t{URL}\n")  # points past the data
+
+    with PageArchive(str(tmp_path)) as archive:
+        assert len(archive) == 1
+        assert archive.get(URL) == "<html>kept</html>"
+
+
+def test_append_after_close_is_ignored(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.append(URL, "<html>v1</html>")
+    archive.close()
+    size = os.path.getsize(tmp_path / DATA_FILE)
+
+    assert not archive.append(URL, "<html>late</html>")
+    assert archive._data is None  # files were not reopened
+    assert os.path.getsize(tmp_path / DATA_FILE) == size
@@ -0,0 +1,131 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline, Stage
+
+TIMEOUT = 10
+
+
+def _run(pipeline):
+    """Run a pipeline in a thread, failing the test instead of hanging."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["stats"] = pipeline.run()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT)
+    if thread.is_alive():
+        pipeline.cancel()
+        pytest.fail("pipeline did not finish")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["stats"]
+
+
+def _pipeline_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def _wait_for_pipeline_threads():
+    deadline = time.monotonic() + TIMEOUT
+    while _pipeline_threads() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return _pipeline_threads()
+
+
+def test_items_flow_through_every_stage():
+    def fail_on_7(n):
+        if n == 7:
+            raise ValueError("unparsable")
+        return n
+
+    out = []
+    stages = [
+        Stage("split", lambda n: [n, -n], many=True),
+        Stage("drop_negative", lambda n: n if n >= 0 else None, workers=3),
+        Stage("parse", fail_on_7, workers=2),
+    ]
+    stats = _run(Pipeline(range(1, 11), stages, out.append))
+
+    assert sorted(out) == [n for n in range(1, 11) if n != 7]
+    assert (stats["split"]["in"], stats["split"]["out"]) == (10, 20)
+    assert stats["drop_negative"]["out"] == 10
+    assert stats["parse"]["errors"] == 1
+
+
+def test_end_waits_for_every_worker_of_a_stage():
+    # The first worker to see the end marker must not end the next stage
+    # while a sibling still holds a slow item
+    def slow_first(n):
+        if n == 0:
+            time.sleep(0.5)
+        return n
+
+    out = []
+    stages = [Stage("slow", slow_first, workers=4), Stage("pass", lambda n: n, workers=3)]
+    _run(Pipeline(range(20), stages, out.append))
+
+    assert sorted(out) == list(range(20))
+    assert _wait_for_pipeline_threads() == []
+
+
+def test_slow_sink_bounds_items_in_flight():
+    produced = itertools.count()
+    yielded = [0]
+    max_ahead = [0]
+    consumed = [0]
+
+    def source():
+        for n in range(100):
+            yielded[0] = next(produced) + 1
+            max_ahead[0] = max(max_ahead[0], yielded[0] - consumed[0])
+            yield n
+
+    def sink(item):
+        time.sleep(0.005)
+        consumed[0] += 1
+
+    queue_size = 2
+    stages = [Stage("a", lambda n: n, queue_size=queue_size), Stage("b", lambda n: n, queue_size=queue_size)]
+    stats = _run(Pipeline(source(), stages, sink))
+
+    assert consumed[0] == 100
+    # Two inboxes and the final queue, one item per worker, one in the source, one in the sink
+    assert max_ahead[0] <= 3 * queue_size + 2 + 1 + 1
+    assert stats["b"]["blocked_s"] > 0
+
+
+def test_sink_error_cancels_the_pipeline():
+    seen = []
+
+    def sink(item):
+        seen.append(item)
+        if len(seen) == 3:
+            raise RuntimeError("disk full")
+
+    pipeline = Pipeline(itertools.count(), [Stage("pass", lambda n: n, workers=2)], sink)
+    with pytest.raises(RuntimeError, match="disk full"):
+        _run(pipeline)
+
+    assert pipeline.cancelled
+    assert len(seen) == 3
+    assert _wait_for_pipeline_threads() == []
+
+
+def test_source_error_ends_the_stream():
+    def source():
+        yield 1
+        yield 2
+        raise ValueError("listing page changed")
+
+    out = []
+    _run(Pipeline(source(), [Stage("pass", lambda n: n)], out.append))
+    assert out == [1, 2]
@@ -0,0 +1,22 @@
+import json
+
+import log_setup
+from page_archive import PageArchive
+from reprocess import reprocess_archive
+
+
+def test_worker_audit_records_reach_the_parent_file(tmp_path, audit_path, event_page):
+    with PageArchive(str(tmp_path / "pages")) as archive:
+        archive.append("https://smoothcomp.com/en/event/1", event_page("Open de Lyon BJJ", city="Lyon"))
+        archive.append("https://smoothcomp.com/en/event/2", event_page("Lyon Kickboxing Cup", city="Lyon"))
+        archive.append("https://smoothcomp.com/en/event/3", event_page("Tokyo Grappling", "Tokyo", "Japan"))
+
+    events, stats = reprocess_archive(str(tmp_path / "pages"), workers=2, chunk_size=1, upcoming_only=False)
+    log_setup.shutdown_logging()
+
+    assert [e["title"] for e in events] == ["Open de Lyon BJJ"]
+    assert (stats["sport_rejected"], stats["location_rejected"]) == (1, 1)
+    rows = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+    decisions = sorted((r["decision"], r["stage"], r["url"][-1]) for r in rows)
+    assert decisions == [("accepted", "build", "1"), ("rejected", "location", "3"), ("rejected", "sport", "2")]
+    assert len({r["run"] for r in rows}) == 1
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from run_budget import MIN_REQUEST_TIMEOUT, BudgetExceeded, HedgedFetcher, LatencyTracker, RunBudget
+
+
+def _fast_tracker(seconds=0.01):
+    tracker = LatencyTracker(min_samples=3)
+    for _ in range(3):
+        tracker.record(seconds)
+    return tracker
+
+
+def test_request_timeout_is_capped_by_the_budget():
+    assert RunBudget(60).request_timeout((5.0, 30.0)) == (5.0, 30.0)
+    connect, read = RunBudget(2).request_timeout((5.0, 30.0))
+    assert connect == pytest.approx(2, abs=0.1) and read == pytest.approx(2, abs=0.1)
+    assert RunBudget(0).request_timeout() == (MIN_REQUEST_TIMEOUT, MIN_REQUEST_TIMEOUT)
+    assert RunBudget(0).expired() and RunBudget(0).remaining() == 0
+
+
+def test_p95_needs_enough_samples():
+    tracker = LatencyTracker(min_samples=20)
+    for i in range(19):
+        tracker.record(i / 100)
+    assert tracker.p95() is None
+    tracker.record(1.0)
+    assert tracker.p95() == 1.0
+
+
+def test_fast_fetch_is_not_hedged():
+    calls = []
+    fetcher = HedgedFetcher(lambda url: calls.append(url) or "page", RunBudget(10), tracker=_fast_tracker(1.0))
+    assert fetcher.fetch("u") == "page"
+    assert calls == ["u"] and fetcher.stats()["hedged"] == 0
+    fetcher.close()
+
+
+def test_slow_primary_is_hedged_and_the_first_response_wins():
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        with lock:
+            calls.append(url)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    fetcher = HedgedFetcher(fetch, RunBudget(10), tracker=_fast_tracker())
+    assert fetcher.fetch("u") == "fast"
+    assert fetcher.stats()["hedged"] == 1 and fetcher.stats()["hedge_wins"] == 1
+    fetcher.close()
+
+
+def test_time_queued_for_a_thread_does_not_trigger_a_hedge():
+    fetcher = HedgedFetcher(lambda url: "page", RunBudget(10), max_workers=2, tracker=_fast_tracker())
+    release = threading.Event()
+    busy = [fetcher._pool.submit(release.wait, 5) for _ in range(2)]
+    threading.Timer(0.3, release.set).start()
+    assert fetcher.fetch("u") == "page"
+    assert all(f.result() for f in busy)
+    assert fetcher.stats()["hedged"] == 0
+    fetcher.close()
+
+
+def test_error_is_raised_when_every_request_fails():
+    def fetch(url):
+        raise ConnectionError("refused")
+
+    fetcher = HedgedFetcher(fetch, RunBudget(10))
+    with pytest.raises(ConnectionError):
+        fetcher.fetch("u")
+    fetcher.close()
+
+
+def test_deadline_while_waiting_raises_budget_exceeded():
+    release = threading.Event()
+    fetcher = HedgedFetcher(lambda url: release.wait(5) and "late", RunBudget(0.3))
+    start = time.monotonic()
+    with pytest.raises(BudgetExceeded):
+        fetcher.fetch("u")
+    assert time.monotonic() - start < 1
+    release.set()
+    fetcher.close()
+    with pytest.raises(BudgetExceeded):
+        fetcher.fetch("u")  # spent budget: nothing is sent
@@ -0,0 +1,151 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import create_session
+from run_budget import RunBudget
+from sitemap_discovery import SitemapDiscovery
+from smoothcomp_scraper import SmoothcompScraper
+
+INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{base}/events.xml</loc><lastmod>2027-01-01</lastmod></sitemap>
+</sitemapindex>"""
+
+EVENTS = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>{base}/event/1</loc><lastmod>2027-01-01</lastmod></url>
+  <url><loc>{base}/event/2</loc><lastmod>2027-01-01</lastmod></url>
+  <url><loc>{base}/about</loc></url>
+</urlset>"""
+
+
+@pytest.fixture
+def sitemap(static_site, tmp_path):
+    (tmp_path / "sitemap.xml").write_text(INDEX.format(base=static_site), encoding="utf-8")
+    (tmp_path / "events.xml").write_text(EVENTS.format(base=static_site), encoding="utf-8")
+    return f"{static_site}/sitemap.xml"
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "state" / "sitemap_state.json")
+
+
+def _discovery(sitemap, state_path):
+    return SitemapDiscovery(create_session(retries=0), sitemap, state_path)
+
+
+def test_unchanged_sitemap_is_not_downloaded_again(sitemap, state_path, static_site):
+    first = _discovery(sitemap, state_path)
+    changed = first.discover()
+    assert changed == [f"{static_site}/event/1", f"{static_site}/event/2"]
+    for url in changed:
+        first.record(url, {"id": url})
+    first.save()
+
+    second = _discovery(sitemap, state_path)
+    assert second.discover() == []
+    assert (second.sitemaps_fetched, second.sitemaps_skipped) == (1, 1)
+    assert sorted(e["id"] for e in second.events()) == changed
+
+
+def test_unrecorded_pages_are_changed_again_next_run(sitemap, state_path, static_site):
+    first = _discovery(sitemap, state_path)
+    changed = first.discover()
+    first.record(changed[0], {"id": changed[0]})  # event/2 never fetched
+    first.save()
+
+    second = _discovery(sitemap, state_path)
+    assert second.discover() == [f"{static_site}/event/2"]
+    assert [e["id"] for e in second.events()] == [f"{static_site}/event/1"]
+
+
+def test_scrape_from_sitemap_fetches_pages_beyond_max_events_next_run(sitemap, state_path, static_site,
+                                                                     monkeypatch):
+    monkeypatch.setattr(SmoothcompScraper, "SITEMAP_URL", sitemap)
+    fetched = []
+
+    def run(max_events):
+        scraper = SmoothcompScraper(session=create_session(retries=0))
+        monkeypatch.setattr(scraper, "_fetch_page", lambda url: fetched.append(url) or "<html></html>")
+        monkeypatch.setattr(scraper, "_parse_event_details", lambda url, html: {"id": url})
+        return sorted(e["id"] for e in scraper.scrape_from_sitemap(state_path, max_events=max_events))
+
+    assert run(max_events=1) == [f"{static_site}/event/1"]
+    assert run(max_events=1) == [f"{static_site}/event/1", f"{static_site}/event/2"]
+    assert fetched == [f"{static_site}/event/1", f"{static_site}/event/2"]
+
+
+def test_gzip_child_sitemap_is_read(static_site, tmp_path, state_path):
+    (tmp_path / "sitemap.xml").write_text(INDEX.format(base=static_site).replace("events.xml", "events.xml.gz"),
+                                          encoding="utf-8")
+    (tmp_path / "events.xml.gz").write_bytes(gzip.compress(EVENTS.format(base=static_site).encode("utf-8")))
+    discovery = _discovery(f"{static_site}/sitemap.xml", state_path)
+    assert discovery.discover() == [f"{static_site}/event/1", f"{static_site}/event/2"]
+
+
+@pytest.fixture
+def slow_sitemap():
+    """An index whose second child sitemap trickles in one byte every 50 ms."""
+    pages = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages[self.path].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                if self.path != "/slow.xml":
+                    self.wfile.write(body)
+                    return
+                for i in range(len(body)):
+                    self.wfile.write(body[i:i + 1])
+                    self.wfile.flush()
+                    time.sleep(0.05)
+            except OSError:
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    children = "".join(f"<sitemap><loc>{base}/{name}.xml</loc><lastmod>2027-01-01</lastmod></sitemap>"
+                       for name in ("events", "slow", "later"))
+    pages["/sitemap.xml"] = INDEX.split("\n  <sitemap>")[0] + children + "</sitemapindex>"
+    pages["/events.xml"] = EVENTS.format(base=base)
+    pages["/slow.xml"] = pages["/later.xml"] = EVENTS.format(base=base).replace("/event/", "/event/slow-")
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def test_sitemaps_are_cut_at_the_deadline(slow_sitemap, state_path):
+    discovery = SitemapDiscovery(create_session(retries=0), f"{slow_sitemap}/sitemap.xml", state_path,
+                                 budget=RunBudget(1.0))
+    start = time.monotonic()
+    changed = discovery.discover()
+    assert time.monotonic() - start < 1.5
+    assert changed == [f"{slow_sitemap}/event/1", f"{slow_sitemap}/event/2"]
+    assert discovery.sitemaps_fetched == 3  # later.xml is never requested
+
+    for url in changed:
+        discovery.record(url, {"id": url})
+    discovery.save()
+    with open(state_path, encoding="utf-8") as f:
+        assert list(json.load(f)["sitemaps"]) == [f"{slow_sitemap}/events.xml"]
+
+
+def test_spent_budget_skips_the_sitemap_index(sitemap, state_path, monkeypatch):
+    monkeypatch.setattr(SmoothcompScraper, "SITEMAP_URL", sitemap)
+    scraper = SmoothcompScraper(session=create_session(retries=0), budget=RunBudget(0))
+    assert scraper.scrape_from_sitemap(state_path) == []
@@ -0,0 +1,243 @@
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import create_session
+from page_archive import PageArchive
+from run_budget import BudgetExceeded, FetchCancelled, RunBudget
+from smoothcomp_scraper import SmoothcompScraper
+
+
+@pytest.fixture
+def site(static_site, tmp_path, event_page):
+    """Write event pages under /event/ and return a function giving their URLs."""
+    (tmp_path / "event").mkdir()
+
+    def page(name, title, suffix=".html"):
+        (tmp_path / "event" / f"{name}{suffix}").write_text(event_page(title), encoding="utf-8")
+        return f"{static_site}/event/{name}{suffix}"
+
+    return page
+
+
+@pytest.fixture
+def scraper():
+    return SmoothcompScraper(session=create_session(retries=0))
+
+
+def test_head_with_unknown_charset_is_read(site, scraper):
+    url = site("1", "Open de Paris Jiu-Jitsu", suffix=".mb4")
+    event = scraper._parse_event_details(url, scraper._get_event_page(url))
+    assert event is not None and event["title"] == "Open de Paris Jiu-Jitsu"
+    assert scraper.head_only_pages == 1 and scraper.full_pages == 0
+
+
+def test_head_without_metadata_falls_back_to_a_full_fetch(static_site, tmp_path, scraper, event_page):
+    # JSON-LD deep in the body: the head alone is not enough
+    head, jsonld = event_page("Open de Nantes BJJ").split("</head>")[0].split('<script type="application/ld+json">')
+    page = f'{head}</head><body>{"<p>results</p>" * 2000}<script type="application/ld+json">{jsonld}</body></html>'
+    (tmp_path / "late.html").write_text(page, encoding="utf-8")
+    url = f"{static_site}/late.html"
+
+    html = scraper._get_event_page(url)
+    assert scraper._parse_event_details(url, html)["title"] == "Open de Nantes BJJ"
+    assert (scraper.head_only_pages, scraper.full_pages) == (1, 1)
+
+
+def test_head_read_stops_at_the_byte_cap(static_site, tmp_path):
+    head = '<html><head><meta property="og:title" content="Big Head">' + "<!-- padding -->" * 4000 + "</head>"
+    (tmp_path / "big.html").write_text(head + "<body></body></html>", encoding="utf-8")
+    scraper = SmoothcompScraper(session=create_session(retries=0), head_byte_cap=16 * 1024)
+
+    html, head_closed, received = scraper._read_page_head(f"{static_site}/big.html")
+    assert not head_closed
+    assert 16 * 1024 <= received < 16 * 1024 + 8192 and len(html) < len(head)
+
+
+@pytest.fixture
+def gzip_url(event_page):
+    """An event page sent with Content-Encoding: gzip."""
+    body = gzip.compress(event_page("Gzip BJJ Open").encode("utf-8"))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/event/1", len(body)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("head_only", [True, False])
+def test_transfer_is_counted_in_wire_bytes(gzip_url, head_only):
+    url, wire_bytes = gzip_url
+    scraper = SmoothcompScraper(session=create_session(retries=0), head_only=head_only)
+    html = scraper._get_event_page(url)
+    assert "Gzip BJJ Open" in html
+    assert scraper.bytes_downloaded == wire_bytes < len(html)
+
+
+def test_target_mode_survives_unexpected_fetch_errors(site, scraper, monkeypatch):
+    urls = [site(str(i), f"Grappling Cup {i}") for i in range(4)]
+    download = scraper._download_event_page
+
+    def flaky(url):
+        if url == urls[1]:
+            raise LookupError("unknown encoding: utf8mb4")
+        return download(url)
+
+    monkeypatch.setattr(scraper, "_download_event_page", flaky)
+    events = scraper._scrape_until_target([{"url": url} for url in urls], target_count=10, workers=2)
+    assert sorted(e["title"] for e in events) == ["Grappling Cup 0", "Grappling Cup 2", "Grappling Cup 3"]
+
+
+def test_fetch_abandoned_at_target_is_not_archived(site, tmp_path, monkeypatch):
+    archive = PageArchive(str(tmp_path / "archive"))
+    scraper = SmoothcompScraper(session=create_session(retries=0), archive=archive)
+    fast, slow = site("1", "Fast BJJ Open"), site("2", "Slow BJJ Open")
+    download = scraper._download_event_page
+    slow_done = threading.Event()
+
+    def download_slowly(url):
+        if url == slow:
+            time.sleep(0.5)
+            try:
+                return download(url)
+            finally:
+                slow_done.set()
+        return download(url)
+
+    monkeypatch.setattr(scraper, "_download_event_page", download_slowly)
+    events = scraper._scrape_until_target([{"url": fast}, {"url": slow}], target_count=1, workers=2)
+    archive.close()
+    assert slow_done.wait(5)
+    time.sleep(0.1)
+
+    assert [e["title"] for e in events] == ["Fast BJJ Open"]
+    with PageArchive(archive.path) as reopened:
+        assert [entry.url for entry in reopened.entries()] == [fast]
+    assert scraper.head_only_pages == 1
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Paris MMA & Grappling Open", (False, "mma")),  # rejected keywords win
+    ("Lyon No-Gi Submission Only", (True, "no-gi")),
+    ("Regional Chess Tournament", (False, None)),
+])
+def test_sport_filter(scraper, title, expected):
+    assert scraper._sport_filter(title) == expected
+    assert (scraper.accepted_count, scraper.rejected_count) == ((1, 0) if expected[0] else (0, 1))
+
+
+@pytest.fixture
+def trickle_url():
+    """A page sending one byte every 50 ms for 10 s, so no single read times out."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", "200")
+            self.end_headers()
+            try:
+                for _ in range(200):
+                    self.wfile.write(b"x")
+                    self.wfile.flush()
+                    time.sleep(0.05)
+            except OSError:
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/event/1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("head_only", [True, False])
+def test_trickling_page_is_cut_at_the_deadline(trickle_url, head_only):
+    scraper = SmoothcompScraper(session=create_session(retries=0), budget=RunBudget(1.0), hedge=False,
+                                head_only=head_only)
+    start = time.monotonic()
+    with pytest.raises(BudgetExceeded):
+        scraper._fetch_page(trickle_url)
+    assert time.monotonic() - start < 1.5
+
+
+def test_in_flight_download_stops_once_the_target_is_met(site, trickle_url, monkeypatch):
+    scraper = SmoothcompScraper(session=create_session(retries=0), hedge=False)
+    fast = site("1", "Fast BJJ Open")
+    download = scraper._download_event_page
+    cancelled = threading.Event()
+
+    def download_recording(url):
+        try:
+            return download(url)
+        except FetchCancelled:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(scraper, "_download_event_page", download_recording)
+    events = scraper._scrape_until_target([{"url": fast}, {"url": trickle_url}], target_count=1, workers=2)
+    assert [e["title"] for e in events] == ["Fast BJJ Open"]
+    assert cancelled.wait(1.0)  # the trickling page would otherwise download for 10 s
+
+
+def test_target_mode_pauses_every_ten_requests(site, scraper, monkeypatch):
+    urls = [site(str(i), f"Grappling Cup {i}") for i in range(21)]
+    pauses = []
+    monkeypatch.setattr("smoothcomp_scraper.time.sleep", pauses.append)
+    events = scraper._scrape_until_target([{"url": url} for url in urls], target_count=50, workers=4)
+    assert len(events) == 21
+    assert pauses == [0.5, 0.5]
+
+
+def test_hedged_fetch_is_recorded_once(site, tmp_path, monkeypatch):
+    archive = PageArchive(str(tmp_path / "archive"))
+    scraper = SmoothcompScraper(session=create_session(retries=0), archive=archive, budget=RunBudget(30))
+    for _ in range(20):
+        scraper._latency.record(0.01)
+    url = site("1", "Hedged BJJ Open")
+    download = scraper._download_event_page
+    calls = []
+
+    def slow_first(page_url):
+        calls.append(page_url)
+        if len(calls) == 1:
+            time.sleep(0.3)
+        return download(page_url)
+
+    monkeypatch.setattr(scraper, "_download_event_page", slow_first)
+    assert "Hedged BJJ Open" in scraper._fetch_page(url)
+    time.sleep(0.5)  # let the losing request finish
+
+    assert len(calls) == 2
+    assert archive.stats()["written"] == 1 and archive.stats()["unchanged"] == 0
+    assert scraper.head_only_pages == 1
+    scraper.close()
+    assert scraper._hedger is None and scraper.hedge_stats["hedge_wins"] == 1
+    archive.close()
+
+
+def test_scrape_from_sitemap_releases_the_hedger(scraper, tmp_path, monkeypatch):
+    scraper = SmoothcompScraper(session=create_session(retries=0), budget=RunBudget(30))
+    scraper._get_hedger()
+    monkeypatch.setattr(SmoothcompScraper, "SITEMAP_URL", "http://127.0.0.1:9/sitemap.xml")
+    scraper.scrape_from_sitemap(str(tmp_path / "state.json"))
+    assert scraper._hedger is None
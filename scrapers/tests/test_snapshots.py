@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from snapshots import SnapshotSet, save_snapshot  # noqa: E402
+
+EVENTS = [
+    {"id": "sc_1", "date_start": "2027-03-04", "sport_tag": "jjb", "category": "combat",
+     "location": {"country": "France"}},
+    {"id": "betrail_2", "date_start": "2027-04-01", "sport_tag": "trail", "category": "endurance",
+     "location": {"country": "France"}},
+]
+
+
+def test_save_leaves_no_temp_file_and_loads_back(tmp_path):
+    path = save_snapshot(EVENTS, str(tmp_path), stats={"accepted": 2}, run_id="20270101T000000")
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+    snapshots = SnapshotSet.load(str(tmp_path))
+    assert snapshots.runs == ["20270101T000000"]
+    assert snapshots.counts("source") == {"betrail": 1, "smoothcomp": 1}
+    assert snapshots.counts_by_month() == {"2027-03": 1, "2027-04": 1}
+
+
+def test_interrupted_saves_are_not_loaded(tmp_path):
+    save_snapshot(EVENTS, str(tmp_path), run_id="20270101T000000")
+    (tmp_path / "20270102T000000.npz.tmp").write_bytes(b"PK\x03\x04 truncated")
+    (tmp_path / "20270103T000000.npz.tmp.npz").write_bytes(b"PK\x03\x04 truncated")
+
+    assert SnapshotSet.load(str(tmp_path)).runs == ["20270101T000000"]
+
+
+def test_churn_between_runs(tmp_path):
+    save_snapshot(EVENTS, str(tmp_path), run_id="20270101T000000")
+    save_snapshot(EVENTS[1:] + [dict(EVENTS[0], id="sc_3")], str(tmp_path), run_id="20270102T000000")
+    assert SnapshotSet.load(str(tmp_path)).churn() == [
+        {"run": "20270102T000000", "added": 1, "removed": 1, "kept": 1}
+    ]
+
+
+def test_reprocess_runs_stay_out_of_the_crawl_history(tmp_path):
+    save_snapshot(EVENTS, str(tmp_path), stats={"accepted": 2, "sport_rejected": 2, "location_rejected": 0},
+                  run_id="20270101T000000")
+    save_snapshot(EVENTS[:1], str(tmp_path), stats={"accepted": 1, "sport_rejected": 3, "location_rejected": 0},
+                  run_id="20270101T120000", kind="reprocess")
+    save_snapshot(EVENTS[1:], str(tmp_path), stats={"accepted": 1, "sport_rejected": 1, "location_rejected": 0},
+                  run_id="20270102T000000")
+
+    crawls = SnapshotSet.load(str(tmp_path), last=2)
+    assert crawls.runs == ["20270101T000000", "20270102T000000"]
+    assert crawls.acceptance_rates() == [0.5, 0.5]
+    assert crawls.churn() == [{"run": "20270102T000000", "added": 0, "removed": 1, "kept": 1}]
+
+    every = SnapshotSet.load(str(tmp_path), kinds=None)
+    assert every.kinds == ["crawl", "reprocess", "crawl"]
+    assert every.churn() == crawls.churn()  # a reprocess run is never a churn endpoint
+    assert every.acceptance_rates()[1] == 0.25
+
+
+def test_untagged_snapshots_load_as_crawls(tmp_path):
+    path = save_snapshot(EVENTS, str(tmp_path), run_id="20270101T000000")
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files if name != "kind"}
+    np.savez_compressed(path, **arrays)
+
+    assert SnapshotSet.load(str(tmp_path)).kinds == ["crawl"]
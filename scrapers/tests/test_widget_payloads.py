@@ -0,0 +1,67 @@
+import json
+from datetime import date
+
+from widget_payloads import MAX_TITLE_LENGTH, build_widget_payloads, load_catalog, region_of, write_widget_payloads
+
+TODAY = date(2027, 3, 1)
+
+
+def _event(event_id, day, sport_tag="jjb", title="Open", country="France"):
+    return {"id": event_id, "title": title, "date_start": f"2027-03-{day:02d}",
+            "location": {"city": "Lyon", "country": country}, "sport_tag": sport_tag}
+
+
+def test_events_are_grouped_by_sport_region_and_overall():
+    catalog = {
+        "france": [_event("f2", 5), _event("f1", 2, sport_tag="trail"), _event("f0", 1)],
+        # The catalog file decides the region, whatever the country says
+        "monde": [_event("m1", 3, country="World")],
+    }
+    payloads = build_widget_payloads(catalog, today=TODAY, limit=2)
+
+    ids = {name: [e["id"] for e in payload["events"]] for name, payload in payloads.items()}
+    assert ids == {
+        "all.json": ["f0", "f1"],
+        "region_france.json": ["f0", "f1"],
+        "region_monde.json": ["m1"],
+        "sport_jjb.json": ["f0", "m1"],
+        "sport_trail.json": ["f1"],
+    }
+    assert payloads["all.json"]["generated_on"] == "2027-03-01"
+
+
+def test_past_and_undated_events_are_left_out():
+    catalog = {"france": [dict(_event("past", 1), date_start="2027-02-28"), dict(_event("undated", 1), date_start=None)]}
+    assert build_widget_payloads(catalog, today=TODAY) == {"all.json": {"generated_on": "2027-03-01", "events": []}}
+
+
+def test_long_titles_are_truncated():
+    title = "Championnat de France de Jiu-Jitsu Brésilien No-Gi Masters"
+    event = build_widget_payloads({"france": [_event("f1", 2, title=title)]}, today=TODAY)["all.json"]["events"][0]
+    assert len(event["title"]) <= MAX_TITLE_LENGTH and event["title"].endswith("…")
+    assert title.startswith(event["title"][:-1])
+    assert set(event) == {"id", "title", "date", "city", "sport_tag"}
+
+
+def test_stale_payloads_are_removed(tmp_path):
+    (tmp_path / "sport_mma.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "README.txt").write_text("kept", encoding="utf-8")
+    names = write_widget_payloads({"france": [_event("f1", 2)]}, str(tmp_path), today=TODAY)
+
+    assert names == ["all.json", "region_france.json", "sport_jjb.json"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["README.txt"] + names
+    assert json.loads((tmp_path / "all.json").read_text(encoding="utf-8"))["events"][0]["id"] == "f1"
+
+
+def test_region_of_handles_missing_countries():
+    assert region_of({"location": {"country": None}}) == "monde"
+    assert region_of({"location": None}) == "monde"
+    assert region_of({"location": {"country": " Spain "}}) == "europe"
+    assert region_of({"location": {"country": "France"}}) == "france"
+
+
+def test_load_catalog_reads_each_region_file(tmp_path):
+    (tmp_path / "france.json").write_text(json.dumps([_event("f1", 2)]), encoding="utf-8")
+    catalog = load_catalog(str(tmp_path))
+    assert [e["id"] for e in catalog["france"]] == ["f1"]
+    assert catalog["europe"] == [] and catalog["monde"] == []
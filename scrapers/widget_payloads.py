@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tiny precomputed "upcoming events" payloads for widgets and the watch.
+
+Reads the app's catalog (src/data/events/{france,europe,monde}.json) and
+writes the next few events per sport_tag, per region and overall, keeping
+only the fields those surfaces display. Each file stays within a few KB, so
+a widget refresh can read one small JSON file instead of the full catalog.
+
+    python3 widget_payloads.py                  # from the app catalog
+    python3 widget_payloads.py events.json      # other files: region from the country
+"""
+
+import argparse
+import json
+import logging
+import os
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+CATALOG_DIR = os.path.join(PROJECT_ROOT, "src", "data", "events")
+WIDGETS_DIR = os.path.join(PROJECT_ROOT, "src", "data", "widgets")
+
+REGIONS = ("france", "europe", "monde")
+
+EVENTS_PER_PAYLOAD = 5
+MAX_TITLE_LENGTH = 48
+MAX_PAYLOAD_BYTES = 4096
+
+# Countries filed under the "europe" region (anything else is "monde")
+EUROPE_COUNTRIES = {
+    "europe", "germany", "spain", "italy", "portugal", "netherlands", "belgium",
+    "switzerland", "austria", "poland", "czech republic", "hungary", "romania",
+    "bulgaria", "croatia", "serbia", "slovenia", "slovakia", "greece", "ireland",
+    "united kingdom", "sweden", "norway", "denmark", "finland", "iceland",
+    "lithuania", "latvia", "estonia", "ukraine", "luxembourg", "monaco",
+}
+
+
+def region_of(event: dict) -> str:
+    """Region bucket of an event outside the catalog, guessed from its country."""
+    country = ((event.get("location") or {}).get("country") or "").strip().lower()
+    if country == "france":
+        return "france"
+    if country in EUROPE_COUNTRIES:
+        return "europe"
+    return "monde"
+
+
+def group_by_region(events: Iterable[dict]) -> Dict[str, List[dict]]:
+    """{region: events} for events that do not come from a catalog file."""
+    regions: Dict[str, List[dict]] = {}
+    for event in events:
+        regions.setdefault(region_of(event), []).append(event)
+    return regions
+
+
+def load_catalog(events_dir: str = CATALOG_DIR) -> Dict[str, List[dict]]:
+    """The app's event catalog as {region: events}; the file an event sits in is its region."""
+    catalog = {}
+    for region in REGIONS:
+        path = os.path.join(events_dir, f"{region}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                catalog[region] = json.load(f)
+        except FileNotFoundError:
+            logger.warning("Catalog file %s not found", path)
+            catalog[region] = []
+    return catalog
+
+
+def _compact(event: dict) -> dict:
+    """Keep only what a widget or watch face displays."""
+    title = event.get("title", "")
+    if len(title) > MAX_TITLE_LENGTH:
+        title = title[: MAX_TITLE_LENGTH - 1].rstrip() + "…"
+    location = event.get("location") or {}
+    return {
+        "id": event.get("id"),
+        "title": title,
+        "date": event.get("date_start"),
+        "city": location.get("city", ""),
+        "sport_tag": event.get("sport_tag"),
+    }
+
+
+def build_widget_payloads(events_by_region: Dict[str, Iterable[dict]], today: Optional[date] = None,
+                          limit: int = EVENTS_PER_PAYLOAD) -> Dict[str, dict]:
+    """
+    Group upcoming events and keep the next `limit` of each group.
+
+    Takes {region: events}, as returned by load_catalog(). Returns
+    {file name: payload}, e.g. "sport_jjb.json", "region_france.json" and
+    "all.json".
+    """
+    today_iso = (today or date.today()).isoformat()
+    upcoming = sorted(
+        ((region, e) for region, events in events_by_region.items() for e in events
+         if (e.get("date_start") or "") >= today_iso),
+        key=lambda item: (item[1]["date_start"], item[1].get("id") or ""),
+    )
+
+    groups: Dict[str, List[dict]] = {"all": []}
+    for region, event in upcoming:
+        for key in ("all", f"sport_{event.get('sport_tag')}", f"region_{region}"):
+            bucket = groups.setdefault(key, [])
+            if len(bucket) < limit:
+                bucket.append(_compact(event))
+
+    return {
+        f"{key}.json": {"generated_on": today_iso, "events": bucket}
+        for key, bucket in sorted(groups.items())
+    }
+
+
+def write_widget_payloads(events_by_region: Dict[str, Iterable[dict]], out_dir: str = WIDGETS_DIR,
+                          today: Optional[date] = None, limit: int = EVENTS_PER_PAYLOAD) -> List[str]:
+    """Write every payload to out_dir and remove those from groups that disappeared."""
+    payloads = build_widget_payloads(events_by_region, today, limit)
+    os.makedirs(out_dir, exist_ok=True)
+
+    for name in os.listdir(out_dir):
+        if name.endswith(".json") and name not in payloads:
+            os.remove(os.path.join(out_dir, name))
+
+    for name, payload in payloads.items():
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        if len(data.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+            logger.warning("Widget payload %s is %d bytes", name, len(data.encode("utf-8")))
+        path = os.path.join(out_dir, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # widgets never see a half-written file
+
+    return sorted(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build widget/watch upcoming-events payloads")
+    parser.add_argument("inputs", nargs="*",
+                        help="events JSON files (arrays of SportEvent); defaults to the app catalog")
+    parser.add_argument("-o", "--out-dir", default=WIDGETS_DIR)
+    parser.add_argument("-n", "--limit", type=int, default=EVENTS_PER_PAYLOAD)
+    args = parser.parse_args()
+
+    if not args.inputs:
+        catalog = load_catalog()
+    else:
+        catalog: Dict[str, List[dict]] = {}
+        for path in args.inputs:
+            with open(path, "r", encoding="utf-8") as f:
+                events = json.load(f)
+            region = os.path.splitext(os.path.basename(path))[0]
+            if region in REGIONS:
+                catalog.setdefault(region, []).extend(events)
+            else:
+                for region, grouped in group_by_region(events).items():
+                    catalog.setdefault(region, []).extend(grouped)
+
+    names = write_widget_payloads(catalog, args.out_dir, limit=args.limit)
+    print(f"Wrote {len(names)} widget payloads to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()